@@ -48,6 +48,9 @@ class _ImagesInfos:
     def __init__(self, pyinstance):
         self.cpn = pyinstance.path_index.path_nodes_store.current_pathnode()
         self.position = self.cpn.position
+        # Archive members are displayed without being extracted, a real file
+        # is needed here:
+        self.cpn.preaccess_current()
         self.clear = str(self.cpn.all_files[self.position])
         self.real = str(self.cpn.current_path)
 
@@ -13,6 +13,10 @@ from gi.repository import (
 )
 
 
+# Seek mode of "@N" positions, counted across all locations:
+SEEK_GLOBAL = "global"
+
+
 class _PytheiaPlugin:
     """
     Mixin for PytheiaPlugin.
@@ -30,11 +34,20 @@ class _PytheiaPlugin:
         Obtain the destination index position
 
         """
+        # Counting all the locations would list every directory and archive,
+        # only show the total when already known:
+        _global_len = self.pytheia.path_index.global_index.known_len()
+        _global_range = "@1 to @%s" % _global_len if _global_len is not None else "@N"
+
         # t_msg => (primsg, secmsg, title, prefix)
         self.index_dst = self.pytheia.wid_get_text_input_simple(
             (
                 "Please enter the position to jump to",
-                "possible values are: 1 to %s" % len(self.pytheia.path_index.path_nodes_store.current_pathnode()),
+                "possible values are: 1 to %s, or %s across all locations"
+                % (
+                    len(self.pytheia.path_index.path_nodes_store.current_pathnode()),
+                    _global_range,
+                ),
                 "Goto index...",
                 "index: ",
             )
@@ -51,6 +64,9 @@ class _PytheiaPlugin:
 
         """
         try:
+            if whence == SEEK_GLOBAL:
+                self.pytheia.path_index.callbacks.cb_path_seek_global(int(offset))
+                return True
             self.pytheia.cb_path_seek_generic(int(offset), whence)
         except Exception as ex:
             self.plugin_console_out(f"error calling cb_path_seek_generic. ex: {ex}")
@@ -69,6 +85,17 @@ class _PytheiaPlugin:
             self.plugin_console_out("error: index_dst is None")
             return False
 
+        if self.index_dst.startswith("@"):
+            # Absolute, across all locations (1 based):
+            try:
+                _seek_num = int(self.index_dst[1:]) - 1
+            except ValueError as e:
+                self.plugin_console_out("_seek_num can't be seen as an int: " + str(e))
+                return False
+
+            self.index_dst_split = (_seek_num, SEEK_GLOBAL)
+            return True
+
         if "-" in self.index_dst:
             _seek_sign = "negative"
 
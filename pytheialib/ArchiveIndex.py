@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+ArchiveIndex
+"""
+
+import sys
+from array import array
+from collections import namedtuple
+
+# Metadata of one member. Unknown values are -1, 0.0 for mtime and None for
+# method:
+ArchiveMember = namedtuple(
+    "ArchiveMember",
+    (
+        "size",  # Int, uncompressed bytes
+        "compressed_size",  # Int, bytes
+        "offset",  # Int, of the member data in the archive
+        "crc",  # Int, CRC-32 of the uncompressed data
+        "mtime",  # Float, seconds since the epoch
+        "method",  # Str, compression method, ie: 'Copy', 'Deflate', 'LZMA2:24'
+    ),
+)
+
+
+class ArchiveIndex:
+    """
+    Metadata of the members of an archive, as its listing (ZipInfo, TarInfo,
+    7z -slt output) gives them, so that sizes, dates and the like are known
+    without reading nor extracting any member data.
+
+    Values are held as columns, rows being found by member name, so that
+    the index of a large archive costs a few bytes per member over its name.
+    """
+
+    __slots__ = ("rows", "sizes", "compressed_sizes", "offsets", "crcs", "mtimes", "methods")
+
+    UNKNOWN = ArchiveMember(-1, -1, -1, -1, 0.0, None)
+
+    def __init__(self):
+        self.rows = {}  # {Str: Int}, member name -> row
+        self.sizes = array("q")
+        self.compressed_sizes = array("q")
+        self.offsets = array("q")
+        self.crcs = array("q")
+        self.mtimes = array("d")
+        self.methods = []  # [Str], interned
+
+    def __len__(self):
+        """Handles len() calls"""
+        return len(self.rows)
+
+    def __contains__(self, name):
+        """Handles 'in' tests"""
+        return name in self.rows
+
+    def __repr__(self):
+        """Serializable representation of this object"""
+        return "ArchiveIndex(%s members)" % len(self)
+
+    def add(self, name, size, compressed_size=-1, offset=-1, crc=-1, mtime=0.0, method=None):
+        """
+        Add, or replace, the metadata of member 'name'
+        """
+        _values = (size, compressed_size, offset, crc, mtime, sys.intern(method) if method else None)
+
+        if name in self.rows:
+            _row = self.rows[name]
+            for _column, _value in zip(self._columns(), _values):
+                _column[_row] = _value
+            return
+
+        self.rows[name] = len(self.rows)
+        for _column, _value in zip(self._columns(), _values):
+            _column.append(_value)
+
+    def _columns(self):
+        """Returns the columns, in ArchiveMember fields order"""
+        return self.sizes, self.compressed_sizes, self.offsets, self.crcs, self.mtimes, self.methods
+
+    def __getitem__(self, name):
+        """
+        Returns the <ArchiveMember> of member 'name', raises KeyError if
+        absent
+        """
+        _row = self.rows[name]
+
+        return ArchiveMember(*(_column[_row] for _column in self._columns()))
+
+    def get(self, name, default=None):
+        """
+        Returns the <ArchiveMember> of member 'name', or 'default'
+        """
+        if name not in self.rows:
+            return default
+
+        return self[name]
+
+    def nbytes(self):
+        """
+        Returns the approximate memory held by the index, in bytes
+        """
+        return sys.getsizeof(self.rows) + sum(sys.getsizeof(_column) for _column in self._columns())
@@ -13,6 +13,7 @@ gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk # pylint: disable=import-error
 
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.StageTimings import StageTimings
 from pytheialib.ThumbnailsView import ThumbnailsView
 from pytheialib.Utils import Utils
 
@@ -31,11 +32,12 @@ class Callbacks:
         self.persistence = None  # <Persistence>
         self.pbl = None  # <ProgressivePixbufLoader>
         self.platform = None  # <Platform>
+        self.prefetch_ring = None  # <PrefetchRing>
         self.plugins = None  # <Plugins>
         self.screen = None  # <Screen>
         self.source_image = None  # <SourceImage>
+        self.stats_dump = None  # Str, path to dump StageTimings to on quit
         self.render_state = None  # int
-        self.render_first_block_updated = None  # int
         self.thumbnails_view = None  # <ThumbnailsView>
 
     @staticmethod
@@ -110,9 +112,77 @@ class Callbacks:
             self.path_index.path_nodes_store.current_pathnode()  # current_path
         )
 
+        # PrefetchRing(): an already decoded image doesn't need the loader
+        _prefetched = self.prefetch_ring.lookup(self.source_image.imagefile)
+        if _prefetched:
+            self._display_prefetched(*_prefetched)
+            return
+
         # ProgressivePixbufLoader()
         self.pbl.pixbuf_loader_start()
 
+    def _display_prefetched(self, pixbuf, full_sizes_t=None):
+        """
+        Display a pixbuf obtained from the PrefetchRing, bypassing the loader.
+        `full_sizes_t` is given when the pixbuf was decoded to fit the display.
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        self.plugins.plugins_hooks_on_event_generic("on_image_load_start")
+        self._display_complete(pixbuf, full_sizes_t)
+
+    def cb_decoded(self, pixbuf, full_sizes_t=None):
+        """
+        Display a pixbuf decoded by the DecodeWorkerPool (threaded decode
+        engine). `full_sizes_t` is given when the pixbuf was decoded to fit
+        the display.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), pixbuf))
+
+        self.prefetch_ring.store(self.source_image.imagefile, pixbuf, full_sizes_t)
+        self._display_complete(pixbuf, full_sizes_t)
+
+    def _display_complete(self, pixbuf, full_sizes_t):
+        """Display a completely decoded pixbuf, as cb_area_closed() would"""
+        self._register_source_sizes(*pixbuf.get_properties("width", "height"))
+
+        # ImageDisplay(), DisplayState()
+        self.image_display.update_raw_pixbuf(pixbuf)
+        self.image_display.raw_pixbuf_complete = True
+        if full_sizes_t:
+            self.source_image.full_width, self.source_image.full_height = full_sizes_t
+            self.image_display.raw_pixbuf_reduced = True
+        self.display_state.state_commit()
+        self.render_state = 2
+
+        # Plugins()
+        self.plugins.plugins_hooks_on_event_generic("on_image_load_complete")
+
+        if self.display_state.zoom:
+            self.plugins.plugins_hooks_on_event_generic("on_zoom_performed")
+
+        self.prefetch_ring.schedule(self.path_index.path_nodes_store.current_pathnode())
+
+    def _register_source_sizes(self, width, height):
+        """Set dimensions, orientation and prominent axis of the source image"""
+        # Dimensions:
+        self.source_image.width = width
+        self.source_image.height = height
+
+        # Orientation:
+        self.source_image.orientation = Utils.orientation_from_sizes(self.source_image.width, self.source_image.height)
+
+        if self.source_image.orientation == "landscape":
+            self.source_image.prominent_axis = "x"
+
+        elif self.source_image.orientation == "portrait":
+            self.source_image.prominent_axis = "y"
+
+        elif self.source_image.orientation == "square":
+            self.source_image.prominent_axis = "x"
+        else:
+            raise RuntimeError("unhandled orientation")
+
     def cb_path_seek_generic(self, offset, whence):
         """callback to perform a path_seek offering different modes"""
         wdebug("# %s:%s(%s, %s)" % (self.__class__, callee(), offset, whence))
@@ -122,21 +192,61 @@ class Callbacks:
         if whence is None:
             raise TypeError("whence cannot be None")
 
-        # TODO: implement method to stop a render in progress without waiting
-        if self.render_state not in (None, 2):
-            debug("moving by %d position(s) rejected: render is in progress" % offset)
-            # KeyBindings needs a boolean:
-            return False
-
-        # Since no render is in progress, clear possible previous render mess:
-        self.image_display_widget.image_display_widget_free_all()
+        self._abort_render()
 
         # PathIndex()
         # Use pathIndex as a proxy to request seek() to the underlying Node type:
-        self.path_index.seek(offset, whence)
+        with StageTimings().measure("seek"):
+            self.path_index.seek(offset, whence)
+        self.path_index.update_populated_nodes()
 
         self._do_update_display()
 
+    def cb_path_seek_global(self, position):
+        """
+        callback to jump to the zero based absolute 'position', counted
+        across all the PathNodes
+        """
+        wdebug("# %s:%s(%s)" % (self.__class__, callee(), position))
+
+        if not self.path_index.global_index.locate(position):
+            self._notify_no_image_at(position)
+            return
+
+        self._abort_render()
+
+        with StageTimings().measure("seek"):
+            if not self.path_index.seek_global(position):
+                # Its PathNode turned out empty:
+                self._notify_no_image_at(position)
+        self.path_index.update_populated_nodes()
+
+        self._do_update_display()
+
+    def _notify_no_image_at(self, position):
+        """
+        Tell there's no image at the zero based absolute 'position'
+        """
+        self.notifications.notification_push(
+            2,  # context_id
+            1000,  # milliseconds
+            "No image at position %s" % (position + 1),
+        )
+
+    def _abort_render(self):
+        """
+        Abandon a render in progress, and clear the display before seeking
+        """
+        # Latest wins: a render in progress is abandoned for the new target,
+        # so that images skipped over are never decoded completely:
+        if self.render_state not in (None, 2) or self.pbl.is_loading():
+            debug("render in progress aborted for a seek")
+            self.pbl.cancel_load()
+            self.render_state = None
+
+        # Clear possible previous render mess:
+        self.image_display_widget.image_display_widget_free_all()
+
     def cb_pathnode_seek_next(self):
         """Jump to the next pathnode, if any"""
         gdebug(f"# {self.__class__}:{callee()}")
@@ -168,6 +278,80 @@ class Callbacks:
             "Location: " + str(self.path_index.path_nodes_store.current_pathnode().start_uri),
         )
 
+    # noinspection PyUnusedLocal
+    def cb_cycle_sort_order(self, *args):
+        """callback to switch to the next files sort order"""
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        self.path_index.sort_order.cycle()
+        self._do_resort()
+
+    # noinspection PyUnusedLocal
+    def cb_toggle_reverse_sort(self, *args):
+        """callback to reverse the files sort order"""
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        self.path_index.sort_order.toggle_reverse()
+        self._do_resort()
+
+    # noinspection PyUnusedLocal
+    def cb_toggle_shuffle(self, *args):
+        """callback to enter or leave shuffle mode"""
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if self.path_index.shuffle or self.path_index.shuffle_pending:
+            self.path_index.set_shuffle(False)
+            self._notify_shuffle()
+            return
+
+        # Every directory and archive has to be counted first:
+        self.path_index.set_shuffle(True, on_ready=self._notify_shuffle)
+        if self.path_index.shuffle_pending:
+            self.notifications.notification_push(
+                2,  # context_id
+                1000,  # milliseconds
+                "Shuffle: counting files...",
+            )
+
+    def _notify_shuffle(self):
+        """
+        Tell whether shuffle mode is on
+        """
+        self.notifications.notification_push(
+            2,  # context_id
+            1000,  # milliseconds
+            "Shuffle: on, seed %s" % self.path_index.shuffle_seed if self.path_index.shuffle else "Shuffle: off",
+        )
+
+    def _do_resort(self):
+        """
+        Reorder files, staying on the displayed one, and prefetch its new
+        neighbours
+        """
+        self.path_index.resort()
+
+        self.notifications.notification_push(
+            2,  # context_id
+            1000,  # milliseconds
+            "Sort order: %s" % self.path_index.sort_order,
+        )
+        self.prefetch_ring.schedule(self.path_index.path_nodes_store.current_pathnode())
+
+    def cb_current_pathnode_changed(self, current_changed):
+        """
+        callback for files added to or removed from the current PathNode
+        while viewing it
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), current_changed))
+
+        _pathnode = self.path_index.path_nodes_store.current_pathnode()
+
+        if current_changed and len(_pathnode):
+            # Display the file that took its position:
+            self.cb_path_seek_generic(0, os.SEEK_CUR)
+        else:
+            self.prefetch_ring.schedule(_pathnode)
+
     def cb_path_seek(self, delta):
         """callback to perform a path_seek"""
         wdebug("# %s:%s(%s)" % (self.__class__, callee(), delta))
@@ -256,15 +440,33 @@ class Callbacks:
         # Backup core configuration:
         self.persistence.dump(self.config)
 
+        # StageTimings()
+        if self.stats_dump:
+            try:
+                StageTimings().dump(self.stats_dump)
+            except IOError as exc:
+                debug("IOError(%s): %s while writing: %s" % (exc.errno, exc.strerror, self.stats_dump))
+
+        # DecodeWorkerPool(): don't wait for a decode nobody will look at
+        self.pbl.decode_pool.shutdown()
+
+        # NodePrepopulator(): same for a node population
+        self.path_index.prepopulator.shutdown()
+        # WarmNodePool(): let evictions in progress complete
+        self.path_index.warm_node_pool.shutdown()
+
         self.path_index.__del__()
         Gtk.main_quit()
         self.lock.release()
         sys.exit(0)
 
-    def cb_area_closed(self, pixbuf_loader):
+    def cb_area_closed(self, pixbuf_loader, load_token=None):
         """callback triggered when PixbufLoader has finished reading its data stream"""
         gdebug("# %s:%s(%s)" % (self.__class__, callee(), pixbuf_loader))
 
+        if load_token and load_token.cancelled:
+            return
+
         # Update timer
         self.pbl.time_stop = time.time()
 
@@ -273,19 +475,35 @@ class Callbacks:
         ydebug("Average Loading time = %s" % str(self.pbl.time_load_average.compute_average()))
         ydebug("Current Loading time = %s" % str(self.pbl.time_stop - self.pbl.time_start))
 
-        # final commit
+        # final commit, superseding any pending one:
+        self.pbl.repaint_scheduler.cancel()
+        ydebug(
+            "Repaints issued = %s, coalesced = %s"
+            % (self.pbl.repaint_scheduler.commits_issued, self.pbl.repaint_scheduler.commits_coalesced)
+        )
+        self.image_display.raw_pixbuf_complete = not self.pbl.errors
         self.display_state.state_commit()
+        self.pbl.mark_first_paint()
+        ydebug("Average time to first paint = %s" % str(self.pbl.time_first_paint_average.compute_average()))
 
         # DisplayState
         self.render_state = 2
 
+        # PrefetchRing(): keep the decoded image, and prepare the next ones
+        if not self.pbl.errors:
+            _full_sizes_t = None
+            if self.image_display.raw_pixbuf_reduced:
+                _full_sizes_t = (self.source_image.full_width, self.source_image.full_height)
+            self.prefetch_ring.store(self.source_image.imagefile, self.image_display.raw_pixbuf, _full_sizes_t)
+        self.prefetch_ring.schedule(self.path_index.path_nodes_store.current_pathnode())
+
         # Plugins()
         self.plugins.plugins_hooks_on_event_generic("on_image_load_complete")
 
         if self.display_state.zoom:
             self.plugins.plugins_hooks_on_event_generic("on_zoom_performed")
 
-    def cb_area_updated(self, pixbuf_loader, x_ofst, y_ofst, width, heigth):
+    def cb_area_updated(self, pixbuf_loader, x_ofst, y_ofst, width, heigth, load_token=None):
         """
         Triggered when PixbufLoader has gathered a new chunk of data
 
@@ -295,130 +513,70 @@ class Callbacks:
             y_ofst:  Int, Y offset of upper-left corner of the updated area.
             width:  Int, Width of updated area.
             heigth:  Int, Height of updated area.
+            load_token:  <LoadToken>, identifies the load emitting the signal.
 
         Returns:    Bool
         """
+        if load_token and load_token.cancelled:
+            return False
+
+        if self.render_state not in (0, 1):
+            wdebug("cb_area_updated received state: %s" % self.render_state)
+            raise RuntimeError("render_state has unexpected value: %s" % str(self.render_state))
+
+        # RepaintScheduler(): the display is refreshed at most once per frame
+        # interval, see cb_repaint():
+        self.pbl.repaint_scheduler.area_updated(x_ofst, y_ofst, width, heigth)
+        return True
+
+    def cb_repaint(self, dirty_t):
+        """
+        RepaintScheduler commit: display what has been decoded so far
 
-        if self.source_image.prominent_axis == "x":
-            ref = x_ofst
-        else:
-            ref = y_ofst
-
-        if ref in self.pbl.breakpoints_render_tuple or (ref + 1 in self.pbl.breakpoints_render_tuple):
-            if not self.display_state.render_pass:
-                self.lock.acquire()
-                self.display_state.render_pass = 0
-                self.lock.release()
-
-            # Multiple passes detection:
-            if ref <= self.pbl.breakpoints_render_tuple[0]:
-                self.render_first_block_updated += 1
-
-            if self.render_first_block_updated > 1 and (ref < self.pbl.breakpoints_render_tuple[-2:][0]):
-                # Allow only last updates from progressive images updates seqs:
-                self.display_state.render_pass += 1
-                ydebug("N-1 first blocks of secondary prog. seq. " + "skipped (ref:%s)" % ref)
-                return True
-
-            elif 1 < self.display_state.render_pass <= 7:
-                debug("progressive chunk accepted at pass, ref = %s, %s" % (self.display_state.render_pass, ref))
-
-            elif self.display_state.render_pass > 7:
-                rdebug(
-                    "REJECT: render_pass %s is over "
-                    % (str(self.display_state.render_pass) + "the 7 limit. Wait for last event")
-                )
-                return
-
-            # Continue, normal or progressive images treated the same:
-            if self.render_state not in (0, 1):
-                wdebug("cb_area_updated received state: %s" % self.render_state)
-                raise RuntimeError("render_state has unexpected value: %s" % str(self.render_state))
-
-            # It's now useful to flag rendering as updated:
-            # DisplayState()
-            self.render_state = 1
-
-            debug("render : committed")
-            self.display_state.state_commit()
-
-            self.pbl.breakpoint_pos += 1
-            if Gtk.events_pending():
-                Gtk.main_iteration()
-
-            # Only debug on breakpoints, to avoid clutter output with hundreds
-            # of lines:
-            gdebug(
-                "# %s:%s(%s,%s,%s,%s,%s)"
-                % (
-                    self.__class__,
-                    callee(),
-                    pixbuf_loader,
-                    x_ofst,
-                    y_ofst,
-                    width,
-                    heigth,
-                )
-            )
+        Args:
+            dirty_t:  (x1, y1, x2, y2), area updated since the previous commit.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), str(dirty_t)))
 
-            return True
+        # It's now useful to flag rendering as updated:
+        # DisplayState()
+        self.render_state = 1
+
+        self.display_state.state_commit()
+        self.pbl.mark_first_paint()
 
-    def cb_area_prepared(self, pixbuf_loader):
+    def cb_area_prepared(self, pixbuf_loader, load_token=None):
         """
         Trigerred once PixbufLoader contains enough data to determine pixbuf
         size and type, allowing to prepare the display area.
 
         Args:
             pixbuf_loader: <GdkPixbufLoader>
+            load_token: <LoadToken>, identifies the load emitting the signal.
 
         Returns:
             Bool
         """
         gdebug("# %s:%s(%s)" % (self.__class__, callee(), pixbuf_loader))
+
+        if load_token and load_token.cancelled:
+            return False
         # Note: using received pixbuf_loader instead of self.pixbuf_loader
         # helps reducing the coupling, a little.
 
-        # Dimensions:
-        self.source_image.width = pixbuf_loader.get_pixbuf().get_property("width")
-        self.source_image.height = pixbuf_loader.get_pixbuf().get_property("height")
-
-        # Orientation:
-        self.source_image.orientation = Utils.orientation_from_sizes(self.source_image.width, self.source_image.height)
-
-        if self.source_image.orientation == "landscape":
-            self.source_image.prominent_axis = "x"
-
-        elif self.source_image.orientation == "portrait":
-            self.source_image.prominent_axis = "y"
-
-        elif self.source_image.orientation == "square":
-            self.source_image.prominent_axis = "x"
-        else:
-            raise RuntimeError("unhandled orientation")
-
-        self.pbl.gen_render_breakpoints()
+        self._register_source_sizes(*pixbuf_loader.get_pixbuf().get_properties("width", "height"))
 
         # It's now useful to flag rendering as prepared:
         # DisplayState()
         self.lock.acquire()  # asynchronous ops. must make us careful
-
         self.render_state = 0
-        self.render_first_block_updated = 0
-
-        # And flag as first pass:
-        if not self.display_state.render_pass:
-            self.display_state.render_pass = 0
-        else:
-            self.display_state.render_pass += 1
         self.lock.release()
-        debug("render_pass = %s" % self.display_state.render_pass)
 
         # Get main_window, scroll, image etc. resize/scale using the
         # DisplayState() front:
         self.display_state.state_commit()
 
         # ImageDisplay()
-        # Override breakpoints system for this initial state only:
         self.image_display.update_raw_pixbuf(pixbuf_loader.get_pixbuf())
 
         return True
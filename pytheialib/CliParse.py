@@ -6,6 +6,7 @@ CliParse
 import argparse
 
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.SortOrder import SortOrder
 
 
 class CliParse:
@@ -37,6 +38,37 @@ class CliParse:
 
     --no-plugins    Disable loading of plugins
 
+    --prefetch-ahead N      Decode N following images in advance
+    --prefetch-behind M     Decode M preceding images in advance
+    --feed-chunk-size BYTES Stream images to the decoder by chunks (0: whole files)
+    --decode-to-fit Decode images at their display size, not at full resolution
+    --tiled-threshold-mpx MPX  Zoom images of MPX megapixels or more by tiles (0: never)
+    --repaint-interval-ms MS   Refresh partially decoded images at most every MS ms
+    --decode-engine ENGINE     progressive (default): decode in the main loop,
+                               threaded: decode on a background thread
+    --stats-dump PATH          Write per-stage load timings to PATH, as JSON, on quit
+    --streaming-scan           When started from a file, display it before its
+                               directory is fully scanned
+    --no-listing-cache         Always scan directories, and list RAR and 7z
+                               archives, ignoring cached listings
+    --sort ORDER               Order of files: name (default), natural, mtime,
+                               size or exif (capture date)
+    --reverse                  Reverse the order of files
+    --watch                    Follow files added to and removed from the
+                               directories being viewed
+    --prepopulate-distance N   Prepare the next (or previous) directory or
+                               archive in the background, N files before
+                               reaching it (0: never)
+    --warm-nodes K             Keep the K directories or archives left last
+                               ready, for going back to them (0: none)
+    --warm-memory-mb MB        Memory budget of these, for their listings
+    --warm-disk-mb MB          Disk budget of these, for extracted files
+    --shuffle                  Show files in random order, across all the
+                               directories and archives, all listed first
+    --shuffle-seed N           Seed of this order, for it to be reproduced
+    --archive-readahead K      Extract RAR and 7z members K at a time, ahead
+                               of the current one (0: one at a time)
+
     """
 
     def __init__(self, command_line=None):
@@ -103,6 +135,157 @@ class CliParse:
             help="Recurse into directories",
         )
 
+        self.parser.add_argument(
+            "--prefetch-ahead",
+            type=int,
+            default=2,
+            metavar="N",
+            help="Number of following images decoded in advance (0 disables)",
+        )
+
+        self.parser.add_argument(
+            "--prefetch-behind",
+            type=int,
+            default=1,
+            metavar="M",
+            help="Number of preceding images decoded in advance (0 disables)",
+        )
+
+        self.parser.add_argument(
+            "--feed-chunk-size",
+            type=int,
+            default=65536,
+            metavar="BYTES",
+            help="Feed images to the decoder by chunks of BYTES (0 feeds whole files at once)",
+        )
+
+        self.parser.add_argument(
+            "--decode-to-fit",
+            action="store_true",
+            default=False,
+            help="Decode images at display size; full resolution is loaded on zoom",
+        )
+
+        self.parser.add_argument(
+            "--tiled-threshold-mpx",
+            type=float,
+            default=40,
+            metavar="MPX",
+            help="Zoom images of MPX megapixels or more by tiles (0 disables)",
+        )
+
+        self.parser.add_argument(
+            "--repaint-interval-ms",
+            type=int,
+            default=33,
+            metavar="MS",
+            help="Refresh the display at most every MS milliseconds while decoding",
+        )
+
+        self.parser.add_argument(
+            "--decode-engine",
+            choices=("progressive", "threaded"),
+            default="progressive",
+            help="Decode images progressively in the main loop, or on a background thread",
+        )
+
+        self.parser.add_argument(
+            "--stats-dump",
+            default=None,
+            metavar="PATH",
+            help="Write per-stage load timings (p50/p95/p99) to PATH, as JSON, on quit",
+        )
+
+        self.parser.add_argument(
+            "--streaming-scan",
+            action="store_true",
+            default=False,
+            help="Display the file given first while its directory is scanned in the background",
+        )
+
+        self.parser.add_argument(
+            "--no-listing-cache",
+            action="store_true",
+            default=False,
+            help="Don't use nor store cached directory and RAR/7z archive listings",
+        )
+
+        self.parser.add_argument(
+            "--sort",
+            choices=SortOrder.ORDERS,
+            default="name",
+            help="Order of files: by name, natural (page2 before page10), mtime, size or EXIF capture date",
+        )
+
+        self.parser.add_argument(
+            "--reverse",
+            action="store_true",
+            default=False,
+            help="Reverse the order of files",
+        )
+
+        self.parser.add_argument(
+            "--watch",
+            action="store_true",
+            default=False,
+            help="Follow files added to, removed from or renamed in the directories being viewed",
+        )
+
+        self.parser.add_argument(
+            "--prepopulate-distance",
+            type=int,
+            default=5,
+            metavar="N",
+            help="Open the next or previous archive or directory in the background N files ahead (0 disables)",
+        )
+
+        self.parser.add_argument(
+            "--warm-nodes",
+            type=int,
+            default=2,
+            metavar="K",
+            help="Keep the K archives or directories left last ready, for going back to them (0 disables)",
+        )
+
+        self.parser.add_argument(
+            "--warm-memory-mb",
+            type=int,
+            default=64,
+            metavar="MB",
+            help="Memory budget of the archives or directories kept ready, for their listings",
+        )
+
+        self.parser.add_argument(
+            "--warm-disk-mb",
+            type=int,
+            default=1024,
+            metavar="MB",
+            help="Disk budget of the archives kept ready, for their extracted files",
+        )
+
+        self.parser.add_argument(
+            "--shuffle",
+            action="store_true",
+            help="Show files in random order, across all the archives and directories. All of them are listed "
+            "first, to count their files: at startup with this option, in the background when toggled while viewing",
+        )
+
+        self.parser.add_argument(
+            "--shuffle-seed",
+            type=int,
+            default=None,
+            metavar="N",
+            help="Seed of the random order, for it to be reproduced (default: random)",
+        )
+
+        self.parser.add_argument(
+            "--archive-readahead",
+            type=int,
+            default=8,
+            metavar="K",
+            help="Extract the next K members of RAR and 7z archives in a single run (0: one at a time)",
+        )
+
         # Deal with the remaining. Expecting start path/file/archive:
         self.parser.add_argument("remainders", nargs=argparse.REMAINDER)
 
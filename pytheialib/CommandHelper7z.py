@@ -4,17 +4,37 @@ CommandHelper7z
 """
 
 import os
+import shutil
+import subprocess
+import tempfile
+import time
 
+from pytheialib.ArchiveIndex import ArchiveIndex
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.DiskCache import DiskCache
+from pytheialib.ExtractedBytes import ExtractedBytes
 
 
 class CommandHelper7z:
     """
     Wrappers around external '7z' command invocation
 
+    Parsed listings are cached on disk, keyed by archive path, and used as
+    long as the archive size and mtime are unchanged, so that entering an
+    archive again, even in another run, doesn't run 7z to list it.
     """
 
-    def __init__(self, archive, command_path=None):
+    # Parsed listings ('meta', 'listing', 'index'), kept across runs:
+    listing_cache = DiskCache("7z_listings")
+
+    # Archives modified more recently than this, in seconds, aren't cached,
+    # as they may still be being written:
+    LISTING_CACHE_MIN_AGE = 2
+
+    # Bumped when what cached listings hold changes:
+    LISTING_FORMAT = 1
+
+    def __init__(self, archive, command_path=None, use_listing_cache=True):
         gdebug("# %s:%s(%s, %s)" % (self.__class__, callee(), archive, str(command_path)))
 
         if command_path:
@@ -26,6 +46,7 @@ class CommandHelper7z:
             raise ValueError("Archive: %s does not exist" % str(archive))
 
         self.archive = archive
+        self.use_listing_cache = use_listing_cache  # Bool
         self.l_slt_out_l = None
         self.akeys = (
             "Path",
@@ -42,14 +63,18 @@ class CommandHelper7z:
             "Path",
             "Folder",
             "Size",
+            "Modified",
             "Solid",
             "Packed Size",
             "Attributes",
             "Encrypted",
+            "CRC",
+            "Method",
         )
         self.meta = {}
         self.item = {}
         self.listing = []
+        self.index = ArchiveIndex()
 
     def _gen_meta(self):
         """Generate and store meta informations for the registered achive"""
@@ -69,6 +94,54 @@ class CommandHelper7z:
 
         ret.close()
 
+    def extract_files_as(self, members_destinations, staging_dir):
+        """
+        Extract several members in a single 7z run, which reads the archive
+        headers, and decompresses solid blocks, once for all of them.
+
+        'members_destinations' is a list of (member, destination file)
+        tuples. Members are extracted under a staging directory created in
+        'staging_dir', then moved to their destination with os.replace(),
+        so that a destination file is complete once it exists. 'staging_dir'
+        must be on the destinations file system. Only regular files found
+        within the staging directory are moved: members names come from the
+        archive, and may be absolute, or hold '..' parts or symbolic links.
+
+        Returns the list of members actually extracted.
+        """
+        gdebug("# %s:%s(%s members)" % (self.__class__, callee(), len(members_destinations)))
+
+        _staging = tempfile.mkdtemp(prefix=".batch_", dir=staging_dir)
+        _extracted = []
+
+        try:
+            # -spd: members names aren't wildcards; --: nor switches
+            _command = [self.cmd_7z, "x", "-y", "-spd", "-o" + _staging, self.archive, "--"]
+            _command.extend(_member for _member, _destination in members_destinations)
+            debug("subprocess.run() -> %s" % _command)
+            subprocess.run(_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+
+            _staging_real = os.path.realpath(_staging)
+            for _member, _destination in members_destinations:
+                _staged = os.path.realpath(os.path.join(_staging, _member))
+                if os.path.commonpath((_staging_real, _staged)) != _staging_real:
+                    debug("%s member name leads out of the staging directory: %s" % (self.archive, _member))
+                    continue
+
+                if os.path.isfile(_staged):
+                    _size = os.path.getsize(_staged)
+                    os.replace(_staged, _destination)
+                    ExtractedBytes.add(_destination, _size)
+                    _extracted.append(_member)
+
+        except OSError as exc:
+            debug("batch extraction from %s failed: %s" % (self.archive, exc))
+
+        finally:
+            shutil.rmtree(_staging, ignore_errors=True)
+
+        return _extracted
+
     def _dump_item(self):
         """Extract informations from the item being parsed to self.listing"""
         if not self.item:
@@ -82,14 +155,80 @@ class CommandHelper7z:
 
         else:
             self.listing.append(self.item["Path"])
+            self._index_item()
+
+    @staticmethod
+    def _int_value(value, base=10):
+        """Returns 'value', an item field, as Int, or -1"""
+        try:
+            return int(value, base)
+        except (TypeError, ValueError):
+            return -1
+
+    def _index_item(self):
+        """Add the metadata of the item being parsed to self.index"""
+        try:
+            _mtime = time.mktime(time.strptime(self.item["Modified"][:19], "%Y-%m-%d %H:%M:%S"))
+        except (KeyError, ValueError, OverflowError):
+            _mtime = 0.0
+
+        self.index.add(
+            self.item["Path"],
+            self._int_value(self.item.get("Size")),
+            self._int_value(self.item.get("Packed Size")),
+            crc=self._int_value(self.item.get("CRC"), 16),
+            mtime=_mtime,
+            method=self.item.get("Method") or None,
+        )
+
+    def _listing_validator(self):
+        """
+        Returns what a cached listing of the archive must have been stored
+        with to be used: its size and mtime. None if the listing cache must
+        not be used.
+        """
+        if not self.use_listing_cache:
+            return None
+
+        try:
+            _stat = os.stat(self.archive)
+        except OSError:
+            return None
+
+        if time.time() - _stat.st_mtime < self.LISTING_CACHE_MIN_AGE:
+            return None
+
+        return _stat.st_size, _stat.st_mtime_ns, self.LISTING_FORMAT
 
     def parse_tech_listing(self):
         """
         Parse output of archive listing produced by 7z binary with -slt option
         to 'self.listing' - this also distinguish directories by appending
         an os.path.sep character to the end of their name.
+
+        The result is taken from the listing cache when possible.
         """
         gdebug(f"# {self.__class__}:{callee()}")
+
+        _key = os.path.abspath(self.archive)
+        _validator = self._listing_validator()
+        if _validator is not None:
+            _cached = self.listing_cache.get(_key, _validator)
+            if _cached is not None:
+                debug("cached listing used for %s" % self.archive)
+                self.meta, self.listing, self.index = _cached
+                return
+
+        self._parse_tech_listing()
+
+        if _validator is not None:
+            self.listing_cache.set(_key, _validator, (self.meta, self.listing, self.index))
+
+    def _parse_tech_listing(self):
+        """
+        Run 7z to list the archive, and parse its output (see
+        parse_tech_listing())
+        """
         self._gen_meta()
         context = None
 
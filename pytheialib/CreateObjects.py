@@ -15,6 +15,7 @@ import threading
 
 from .Callbacks import Callbacks
 from .CliParse import CliParse
+from .DecodeWorkerPool import DecodeWorkerPool
 from .Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
 from .DisplayState import DisplayState
 from .ImageDisplay import ImageDisplay
@@ -26,10 +27,14 @@ from .PathNodeFactory import PathNodeFactory
 from .Persistence import Persistence
 from .Platform import Platform
 from .Plugins import Plugins
+from .PrefetchRing import PrefetchRing
 from .ProgressivePixbufLoader import ProgressivePixbufLoader
+from .RepaintScheduler import RepaintScheduler
 from .Screen import Screen
+from .SortOrder import SortOrder
 from .SourceImage import SourceImage
 from .SupportingPool import SupportingPool
+from .TiledRenderer import TiledRenderer
 from .TreeStore import TreeStore
 
 
@@ -86,11 +91,13 @@ class CreateObjects:
         self.pyi.platform = None  # <Platform>
         self.pyi.plugins = None  # <Plugins>
         self.pyi.pbl = None  # <ProgressivePixbufLoader>
+        self.pyi.prefetch_ring = None  # <PrefetchRing>
         self.pyi.persistence = None  # <Persistence>
         self.pyi.keybindings = None  # <Keybindings>
         self.pyi.notifications = None  # <Notifications>
         self.pyi.screen = None  # <Screen>
         self.pyi.source_image = None  # <SourceImage>
+        self.pyi.sort_order = None  # <SortOrder>
         self.pyi.supporting_pool = None  # Dict
         self.pyi.lock = None  # <threading.Lock>
 
@@ -129,10 +136,14 @@ class CreateObjects:
         self.pyi.cli_parse.initialize("Pytheia image viewer")
         self.pyi.cli_parse.parse(self.pyi.command_line)
 
+        # SortOrder():
+        self.pyi.sort_order = SortOrder(self.pyi.cli_parse.get("sort"), self.pyi.cli_parse.get("reverse"))
+
         # PathNodesFactory():
         self.pyi.path_nodes_factory = PathNodeFactory()
         self.pyi.path_nodes_factory.platform = self.pyi.platform
         self.pyi.path_nodes_factory.cli_parse = self.pyi.cli_parse
+        self.pyi.path_nodes_factory.sort_order = self.pyi.sort_order
 
         # SupportingPool():
         self.pyi.supporting_pool = SupportingPool()
@@ -149,6 +160,7 @@ class CreateObjects:
         self.pyi.path_index.callbacks = self.pyi.callbacks
         self.pyi.path_index.platform = self.pyi.platform
         self.pyi.path_index.cli_parse = self.pyi.cli_parse
+        self.pyi.path_index.sort_order = self.pyi.sort_order
 
         self.pyi.supporting_pool.path_index = self.pyi.path_index
         self.pyi.path_index.path_nodes_factory = self.pyi.path_nodes_factory
@@ -162,6 +174,11 @@ class CreateObjects:
         # that can be used for display):
         self.pyi.path_index.path_nodes_store.seek_first_pathnode()
 
+        # Start from the first file of the shuffled sequence:
+        if self.pyi.cli_parse.get("shuffle"):
+            self.pyi.path_index.set_shuffle(True, self.pyi.cli_parse.get("shuffle_seed"))
+            self.pyi.path_index.seek_shuffled(0)
+
         # TreeStore().
         # To be instantiated by caller. Allow multiple instances
         self.pyi.tree_store = TreeStore  # FIXME: provide a Factory here instead // unused in self.pyi
@@ -200,6 +217,12 @@ class CreateObjects:
         self.pyi.image_display.display_state = self.pyi.display_state
         self.pyi.display_state.screen = self.pyi.screen
 
+        # TiledRenderer():
+        self.pyi.display_state.tiled_renderer = TiledRenderer()
+        self.pyi.display_state.tiled_renderer.threshold_pixels = int(
+            self.pyi.cli_parse.get("tiled_threshold_mpx") * 1000 * 1000
+        )
+
         # change defaults values based on command line:
         if self.pyi.cli_parse.get("fullscreen"):
             self.pyi.display_state.fullscreen = True
@@ -212,6 +235,7 @@ class CreateObjects:
         self.pyi.callbacks.display_state = self.pyi.display_state
         self.pyi.callbacks.source_image = self.pyi.source_image
         self.pyi.callbacks.lock = self.pyi.lock
+        self.pyi.callbacks.stats_dump = self.pyi.cli_parse.get("stats_dump")
         self.pyi.path_index.callbacks = self.pyi.callbacks
 
         # Notifications()
@@ -282,6 +306,29 @@ class CreateObjects:
         self.pyi.pbl.image_display = self.pyi.image_display
         self.pyi.pbl.image_display_widget = self.pyi.image_display_widget
         self.pyi.pbl.platform = self.pyi.platform
+        self.pyi.pbl.feed_chunk_size = self.pyi.cli_parse.get("feed_chunk_size")
+        self.pyi.pbl.decode_to_fit = self.pyi.cli_parse.get("decode_to_fit")
+        self.pyi.pbl.display_state = self.pyi.display_state
+
+        # DecodeWorkerPool():
+        self.pyi.pbl.decode_engine = self.pyi.cli_parse.get("decode_engine")
+        self.pyi.pbl.decode_pool = DecodeWorkerPool()
+
+        # RepaintScheduler():
+        self.pyi.pbl.repaint_scheduler = RepaintScheduler()
+        self.pyi.pbl.repaint_scheduler.interval_ms = self.pyi.cli_parse.get("repaint_interval_ms")
+        self.pyi.pbl.repaint_scheduler.commit = self.pyi.callbacks.cb_repaint
+
+        # PrefetchRing():
+        self.pyi.prefetch_ring = PrefetchRing()
+        self.pyi.prefetch_ring.set_depth(
+            self.pyi.cli_parse.get("prefetch_ahead"),
+            self.pyi.cli_parse.get("prefetch_behind"),
+        )
+        self.pyi.prefetch_ring.decode_to_fit = self.pyi.cli_parse.get("decode_to_fit")
+        self.pyi.prefetch_ring.readahead = self.pyi.cli_parse.get("archive_readahead")
+        self.pyi.prefetch_ring.display_state = self.pyi.display_state
+        self.pyi.callbacks.prefetch_ring = self.pyi.prefetch_ring
 
         # Plugins():
         # Add this shortcut to the methods exposed to plug-ins:
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+DecodeWorkerPool
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import gi  # pylint: disable=import-error
+from gi.repository import GdkPixbuf, GLib  # pylint: disable=import-error
+
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.StageTimings import StageTimings
+
+
+class DecodeWorkerPool:
+    """
+    Read and decode image files, or archive members, on background threads.
+
+    Results are handed over to the main loop using GLib.idle_add(), so that
+    callbacks can safely touch widgets and the rest of the application state.
+    """
+
+    def __init__(self, num_worker_threads=1):
+        self.num_worker_threads = num_worker_threads  # Int
+        self.executor = None  # <ThreadPoolExecutor>
+
+    def _get_executor(self):
+        """
+        Returns the thread pool, starting it on first use
+        """
+        if not self.executor:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.num_worker_threads,
+                thread_name_prefix="pytheia-decode",
+            )
+        return self.executor
+
+    @staticmethod
+    def decode_path(path, fit=None):
+        """
+        Decode the image file at `path`. Returns a tuple: (pixbuf, full sizes),
+        full sizes being None unless the image was decoded smaller than its
+        dimensions to fit `fit`, a (target sizes method, area sizes) tuple as
+        returned by DisplayState.fit_target_method().
+        """
+        if fit:
+            _info = GdkPixbuf.Pixbuf.get_file_info(path)
+            if _info and _info[0]:
+                _full_sizes_t = (_info[1], _info[2])
+                _target = fit[0](fit[1], _full_sizes_t)
+                if 0 < _target[0] < _full_sizes_t[0] and 0 < _target[1] < _full_sizes_t[1]:
+                    return GdkPixbuf.Pixbuf.new_from_file_at_size(path, *_target), _full_sizes_t
+
+        return GdkPixbuf.Pixbuf.new_from_file(path), None
+
+    @staticmethod
+    def decode_data(data, fit=None):
+        """
+        Decode the image file content `data` (bytes), as decode_path() does
+        for a path. Returns a tuple: (pixbuf, full sizes).
+        """
+        _loader = GdkPixbuf.PixbufLoader()
+        _full_sizes = []
+
+        def size_prepared(loader, width, height):
+            """Decode at the size fitting `fit`, when smaller"""
+            _target = fit[0](fit[1], (width, height))
+            if 0 < _target[0] < width and 0 < _target[1] < height:
+                _full_sizes.append((width, height))
+                loader.set_size(*_target)
+
+        if fit:
+            _loader.connect("size-prepared", size_prepared)
+
+        try:
+            _loader.write(data)
+        except GLib.GError:  # pylint: disable=catching-non-exception
+            try:
+                _loader.close()
+            except GLib.GError:  # pylint: disable=catching-non-exception
+                pass
+            raise
+        _loader.close()
+
+        return _loader.get_pixbuf(), (_full_sizes[0] if _full_sizes else None)
+
+    @staticmethod
+    def read_member(item):
+        """
+        Returns the content of archive member `item` (*ItemCacheable), read
+        out of its archive without extracting it to the cache directory,
+        through an archive handle private to the calling thread.
+        """
+        # Members only extracted by external commands (RAR) record their
+        # "extract" stage while opened:
+        with item.open_stream(own_handle=True) as _stream:
+            with StageTimings().measure("read"):
+                return _stream.read()
+
+    def submit(self, source, fit, callback, *user_data):
+        """
+        Have `source` decoded by a worker, then call, from the main loop:
+        callback(pixbuf, full_sizes_t, error, *user_data). `source` is a path
+        (see decode_path()), or an archive member *ItemCacheable, read by the
+        worker (see read_member()). `error` is the exception raised by the
+        reader or the decoder, if any.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), source))
+
+        self._get_executor().submit(self._decode_then_handoff, source, fit, callback, user_data)
+
+    def _decode_then_handoff(self, source, fit, callback, user_data):
+        """
+        Worker side of submit()
+        """
+        _pixbuf, _full_sizes_t, _error = None, None, None
+        try:
+            if isinstance(source, str):
+                # Reading can't be told apart from decoding here:
+                with StageTimings().measure("decode"):
+                    _pixbuf, _full_sizes_t = self.decode_path(source, fit)
+            else:
+                _data = self.read_member(source)
+                with StageTimings().measure("decode"):
+                    _pixbuf, _full_sizes_t = self.decode_data(_data, fit)
+        except Exception as exc:  # pylint: disable=broad-except
+            # Archive backends raise their own errors (ie: BadZipFile):
+            _error = exc
+
+        GLib.idle_add(self._handoff, callback, _pixbuf, _full_sizes_t, _error, user_data)
+
+    @staticmethod
+    def _handoff(callback, pixbuf, full_sizes_t, error, user_data):
+        """
+        Idle callback: forward a worker result to its callback
+        """
+        callback(pixbuf, full_sizes_t, error, *user_data)
+        return False
+
+    def shutdown(self):
+        """
+        Stop the workers, without waiting for a decode in progress
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+DirectoryWatcher
+"""
+
+import gi  # pylint: disable=import-error
+from gi.repository import Gio, GLib  # pylint: disable=import-error
+
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+
+class DirectoryWatcher:
+    """
+    Follow the files added to and removed from a directory.
+
+    Relies on a Gio.FileMonitor (inotify on Linux), which emits its events
+    from the main loop. Events are coalesced for `batch_delay_ms` into sets
+    of added and removed paths, and handed over to `callback(added,
+    removed)`, so that a burst of files landing in the directory causes a
+    single update. A file modified in place is reported as added again, for
+    its figures (ie: size) to be refreshed.
+    """
+
+    def __init__(self, directory, callback):
+        self.directory = directory  # Str (path)
+        self.callback = callback  # callable(added, removed), sets of paths
+        self.batch_delay_ms = 200  # Int, milliseconds
+        self.monitor = None  # <Gio.FileMonitor>
+        self.handler_id = None  # Int, "changed" signal handler id
+        self.source_id = None  # Int, GLib source id of the pending flush
+        self.added = set()  # {Str}
+        self.removed = set()  # {Str}
+
+    def start(self):
+        """
+        Start watching 'directory'. Returns False if it can't be watched.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), self.directory))
+
+        try:
+            self.monitor = Gio.File.new_for_path(self.directory).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None
+            )
+        except GLib.Error as exc:
+            debug("can't watch %s: %s" % (self.directory, exc))
+            self.monitor = None
+            return False
+
+        self.handler_id = self.monitor.connect("changed", self._on_changed)
+        return True
+
+    def stop(self):
+        """
+        Stop watching, dropping changes not handed over yet
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), self.directory))
+
+        if self.source_id:
+            GLib.source_remove(self.source_id)
+            self.source_id = None
+
+        if self.monitor:
+            self.monitor.disconnect(self.handler_id)
+            self.monitor.cancel()
+            self.monitor = None
+
+        self.added = set()
+        self.removed = set()
+
+    def _add(self, path):
+        """Record 'path' as added"""
+        self.removed.discard(path)
+        self.added.add(path)
+
+    def _remove(self, path):
+        """Record 'path' as removed"""
+        self.added.discard(path)
+        self.removed.add(path)
+
+    def _on_changed(self, monitor, gfile, other_gfile, event_type):  # pylint: disable=unused-argument
+        """
+        Gio.FileMonitor "changed" signal handler
+        """
+        _events = Gio.FileMonitorEvent
+
+        if event_type in (_events.CREATED, _events.MOVED_IN, _events.CHANGES_DONE_HINT):
+            self._add(gfile.get_path())
+
+        elif event_type in (_events.DELETED, _events.MOVED_OUT):
+            self._remove(gfile.get_path())
+
+        elif event_type == _events.RENAMED:
+            self._remove(gfile.get_path())
+            self._add(other_gfile.get_path())
+
+        else:
+            return
+
+        if not self.source_id:
+            self.source_id = GLib.timeout_add(self.batch_delay_ms, self.flush)
+
+    def flush(self):
+        """
+        Hand changes recorded so far over to 'callback'
+        """
+        self.source_id = None
+        _added, _removed = self.added, self.removed
+        self.added = set()
+        self.removed = set()
+
+        if _added or _removed:
+            debug("%s: %s added, %s removed" % (self.directory, len(_added), len(_removed)))
+            self.callback(_added, _removed)
+
+        return False
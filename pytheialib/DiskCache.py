@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+DiskCache
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.Platform import Platform
+
+
+class DiskCache:
+    """
+    Persistent key/value cache, one pickle file per key under
+    <pytheia_cache_dir>/<namespace>/.
+
+    Each value is stored along with a 'validator' (ie: the stat() figures
+    of what it was computed from), and is only returned for an equal one.
+    Writes are atomic, so that concurrent instances of Pytheia never read a
+    partial entry. Being a cache, any read or write error is logged and
+    treated as a miss.
+    """
+
+    # Bumped when the format of stored entries changes:
+    FORMAT_VERSION = 1
+
+    def __init__(self, namespace, cache_dir=None):
+        self.namespace = namespace  # Str
+        self.cache_dir = cache_dir  # Str (path), defaults to Platform().pytheia_cache_dir
+        self.hits = 0  # Int
+        self.misses = 0  # Int
+
+    def _get_dir(self):
+        """
+        Returns the directory holding this namespace entries
+        """
+        return os.path.join(self.cache_dir or Platform().pytheia_cache_dir, self.namespace)
+
+    def _get_path(self, key):
+        """
+        Returns the file path of the entry for 'key'
+        """
+        _digest = hashlib.md5(key.encode("utf-8", "surrogateescape")).hexdigest()
+
+        return os.path.join(self._get_dir(), _digest)
+
+    def get(self, key, validator):
+        """
+        Returns the value stored for 'key', or None if there's none, or if
+        it was stored with a different 'validator'.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), key))
+
+        try:
+            with open(self._get_path(key), "rb") as _fd:
+                _entry = pickle.load(_fd)
+
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        except Exception as exc:  # pylint: disable=broad-except
+            # Truncated, or stored by another version (ie: ImportError,
+            # TypeError, IndexError for classes since changed), any error is
+            # a miss, and the entry is dropped:
+            debug("unreadable %s cache entry for %s: %s" % (self.namespace, key, exc))
+            self.remove(key)
+            self.misses += 1
+            return None
+
+        # Key is checked as well, should two of them share a digest:
+        if not isinstance(_entry, tuple) or _entry[:3] != (self.FORMAT_VERSION, key, validator):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return _entry[3]
+
+    def set(self, key, validator, value):
+        """
+        Store 'value' for 'key', along with its 'validator'
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), key))
+
+        _path = self._get_path(key)
+        _tmp_path = None
+
+        try:
+            os.makedirs(os.path.dirname(_path), exist_ok=True)
+
+            _fd, _tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=os.path.dirname(_path))
+            with os.fdopen(_fd, "wb") as _tmp:
+                pickle.dump((self.FORMAT_VERSION, key, validator, value), _tmp, pickle.HIGHEST_PROTOCOL)
+
+            os.replace(_tmp_path, _path)
+
+        except OSError as exc:
+            debug("can't write %s cache entry for %s: %s" % (self.namespace, key, exc))
+            if _tmp_path and os.path.exists(_tmp_path):
+                os.remove(_tmp_path)
+            return False
+
+        return True
+
+    def remove(self, key):
+        """
+        Forget the value stored for 'key', if any
+        """
+        try:
+            os.remove(self._get_path(key))
+        except OSError:
+            pass
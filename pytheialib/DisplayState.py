@@ -3,10 +3,13 @@
 DisplayState
 """
 
+from collections import OrderedDict
+
 import gi # pylint: disable=import-error
 from gi.repository import GdkPixbuf, Gtk # pylint: disable=import-error
 
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.StageTimings import StageTimings
 from pytheialib.Utils import Utils
 
 # gi.require_version('Gdk', '3.0')
@@ -29,9 +32,11 @@ class DisplayState:
         self._fit_mode = None  # Str
         self.fullscreen = False  # Bool
         self.render_state = None  # Int
-        self.render_pass = None  # Int
-        self.render_first_block_updated = None  # Int
         self.zoom = None  # Float
+        self.scaled_pixbufs = OrderedDict()  # {(Str, Int, Int, Str, Int, Int, <InterpType>): <GdkPixbuf>}
+        self.scaled_pixbufs_capacity = 8  # Int
+        self.tiled_renderer = None  # <TiledRenderer>
+        self.tiled = False  # Bool, last commit rendered by tiles
 
     def set_config(self, value):
         """Setter for `config`."""
@@ -130,20 +135,120 @@ class DisplayState:
                 self.state_commit()
             # else, a state_commit will soon be performed, so do nothing
 
+    def fit_target_method(self):
+        """
+        Returns a tuple: (target sizes method, display area sizes) describing
+        how images are currently fitted to the display, or None in zoom mode,
+        where the displayed size doesn't depend on the display area.
+        """
+        _meths = {
+            "best": Utils.get_fit_best_sizes,
+            "width": Utils.get_fit_width_sizes,
+            "height": Utils.get_fit_height_sizes,
+        }
+        if self.fit_mode not in _meths:
+            return None
+
+        if self.fullscreen or self.config["fullscreen"]:
+            _area = (self.screen.screen_width, self.screen.screen_height)
+        else:
+            _area = self.image_display_widget.main_window_size or self.image_display_widget.get_main_window_size()
+
+        return _meths[self.fit_mode], _area
+
+    def fit_target_sizes(self, src_sizes_t):
+        """
+        Returns the (width, height) an image of `src_sizes_t` dimensions is
+        going to be displayed at, or None in zoom mode.
+        """
+        _fit = self.fit_target_method()
+        if not _fit:
+            return None
+
+        _meth, _area = _fit
+        return _meth(_area, src_sizes_t)
+
+    def _ensure_raw_covers(self, target_sizes_t):
+        """
+        `raw_pixbuf` may have been decoded smaller than the source image (see
+        ProgressivePixbufLoader.decode_to_fit): have the full resolution
+        decoded before scaling it up beyond its own dimensions.
+
+        While the reduced image is still streamed, this is left to the final
+        commit, as the loader can't be replaced from within its own signals.
+        The full resolution is decoded by a worker: the reduced image is
+        scaled up meanwhile, and replaced once it's ready.
+        """
+        if not self.image_display.raw_pixbuf_reduced or self.pbl.is_loading():
+            return
+
+        _slack = 2  # rounding of aspect ratio preserving sizes
+        _raw_w, _raw_h = self.image_display.raw_pixbuf.get_properties("width", "height")
+        if target_sizes_t[0] > _raw_w + _slack or target_sizes_t[1] > _raw_h + _slack:
+            debug("target %sx%s exceeds the reduced decode, loading full resolution" % target_sizes_t)
+            self.pbl.load_full_resolution(self._full_resolution_loaded)
+
+    def _full_resolution_loaded(self):
+        """
+        ProgressivePixbufLoader.load_full_resolution() callback: display the
+        full resolution in place of the reduced image
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if self.fit_mode == "zoom":
+            # Same displayed size, scaled from the full resolution this time:
+            self.zoom = 1
+        self.state_commit()
+
+    def _scale_raw(self, target_sizes_t, interp_method):
+        """
+        Returns `raw_pixbuf` scaled to `target_sizes_t`, reusing the result of
+        an identical scaling of the same complete image when there is one.
+        """
+        if not self.image_display.raw_pixbuf_complete:
+            # Still being decoded: its content changes between commits
+            return Utils.scale_pixbuf(self.image_display.raw_pixbuf, target_sizes_t, interp_method)
+
+        _key = (
+            self.source_image.imagefile,
+            *self.image_display.raw_pixbuf.get_properties("width", "height"),
+            self.fit_mode,
+            int(target_sizes_t[0]),
+            int(target_sizes_t[1]),
+            interp_method,
+        )
+        if _key in self.scaled_pixbufs:
+            self.scaled_pixbufs.move_to_end(_key)
+            bdebug("scaled pixbuf cache hit: %s" % str(_key))
+            return self.scaled_pixbufs[_key]
+
+        _pixbuf = Utils.scale_pixbuf(self.image_display.raw_pixbuf, target_sizes_t, interp_method)
+        self.scaled_pixbufs[_key] = _pixbuf
+        while len(self.scaled_pixbufs) > self.scaled_pixbufs_capacity:
+            self.scaled_pixbufs.popitem(last=False)
+
+        return _pixbuf
+
+    def scaled_pixbufs_clear(self):
+        """Forget about scaled versions of the current image"""
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        self.scaled_pixbufs.clear()
+
     def _fullscreen_scaled(self, target_sizes_meth):
         """FIXME: docstring required here"""
+        target_sizes_t = target_sizes_meth(
+            (
+                self.screen.screen_width,
+                self.screen.screen_height,
+            ),  # fit_sizes_t
+            (self.source_image.width, self.source_image.height),  # src_sizes_t
+        )
+        self._ensure_raw_covers(target_sizes_t)
+
         self.image_display.update_active_pixbuf(
-            Utils.scale_pixbuf(
-                # reference pixbuf:
-                self.image_display.raw_pixbuf,
-                # target sizes:
-                target_sizes_meth(
-                    (
-                        self.screen.screen_width,
-                        self.screen.screen_height,
-                    ),  # fit_sizes_t
-                    (self.source_image.width, self.source_image.height),  # src_sizes_t
-                ),
+            self._scale_raw(
+                target_sizes_t,
                 # interpolation method:
                 GdkPixbuf.InterpType.BILINEAR,
             ),
@@ -179,15 +284,15 @@ class DisplayState:
         """
         FIXME: missing doc for DisplayState._windowed_scale()
         """
+        target_sizes_t = target_sizes_meth(
+            self.image_display_widget.main_window_size,  # fit_sizes_t
+            self.image_display.raw_pixbuf.get_properties("width", "height"),  # src_sizes_t
+        )
+        self._ensure_raw_covers(target_sizes_t)
+
         self.image_display.update_active_pixbuf(
-            Utils.scale_pixbuf(
-                # reference pixbuf:
-                self.image_display.raw_pixbuf,
-                # target sizes:
-                target_sizes_meth(
-                    self.image_display_widget.main_window_size,  # fit_sizes_t
-                    self.image_display.raw_pixbuf.get_properties("width", "height"),  # src_sizes_t
-                ),
+            self._scale_raw(
+                target_sizes_t,
                 # interpolation method:
                 GdkPixbuf.InterpType.BILINEAR,
             ),
@@ -206,14 +311,27 @@ class DisplayState:
         # noinspection PyPep8
         _apply_factor = lambda t: (t[0] * _zoom_factor, t[1] * _zoom_factor)
 
-        if not self.image_display.active_pixbuf:
-            self.image_display.active_pixbuf = self.image_display.raw_pixbuf.copy()
+        if self.tiled_renderer.active:
+            _displayed_sizes_t = self.tiled_renderer.displayed_sizes()
+        elif self.image_display.active_pixbuf:
+            _displayed_sizes_t = self.image_display.active_pixbuf.get_properties("width", "height")
+        else:
+            _displayed_sizes_t = self.image_display.raw_pixbuf.get_properties("width", "height")
+
+        target_sizes_t = _apply_factor(_displayed_sizes_t)
+        self._ensure_raw_covers(target_sizes_t)
 
-        target_sizes_t = _apply_factor(self.image_display.active_pixbuf.get_properties("width", "height"))
+        # Huge images: only scale what is visible, see TiledRenderer
+        if self.image_display.raw_pixbuf_complete and self.tiled_renderer.accepts(self.image_display.raw_pixbuf):
+            self.tiled_renderer.render(
+                self.image_display.raw_pixbuf,
+                target_sizes_t[0] / self.image_display.raw_pixbuf.get_width(),
+            )
+            self.tiled = True
+            return
 
         self.image_display.update_active_pixbuf(
-            Utils.scale_pixbuf(
-                self.image_display.raw_pixbuf,  # reference pixbuf
+            self._scale_raw(
                 target_sizes_t,
                 GdkPixbuf.InterpType.BILINEAR,
             ),
@@ -241,6 +359,8 @@ class DisplayState:
         """commit pending changes to the display"""
         gdebug(f"# {self.__class__}:{callee()}")
 
+        self.tiled = False
+
         # Sanity checks:
         if not (self.config["main_window_width"]) and not (self.config["main_window_height"]):
             self.config["main_window_width"] = self.config["main_window_fallback_width"]
@@ -260,7 +380,15 @@ class DisplayState:
             self._state_commit_windowed()
 
         # Finally, apply changes on pixbuf to the visible image:
-        self.image_display_widget.main_image.set_from_pixbuf(self.image_display.active_pixbuf)
+        if self.tiled:
+            self.image_display_widget.show_tiled(self.tiled_renderer)
+            return
+
+        if self.tiled_renderer.active:
+            self.tiled_renderer.clear()
+        self.image_display_widget.show_main_image()
+        with StageTimings().measure("set_from_pixbuf"):
+            self.image_display_widget.main_image.set_from_pixbuf(self.image_display.active_pixbuf)
 
     def _state_commit_windowed(self):
         """
@@ -335,8 +463,9 @@ class DisplayState:
         """free resources set by display state"""
         gdebug(f"# {self.__class__}:{callee()}")
 
-        self.render_pass = None
-        self.render_first_block_updated = None
+        # TiledRenderer()
+        self.tiled_renderer.clear()
+        self.tiled = False
 
     def request_zoom_in(self):
         """request for a zoom-in on next commit"""
@@ -357,7 +486,12 @@ class DisplayState:
     def request_zoom_original_resolution(self):
         """request to zoom up/down to original resolution on next commit"""
         gdebug(f"# {self.__class__}:{callee()}")
-        self.image_display.active_pixbuf = self.image_display.raw_pixbuf.copy()
+        if self.image_display.raw_pixbuf_reduced:
+            # Requested again once the full resolution is decoded:
+            self.pbl.load_full_resolution(self.request_zoom_original_resolution)
+        # Zoom from the raw pixbuf dimensions, without copying it (see _zoom):
+        self.tiled_renderer.clear()
+        self.image_display.active_pixbuf = None
         self.zoom = 1
         self.fit_mode = "zoom"
         self.state_commit()
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+ExtractedBytes
+"""
+
+import os
+import threading
+
+
+class ExtractedBytes:
+    """
+    Bytes extracted so far to each directory (ie: PathNodes temporary
+    directories), accounted as archive members get extracted, so that the
+    disk footprint of a PathNode is known without walking its directory.
+
+    Counts are shared by all callers, and may be added from worker threads.
+    """
+
+    counts = {}  # {Str: Int}, bytes extracted by directory
+    lock = threading.Lock()  # guards 'counts'
+
+    @classmethod
+    def add(cls, path, nbytes):
+        """
+        Account 'nbytes' extracted to the file 'path'
+        """
+        _directory = os.path.dirname(path)
+
+        with cls.lock:
+            cls.counts[_directory] = cls.counts.get(_directory, 0) + nbytes
+
+    @classmethod
+    def get(cls, directory):
+        """
+        Returns the bytes extracted to 'directory' so far
+        """
+        with cls.lock:
+            return cls.counts.get(directory, 0)
+
+    @classmethod
+    def forget(cls, directory):
+        """
+        Forget about 'directory', being removed
+        """
+        with cls.lock:
+            cls.counts.pop(directory, None)
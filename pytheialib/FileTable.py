@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+FileTable
+"""
+
+import bisect
+import os
+import sys
+from array import array
+
+
+class FileTable:
+    """
+    Compact, list-like, sequence of file paths.
+
+    Paths are split in a directory prefix, interned and referenced by its
+    index, and a name. All names are stored in a single packed buffer,
+    delimited by an array of offsets, so that an entry costs a few bytes
+    over its name length, instead of a full str object and its reference.
+    Entries are rebuilt as str when accessed.
+
+    Supports len(), indexing and slicing, iteration, 'in', index(), append(),
+    extend() and sort(), which is what PathNodes expect from 'all_files'.
+
+    Per entry Float 'sort_keys' (ie: mtime, size, see <SortOrder>) may be
+    held along with the paths, and follow them through take() and permute().
+    Entries added without the keys the table holds get UNKNOWN values, which
+    missing_sort_keys() lists for them to be computed, see fill_sort_keys().
+    """
+
+    __slots__ = (
+        "prefixes",
+        "prefix_indexes",
+        "prefix_ids",
+        "names",
+        "offsets",
+        "is_sorted",
+        "sort_keys",
+        "stale_sort_keys",
+    )
+
+    UNKNOWN = float("nan")  # sort key value of entries added without it
+
+    def __init__(self, paths=(), sort_keys=None):
+        self.prefixes = []  # [Str], directory prefixes, separator included
+        self.prefix_indexes = {}  # {Str: Int}, positions in 'prefixes'
+        self.prefix_ids = array("I")  # prefix of each entry
+        self.names = bytearray()  # packed names, utf-8 encoded
+        self.offsets = array("Q", [0])  # entry i name is names[offsets[i]:offsets[i + 1]]
+        self.is_sorted = True  # Bool, allows index() to bisect
+        self.sort_keys = {}  # {Str: array("d")}, per entry values, by key name
+        self.stale_sort_keys = set()  # {Str}, keys having UNKNOWN values
+
+        self.extend(paths, sort_keys)
+
+    def __len__(self):
+        """Handles len() calls"""
+        return len(self.prefix_ids)
+
+    def _get(self, index):
+        """
+        Returns the path at 'index', a non negative Int
+        """
+        return self.prefixes[self.prefix_ids[index]] + self.names[
+            self.offsets[index] : self.offsets[index + 1]
+        ].decode("utf-8", "surrogateescape")
+
+    def __getitem__(self, index):
+        """Handles indexing and slicing"""
+        if isinstance(index, slice):
+            return [self._get(_i) for _i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FileTable index out of range")
+
+        return self._get(index)
+
+    def __iter__(self):
+        """Iterate over paths"""
+        for _i in range(len(self)):
+            yield self._get(_i)
+
+    def __contains__(self, path):
+        """Handles 'in' tests"""
+        try:
+            self.index(path)
+        except ValueError:
+            return False
+        return True
+
+    def __eq__(self, other):
+        """Compare, as sequences, to another FileTable or a list"""
+        if not isinstance(other, (FileTable, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(_a == _b for _a, _b in zip(self, other))
+
+    def __repr__(self):
+        """Serializable representation of this object"""
+        return "FileTable(%s entries)" % len(self)
+
+    def nbytes(self):
+        """
+        Returns the approximate memory held by the table, in bytes. Prefixes
+        are counted once, 'prefix_indexes' keys being the same objects.
+        """
+        return (
+            sys.getsizeof(self.prefixes)
+            + sum(sys.getsizeof(_prefix) for _prefix in self.prefixes)
+            + sys.getsizeof(self.prefix_indexes)
+            + sys.getsizeof(self.prefix_ids)
+            + sys.getsizeof(self.names)
+            + sys.getsizeof(self.offsets)
+            + sys.getsizeof(self.sort_keys)
+            + sum(sys.getsizeof(_values) for _values in self.sort_keys.values())
+        )
+
+    def index(self, path):
+        """
+        Returns the position of 'path', raises ValueError if absent.
+        Bisects when entries are sorted.
+        """
+        if self.is_sorted:
+            _i = bisect.bisect_left(self, path)
+            if _i < len(self) and self._get(_i) == path:
+                return _i
+            raise ValueError("%s is not in FileTable" % path)
+
+        for _i in range(len(self)):
+            if self._get(_i) == path:
+                return _i
+        raise ValueError("%s is not in FileTable" % path)
+
+    def append(self, path, sort_keys=None):
+        """
+        Append 'path' at the end of the table, along with its 'sort_keys'
+        values ({key name: value}), see extend()
+        """
+        self.extend((path,), {_key: (_value,) for _key, _value in (sort_keys or {}).items()})
+
+    def extend(self, paths, sort_keys=None):
+        """
+        Append all 'paths' at the end of the table, along with their
+        'sort_keys' values ({key name: values}). Keys held by the table and
+        not given get UNKNOWN values for the new entries, and become stale.
+        """
+        _start = len(self)
+        _prefix_indexes = self.prefix_indexes
+        _names = self.names
+        _last = self._get(len(self) - 1) if len(self) and self.is_sorted else None
+
+        for _path in paths:
+            _sep = _path.rfind(os.path.sep) + 1
+            _prefix = _path[:_sep]
+
+            _prefix_id = _prefix_indexes.get(_prefix)
+            if _prefix_id is None:
+                _prefix_id = _prefix_indexes[_prefix] = len(self.prefixes)
+                self.prefixes.append(_prefix)
+
+            if self.is_sorted:
+                if _last is not None and _path < _last:
+                    self.is_sorted = False
+                _last = _path
+
+            self.prefix_ids.append(_prefix_id)
+            _names += _path[_sep:].encode("utf-8", "surrogateescape")
+            self.offsets.append(len(_names))
+
+        _sort_keys = sort_keys or {}
+        for _key, _values in self.sort_keys.items():
+            if _key not in _sort_keys:
+                _values.extend([self.UNKNOWN] * (len(self) - _start))
+                if len(self) > _start:
+                    self.stale_sort_keys.add(_key)
+
+        for _key, _values in _sort_keys.items():
+            if _key in self.sort_keys:
+                self.sort_keys[_key].extend(_values)
+            elif not _start:
+                self.sort_keys[_key] = array("d", _values)
+            else:
+                continue
+
+            if len(self.sort_keys[_key]) != len(self):
+                raise ValueError("%s sort keys count doesn't match entries count" % _key)
+
+    def set_sort_keys(self, key, values):
+        """
+        Set the 'key' sort keys of all entries, from 'values'
+        """
+        _values = array("d", values)
+        if len(_values) != len(self):
+            raise ValueError("%s sort keys count doesn't match entries count" % key)
+
+        self.sort_keys[key] = _values
+        self.stale_sort_keys.discard(key)
+
+    def missing_sort_keys(self, key):
+        """
+        Returns the indexes of the entries whose 'key' sort key is unknown:
+        all of them if the table doesn't hold 'key'
+        """
+        if key not in self.sort_keys:
+            return list(range(len(self)))
+
+        if key not in self.stale_sort_keys:
+            return []
+
+        _values = self.sort_keys[key]
+        _missing = [_i for _i in range(len(self)) if _values[_i] != _values[_i]]
+        if not _missing:
+            self.stale_sort_keys.discard(key)
+
+        return _missing
+
+    def fill_sort_keys(self, key, indexes, values):
+        """
+        Set the 'key' sort keys of the entries at 'indexes', from 'values',
+        those of other entries being UNKNOWN if the table didn't hold 'key'
+        """
+        if key not in self.sort_keys:
+            self.sort_keys[key] = array("d", [self.UNKNOWN]) * len(self)
+            self.stale_sort_keys.add(key)
+
+        _values = self.sort_keys[key]
+        for _i, _value in zip(indexes, values):
+            _values[_i] = _value
+
+        if key in self.stale_sort_keys and all(_value == _value for _value in _values):
+            self.stale_sort_keys.discard(key)
+
+    def take(self, indexes):
+        """
+        Returns a new <FileTable> of the entries at 'indexes', in that order,
+        sort keys included
+        """
+        _table = FileTable(
+            (self._get(_i) for _i in indexes),
+            {_key: (_values[_i] for _i in indexes) for _key, _values in self.sort_keys.items()},
+        )
+        # UNKNOWN being NaN, it's the only value not equal to itself:
+        _table.stale_sort_keys = {
+            _key for _key in self.stale_sort_keys if any(_value != _value for _value in _table.sort_keys[_key])
+        }
+
+        return _table
+
+    def permute(self, indexes):
+        """
+        Reorder entries in place: entry i becomes the one at indexes[i]
+        """
+        _table = self.take(indexes)
+        for _slot in self.__slots__:
+            setattr(self, _slot, getattr(_table, _slot))
+
+    def sort(self):
+        """
+        Sort entries, in str order
+        """
+        if self.is_sorted:
+            return
+
+        self.permute(sorted(range(len(self)), key=self._get))
+
+
+class LazyItemTable:
+    """
+    List-like sequence of archive members, as *ItemCacheable objects.
+
+    Only member names are held, in a <FileTable>; item objects are created
+    on first access, and kept (so that they're the same objects later on) up
+    to the table being dropped, or reordered along with the names.
+    """
+
+    __slots__ = ("names", "make_item", "items")
+
+    def __init__(self, names, make_item):
+        self.names = names if isinstance(names, FileTable) else FileTable(names)  # <FileTable>
+        self.make_item = make_item  # callable(member name) -> <*ItemCacheable>
+        self.items = {}  # {Int: <*ItemCacheable>}, created ones
+
+    def __len__(self):
+        """Handles len() calls"""
+        return len(self.names)
+
+    def __getitem__(self, index):
+        """Handles indexing and slicing"""
+        if isinstance(index, slice):
+            return [self[_i] for _i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("LazyItemTable index out of range")
+
+        _item = self.items.get(index)
+        if _item is None:
+            _item = self.items[index] = self.make_item(self.names[index])
+        return _item
+
+    def __iter__(self):
+        """Iterate over items, creating them as needed"""
+        for _i in range(len(self)):
+            yield self[_i]
+
+    def __repr__(self):
+        """Serializable representation of this object"""
+        return "LazyItemTable(%s entries, %s created)" % (len(self), len(self.items))
+
+    def index(self, item):
+        """
+        Returns the position of 'item', raises ValueError if absent
+        """
+        _i = self.names.index(item.filename)
+        if self.items.get(_i) is not item:
+            raise ValueError("%s is not in LazyItemTable" % item)
+        return _i
+
+    def permute(self, indexes):
+        """
+        Reorder entries in place: entry i becomes the one at indexes[i]
+        """
+        self.names.permute(indexes)
+
+        if self.items:
+            _positions = {_old: _new for _new, _old in enumerate(indexes) if _old in self.items}
+            self.items = {_positions[_old]: _item for _old, _item in self.items.items()}
+
+    def created_items(self):
+        """
+        Returns the items created so far
+        """
+        return list(self.items.values())
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+GlobalIndex
+"""
+
+import bisect
+
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+
+class GlobalIndex:
+    """
+    Flat view over the files of all the PathNodes of a <PathNodeStore>.
+
+    Keeps the cumulative files counts of the nodes, so that an absolute
+    position across all nodes resolves to a (node index, offset in node)
+    pair with a bisect. Counts are obtained lazily from
+    PathNode.count_entries(), and only as far as needed: resolving a position
+    doesn't look past the node holding it, and never populates any node.
+    """
+
+    def __init__(self):
+        self.path_nodes_store = None  # <PathNodeStore>
+        self.counts = []  # [Int], files count of the first len(counts) nodes
+        self.ends = []  # [Int], ends[i] = sum(counts[:i + 1])
+
+    def _count_node(self, node_index):
+        """
+        Returns the files count of the node at `node_index`
+        """
+        return self.path_nodes_store.store[node_index].count_entries()
+
+    def _count_next_node(self):
+        """
+        Count the first node not counted yet. Returns False if all are.
+        """
+        if len(self.ends) >= len(self.path_nodes_store.store):
+            return False
+
+        _count = self._count_node(len(self.ends))
+        self.counts.append(_count)
+        self.ends.append((self.ends[-1] if self.ends else 0) + _count)
+        return True
+
+    def _extend_past(self, position):
+        """
+        Count nodes until the known ones hold `position`, or none is left
+        """
+        while not self.ends or self.ends[-1] <= position:
+            if not self._count_next_node():
+                break
+
+    def update_node(self, node_index):
+        """
+        Refresh the count of the node at `node_index`, as it may have
+        changed since it was counted (ie: once populated). Cumulated counts of
+        the following nodes are recomputed lazily, from the counts the nodes
+        cache themselves.
+        """
+        if node_index >= len(self.counts):
+            return
+
+        _count = self._count_node(node_index)
+        if _count != self.counts[node_index]:
+            debug("node %s count changed: %s -> %s" % (node_index, self.counts[node_index], _count))
+            del self.counts[node_index:]
+            del self.ends[node_index:]
+
+    def clear(self):
+        """
+        Forget all the counts
+        """
+        self.counts = []
+        self.ends = []
+
+    def locate(self, position):
+        """
+        Returns (node index, offset in node) for the zero based absolute
+        `position`, or None if there's no file at that position.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), position))
+
+        if position < 0:
+            return None
+
+        self._extend_past(position)
+        if not self.ends or position >= self.ends[-1]:
+            return None
+
+        # Empty nodes have the same end as their predecessor, and are
+        # skipped over by bisect_right():
+        _node_index = bisect.bisect_right(self.ends, position)
+        _start = self.ends[_node_index - 1] if _node_index else 0
+
+        return _node_index, position - _start
+
+    def position_of(self, node_index, offset):
+        """
+        Returns the zero based absolute position of `offset` in the node at
+        `node_index`
+        """
+        while len(self.ends) < node_index:
+            if not self._count_next_node():
+                raise IndexError("no node at index %s" % node_index)
+
+        return (self.ends[node_index - 1] if node_index else 0) + offset
+
+    def known_len(self):
+        """
+        Returns the total files count if all the nodes are counted already,
+        None otherwise. Doesn't count anything.
+        """
+        if len(self.ends) < len(self.path_nodes_store.store):
+            return None
+
+        return self.ends[-1] if self.ends else 0
+
+    def __len__(self):
+        """
+        Handle len() calls: total files count. Counts all the nodes.
+        """
+        self._extend_past(float("inf"))
+        return self.ends[-1] if self.ends else 0
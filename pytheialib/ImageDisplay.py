@@ -14,6 +14,8 @@ class ImageDisplay:
     def __init__(self):
         self.raw_pixbuf = None  # GdkPixbuf
         self.active_pixbuf = None  # GdkPixbuf
+        self.raw_pixbuf_reduced = False  # Bool, raw_pixbuf decoded to fit
+        self.raw_pixbuf_complete = False  # Bool, raw_pixbuf fully decoded
 
         self.display_state = None  # <DisplayState>
         self.image_display_widget = None  # <ImageDisplayWidget>
@@ -50,6 +52,7 @@ class ImageDisplay:
         # raise TypeError('_pixbuf cannot be none')
 
         self.raw_pixbuf = _pixbuf
+        self.raw_pixbuf_complete = False  # until the loader says otherwise
 
     def clear_pixbufs(self):
         """try to safely clear references to Pixbuf objects"""
@@ -61,3 +64,10 @@ class ImageDisplay:
 
         if self.active_pixbuf:
             self.active_pixbuf = None
+
+        self.raw_pixbuf_reduced = False
+        self.raw_pixbuf_complete = False
+
+        # Scaled versions of the previous image are of no use anymore:
+        if self.display_state:
+            self.display_state.scaled_pixbufs_clear()
@@ -206,9 +206,39 @@ class ImageDisplayWidget:
         # noinspection PyUnresolvedReferences
         self.main_image.show()
 
+        # The viewport may be showing tiles instead:
+        if self.main_viewport.get_child():
+            self.main_viewport.remove(self.main_viewport.get_child())
+
         # but we need to reparent to the upper viewport:
         self.main_viewport.add(self.main_image)
 
+    def show_tiled(self, tiled_renderer):
+        """
+        Have the viewport display the tiles of `tiled_renderer` in place of
+        the main image.
+        """
+        _drawing_area = tiled_renderer.get_drawing_area()
+        if self.main_viewport.get_child() is _drawing_area:
+            return
+
+        gdebug(f"# {self.__class__}:{callee()}")
+        if self.main_viewport.get_child():
+            self.main_viewport.remove(self.main_viewport.get_child())
+        self.main_viewport.add(_drawing_area)
+
+    def show_main_image(self):
+        """
+        Have the viewport display the main image, back from tiles
+        """
+        if self.main_viewport.get_child() is self.main_image:
+            return
+
+        gdebug(f"# {self.__class__}:{callee()}")
+        if self.main_viewport.get_child():
+            self.main_viewport.remove(self.main_viewport.get_child())
+        self.main_viewport.add(self.main_image)
+
     def image_display_widget_free_all(self):
         """
         Free all resources bound to the widge
@@ -229,7 +259,7 @@ class ImageDisplayWidget:
         self.pbl.pixbuf_loader_free()
 
         # DisplayState()
-        self.display_state.state_free()  # self.{render_pass, first_block_updated}
+        self.display_state.state_free()  # self.{tiled_renderer, tiled}
 
     def main_scroll_emit_event(self, scroll_type, axis):
         """
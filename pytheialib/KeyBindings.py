@@ -79,8 +79,11 @@ class KeyBindings:
                 "o": "Gdk.KEY_o",
                 "q": "Gdk.KEY_q",
                 "h": "Gdk.KEY_h",
+                "r": "Gdk.KEY_r",
+                "s": "Gdk.KEY_s",
                 "t": "Gdk.KEY_t",
                 "w": "Gdk.KEY_w",
+                "z": "Gdk.KEY_z",
                 ">": "Gdk.KEY_greater",
                 "<": "Gdk.KEY_less",
                 # 'p': 'Gdk.KEY_p',
@@ -225,6 +228,24 @@ class KeyBindings:
                     "self.keybindings.keyvals['>']",
                     "self.callbacks.cb_zoom_in",
                 ),
+                (
+                    """Cycle files sort order""",
+                    "0",
+                    "self.keybindings.keyvals['s']",
+                    "self.callbacks.cb_cycle_sort_order",
+                ),
+                (
+                    """Reverse files sort order""",
+                    "0",
+                    "self.keybindings.keyvals['r']",
+                    "self.callbacks.cb_toggle_reverse_sort",
+                ),
+                (
+                    """Toggle shuffle mode""",
+                    "0",
+                    "self.keybindings.keyvals['z']",
+                    "self.callbacks.cb_toggle_shuffle",
+                ),
             ]
             self.config["keybindings"] = self.bindings
 
@@ -4,6 +4,7 @@ Mime
 """
 
 import mimetypes
+import os
 
 # import gi
 # gi.require_version('GdkPixbuf', '3.0')
@@ -17,6 +18,9 @@ class Mime:
     Mime type support
     """
 
+    # Shared by all instances, see get_supported_extensions_set():
+    _supported_extensions_set = None  # <Str>frozenset
+
     def __init__(self):
         self.supported_types = None  # <Str>List
         self.supported_extensions = None  # <Str>List
@@ -56,3 +60,25 @@ class Mime:
             self.supported_extensions.append(".jpg")
 
         return self.supported_extensions
+
+    def get_supported_extensions_set(self):
+        """
+        Return the lower case extensions, dot included, mimetypes maps to a
+        supported type, as a frozenset.
+
+        Computed once per process: testing a filename is then a set lookup,
+        instead of a mimetypes.guess_type() call.
+        """
+        if Mime._supported_extensions_set is None:
+            _types = set(self.get_supported_mimetypes())
+            # noinspection PyUnresolvedReferences
+            Mime._supported_extensions_set = frozenset(
+                _ext.lower() for (_ext, _type) in mimetypes.types_map.items() if _type in _types
+            )
+
+        return Mime._supported_extensions_set
+
+    def is_supported_filename(self, filename):
+        """Return True if 'filename' extension is a supported one"""
+
+        return os.path.splitext(filename)[1].lower() in self.get_supported_extensions_set()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+NodePrepopulator
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+
+class NodePrepopulator:
+    """
+    Populate the PathNodes neighbouring the current one on a background
+    thread, once the position gets within `distance` files of either end of
+    the current node, so that crossing over to them doesn't wait for their
+    archive to be opened and listed, or their directory to be scanned.
+
+    Nodes populated ahead, and nodes just left, are kept populated while in
+    reach, and unpopulated by update() as soon as they aren't. Nodes are
+    populated through PathNode.ensure_populated(), so that entering a node
+    being populated in the background waits for it instead of populating it
+    a second time.
+    """
+
+    def __init__(self):
+        self.distance = 0  # Int, files, 0 disables
+        self.path_nodes_store = None  # <PathNodeStore>
+        self.executor = None  # <ThreadPoolExecutor>
+        self.kept = []  # [<PathNode>], populated, or being populated, while not current
+        self.warm_node_pool = None  # <WarmNodePool>, given the nodes out of reach
+
+    def _get_executor(self):
+        """
+        Returns the thread pool, starting it on first use
+        """
+        if not self.executor:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pytheia-prepopulate")
+        return self.executor
+
+    def _wanted(self):
+        """
+        Returns the PathNodes to have populated, given the current position
+        """
+        _store = self.path_nodes_store
+        _index = _store.current_pathnode_index
+        _current = _store.current_pathnode()
+        _wanted = []
+
+        if not _current.populated or _current.position is None:
+            return _wanted
+
+        if _current.position >= len(_current) - self.distance and _index + 1 < len(_store.store):
+            _wanted.append(_store.store[_index + 1])
+
+        if _current.position < self.distance and _index > 0:
+            _wanted.append(_store.store[_index - 1])
+
+        return _wanted
+
+    def update(self):
+        """
+        To be called after each seek: populate the neighbours now in reach,
+        unpopulate the kept ones now out of reach. Returns the nodes in reach.
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if not self.distance:
+            return []
+
+        _current = self.path_nodes_store.current_pathnode()
+        _wanted = self._wanted()
+
+        for _node in list(self.kept):
+            if _node is _current:
+                # Entered, it's up to the navigation now:
+                self.kept.remove(_node)
+            elif _node not in _wanted and self._release(_node):
+                self.kept.remove(_node)
+
+        for _node in _wanted:
+            if _node not in self.kept:
+                self.kept.append(_node)
+                if not _node.populated:
+                    debug("populating %s in the background" % _node.start_uri)
+                    self._get_executor().submit(self._populate, _node)
+
+        return _wanted
+
+    def keep(self, node):
+        """
+        Take over 'node', being left by the navigation: it's unpopulated by
+        update() once out of reach, rather than right away. Returns False if
+        prepopulation is disabled, the caller having to unpopulate it then.
+        """
+        if not self.distance:
+            return False
+
+        if node not in self.kept:
+            self.kept.append(node)
+        return True
+
+    @staticmethod
+    def _populate(node):
+        """
+        Worker side of update()
+        """
+        try:
+            node.ensure_populated()
+        except Exception as exc:  # pylint: disable=broad-except
+            # Populated again, and failing for good, when entered:
+            debug("background population of %s failed: %s" % (node.start_uri, exc))
+
+    def _release(self, node):
+        """
+        Hand 'node' over to the warm node pool, or unpopulate it, unless it's
+        being populated. Returns True if done.
+        """
+        if not node.populate_lock.acquire(blocking=False):
+            return False
+
+        try:
+            if node.populated and not (self.warm_node_pool and self.warm_node_pool.add(node)):
+                debug("unpopulating %s, out of reach" % node.start_uri)
+                node.unpopulate()
+        finally:
+            node.populate_lock.release()
+
+        return True
+
+    def shutdown(self):
+        """
+        Stop the worker, without waiting for a population in progress
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
@@ -4,14 +4,23 @@ PathIndex
 """
 
 import os
+import random
+import threading
+
+import gi  # pylint: disable=import-error
+from gi.repository import GLib  # pylint: disable=import-error
 
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.GlobalIndex import GlobalIndex
+from pytheialib.NodePrepopulator import NodePrepopulator
 from pytheialib.path_node_exceptions import PathNodeEOListError, PathNodeSOListError
 from pytheialib.PathNodeStore import PathNodeStore
 from pytheialib.PathNodeStoreExceptions import (
     PathNodeStoreEOListError,
     PathNodeStoreSOListError,
 )
+from pytheialib.ShufflePermutation import ShufflePermutation
+from pytheialib.WarmNodePool import WarmNodePool
 
 
 class PathIndex:
@@ -27,6 +36,14 @@ class PathIndex:
 
         self.path_nodes_factory = None  # <PathNodesFactory>
         self.path_nodes_store = None  # <PathNodesStore>
+        self.global_index = None  # <GlobalIndex>
+        self.sort_order = None  # <SortOrder>
+        self.prepopulator = None  # <NodePrepopulator>
+        self.warm_node_pool = None  # <WarmNodePool>
+        self.shuffle = None  # <ShufflePermutation> of the global positions, in shuffle mode
+        self.shuffle_seed = None  # Int
+        self.shuffle_step = 0  # Int, index in 'shuffle' of the current file
+        self.shuffle_pending = False  # Bool, shuffle mode starting once all nodes are counted
 
     def initialize(self):
         """
@@ -47,6 +64,25 @@ class PathIndex:
         if not self.path_nodes_factory:
             raise RuntimeError("path_nodes_factory is not set")
 
+        if not self.global_index:
+            self.global_index = GlobalIndex()
+            self.global_index.path_nodes_store = self.path_nodes_store
+
+        if not self.warm_node_pool:
+            self.warm_node_pool = WarmNodePool()
+            self.warm_node_pool.path_nodes_store = self.path_nodes_store
+            if self.cli_parse:
+                self.warm_node_pool.capacity = self.cli_parse.get("warm_nodes")
+                self.warm_node_pool.memory_budget = self.cli_parse.get("warm_memory_mb") * 1024 * 1024
+                self.warm_node_pool.disk_budget = self.cli_parse.get("warm_disk_mb") * 1024 * 1024
+
+        if not self.prepopulator:
+            self.prepopulator = NodePrepopulator()
+            self.prepopulator.path_nodes_store = self.path_nodes_store
+            self.prepopulator.warm_node_pool = self.warm_node_pool
+            if self.cli_parse:
+                self.prepopulator.distance = self.cli_parse.get("prepopulate_distance")
+
     def append_node(self, node_data=None):
         """
         Append a <PathNode> to the <PathNodesStore>, creating it based on
@@ -76,9 +112,44 @@ class PathIndex:
             recursive=_recursive,
             start_uri=_start_uri,
         )  # PathNode
+        new_node.files_changed_callback = self.node_files_changed
 
         self.path_nodes_store.append_node(new_node)
 
+    def node_files_changed(self, node, current_changed):
+        """
+        Account for files added to or removed from a populated 'node' (see
+        PathNodeDirectory watching and streaming scans). 'current_changed'
+        tells whether the file it was on changed: gone, or moved away from by
+        a deferred seek.
+        """
+        gdebug("# %s:%s(%s, %s)" % (self.__class__, callee(), node, current_changed))
+
+        self.global_index.update_node(self.path_nodes_store.node_index(node))
+
+        if node is self.path_nodes_store.current_pathnode():
+            self.callbacks.cb_current_pathnode_changed(current_changed)
+
+    def _leave_node(self, node):
+        """
+        Unpopulate 'node', being left, unless the prepopulator keeps it while
+        in reach, or the warm node pool keeps it for a while
+        """
+        if not self.prepopulator.keep(node) and not self.warm_node_pool.add(node):
+            node.unpopulate()
+
+    def update_populated_nodes(self):
+        """
+        To be called after each seek: have the nodes around the current
+        position populated in the background, and the current node, and
+        those in reach, taken back from the warm node pool
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        self.warm_node_pool.discard(self.path_nodes_store.current_pathnode())
+        for _node in self.prepopulator.update():
+            self.warm_node_pool.discard(_node)
+
     @staticmethod
     def _repr_seektype(seekval):
         """
@@ -99,6 +170,11 @@ class PathIndex:
         abstraction over their specific nature.
         """
         wdebug("# %s:%s(%s, %s)" % (self.__class__, callee(), offset, self._repr_seektype(whence)))
+
+        if self.shuffle and whence == os.SEEK_CUR and offset:
+            self._seek_shuffled(offset)
+            return
+
         _prev = self.path_nodes_store.current_pathnode()
         _prev_id = id(_prev)
 
@@ -121,7 +197,7 @@ class PathIndex:
                 ydebug("<exc> PathNodeStoreEOListError : %s" % str(exc))
                 self._seek_eol_reached(_prev, _prev_id)
 
-            self.path_nodes_store.current_pathnode().populate()
+            self.path_nodes_store.current_pathnode().ensure_populated()
             if self.path_nodes_store.current_pathnode().is_empty == 2:
                 self.path_nodes_store.current_pathnode().unpopulate()
                 self.path_nodes_store.seek(1)
@@ -130,7 +206,7 @@ class PathIndex:
 
             self.path_nodes_store.current_pathnode().seek_first()
             if _prev_id != id(self.path_nodes_store.current_pathnode()):
-                _prev.unpopulate()
+                self._leave_node(_prev)
 
         # Start of list reached
         except PathNodeSOListError as exc:
@@ -143,7 +219,7 @@ class PathIndex:
                 ydebug("<exc> PathNodeStoreSOListError: %s" % str(exc))
                 self._seek_sol_reached(_prev, _prev_id)
 
-            self.path_nodes_store.current_pathnode().populate()
+            self.path_nodes_store.current_pathnode().ensure_populated()
 
             if self.path_nodes_store.current_pathnode().is_empty == 2:
                 self.path_nodes_store.current_pathnode().unpopulate()
@@ -152,7 +228,182 @@ class PathIndex:
 
             self.path_nodes_store.current_pathnode().seek_last()
             if _prev_id != id(self.path_nodes_store.current_pathnode()):
-                _prev.unpopulate()
+                self._leave_node(_prev)
+
+    def seek_global(self, position):
+        """
+        Seek to the zero based absolute 'position', counted across all the
+        PathNodes. Only the PathNode holding it gets populated. Returns False
+        if there's no file at that position, staying on the current file.
+        """
+        wdebug("# %s:%s(%s)" % (self.__class__, callee(), position))
+
+        _located = self.global_index.locate(position)
+        if not _located:
+            return False
+
+        _node_index, _offset = _located
+        _prev = self.path_nodes_store.current_pathnode()
+        _cur = self.path_nodes_store.store[_node_index]
+
+        if _cur is not _prev:
+            self.path_nodes_store.set_current_pathnode_by_ref(_cur)
+            try:
+                _cur.ensure_populated()
+            except (TypeError, ValueError) as exc:
+                # ie: archive emptied, directory removed, since counted:
+                debug("%s can't be populated: %s" % (_cur.start_uri, exc))
+
+            # Listed again while populating, the count may have changed:
+            self.global_index.update_node(_node_index)
+
+            if _cur.is_empty == 2 or not len(_cur):
+                _cur.unpopulate()
+                self.path_nodes_store.set_current_pathnode_by_ref(_prev)
+                return False
+
+            self._leave_node(_prev)
+            _offset = min(_offset, len(_cur) - 1)
+
+        _cur.seek(_offset, os.SEEK_SET)
+        return True
+
+    def global_position(self):
+        """
+        Returns the zero based absolute position of the current file, counted
+        across all the PathNodes.
+        """
+        _store = self.path_nodes_store
+
+        return self.global_index.position_of(_store.current_pathnode_index, _store.current_pathnode().position)
+
+    def set_shuffle(self, enabled, seed=None, on_ready=None):
+        """
+        Enter or leave shuffle mode, in which relative seeks step through a
+        seeded permutation of the global positions, rather than through the
+        files in order. Entering it stays on the current file, the shuffled
+        sequence going on from where this file comes in it. A random seed is
+        picked unless one is given, or was before.
+
+        The permutation needs the files count of every PathNode, which lists
+        every archive and scans every directory. With 'on_ready', the nodes
+        not counted yet are counted by a background thread, shuffle mode
+        starting once they are, 'on_ready' being called then. They are
+        counted right away otherwise.
+        """
+        gdebug("# %s:%s(%s, %s)" % (self.__class__, callee(), enabled, seed))
+
+        if not enabled:
+            self.shuffle = None
+            self.shuffle_pending = False
+            return
+
+        if seed is not None:
+            self.shuffle_seed = seed
+        elif self.shuffle_seed is None:
+            self.shuffle_seed = random.randrange(1 << 32)
+
+        if on_ready is None or self.global_index.known_len() is not None:
+            self._build_shuffle()
+            if on_ready:
+                on_ready()
+            return
+
+        if self.shuffle_pending:
+            return
+
+        self.shuffle_pending = True
+        threading.Thread(
+            target=self._count_nodes,
+            args=(list(self.path_nodes_store.store), on_ready),
+            name="pytheia-count",
+            daemon=True,
+        ).start()
+
+    def _count_nodes(self, nodes, on_ready):
+        """
+        Thread side of set_shuffle(): have 'nodes' count their files, which
+        they cache, then start shuffle mode from the main loop
+        """
+        for _node in nodes:
+            if not self.shuffle_pending:
+                break
+
+            try:
+                _node.count_entries()
+            except Exception as exc:  # pylint: disable=broad-except
+                # Counted again, and failing for good, from the main loop:
+                debug("background count of %s failed: %s" % (_node.start_uri, exc))
+
+        GLib.idle_add(self._shuffle_counted, on_ready)
+
+    def _shuffle_counted(self, on_ready):
+        """
+        Idle callback: all the nodes are counted, start shuffle mode unless
+        left meanwhile
+        """
+        if not self.shuffle_pending:
+            return False
+
+        self.shuffle_pending = False
+        self._build_shuffle()
+        on_ready()
+
+        return False
+
+    def _build_shuffle(self):
+        """
+        (Re)build the permutation over the current files count, and locate
+        the current file in it
+        """
+        self.shuffle = ShufflePermutation(len(self.global_index), self.shuffle_seed)
+        self.shuffle_step = self.shuffle.index(self.global_position()) if len(self.shuffle) else 0
+        debug("shuffle: %s, at step %s" % (self.shuffle, self.shuffle_step))
+
+    def _seek_shuffled(self, offset):
+        """
+        Move 'offset' steps in the shuffled sequence
+        """
+        if not len(self.global_index):
+            return
+
+        if len(self.shuffle) != len(self.global_index) or self.shuffle[self.shuffle_step] != self.global_position():
+            # Files added or removed, or moved to another file in order since:
+            self._build_shuffle()
+
+        self.seek_shuffled(self.shuffle_step + offset)
+
+    def seek_shuffled(self, step):
+        """
+        Seek to the file at 'step' in the shuffled sequence. Only the PathNode
+        holding it gets populated. Past either end of the sequence, wrap
+        around if looping, quit otherwise.
+        """
+        wdebug("# %s:%s(%s)" % (self.__class__, callee(), step))
+
+        _size = len(self.shuffle)
+        if not _size:
+            return
+
+        if not 0 <= step < _size:
+            if not self.cli_parse.args.loop:
+                self.callbacks.cb_quit()
+                return
+            step %= _size
+
+        self.shuffle_step = step
+        self.seek_global(self.shuffle[step])
+
+    def resort(self):
+        """
+        Apply the current 'sort_order' to the populated PathNodes, each
+        staying on its current file. Others get it applied when populated.
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        for _node in self.path_nodes_store.store:
+            if _node.populated:
+                _node.resort()
 
     def _seek_sol_reached(self, _prev, _prev_id):
         if self.cli_parse.args.loop:
@@ -163,8 +414,8 @@ class PathIndex:
             _cur_id = id(_cur)
 
             if _cur_id != _prev_id:
-                self.path_nodes_store.current_pathnode().populate()
-                _prev.unpopulate()
+                self.path_nodes_store.current_pathnode().ensure_populated()
+                self._leave_node(_prev)
             self.path_nodes_store.current_pathnode().seek_last()
         else:
             self.callbacks.cb_quit()
@@ -178,8 +429,8 @@ class PathIndex:
             _cur_id = id(_cur)
 
             if _cur_id != _prev_id:
-                self.path_nodes_store.current_pathnode().populate()
-                _prev.unpopulate()
+                self.path_nodes_store.current_pathnode().ensure_populated()
+                self._leave_node(_prev)
 
             self.path_nodes_store.current_pathnode().seek_first()
 
@@ -202,8 +453,8 @@ class PathIndex:
         _cur_id = id(_cur)
 
         if _cur_id != _prev_id:
-            _cur.populate()
-            _prev.unpopulate()
+            _cur.ensure_populated()
+            self._leave_node(_prev)
 
     def pathnode_seek_previous(self):
         """
@@ -218,8 +469,8 @@ class PathIndex:
         _cur_id = id(_cur)
 
         if _cur_id != _prev_id:
-            _cur.populate()
-            _prev.unpopulate()
+            _cur.ensure_populated()
+            self._leave_node(_prev)
 
     def __del__(self):
         wdebug("# %s:%s()" % (self.__class__, callee()))
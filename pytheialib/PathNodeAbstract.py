@@ -37,14 +37,34 @@ class PathNodeAbstract:
         """pseudo-interface placeholder"""
         raise NotImplementedError()
 
+    def count_entries(self):
+        """pseudo-interface placeholder"""
+        raise NotImplementedError()
+
+    def get_footprint(self):
+        """pseudo-interface placeholder"""
+        raise NotImplementedError()
+
+    def current_item(self):
+        """pseudo-interface placeholder"""
+        raise NotImplementedError()
+
     def preaccess_current(self):
         """pseudo-interface placeholder"""
         raise NotImplementedError()
 
+    def preaccess_entries(self, positions):
+        """pseudo-interface placeholder"""
+        raise NotImplementedError()
+
     def unpopulate(self):
         """pseudo-interface placeholder"""
         raise NotImplementedError()
 
+    def detach_temp_dir(self):
+        """pseudo-interface placeholder"""
+        raise NotImplementedError()
+
     def seek(self, offset, whence):
         """pseudo-interface placeholder"""
         raise NotImplementedError()
@@ -18,6 +18,7 @@ class PathNodeFactory:
         self.current_pathnode_index = None  # int
         self.supporting_pool = None  # <SupportingPool>
         self.cli_parse = None  # <CliParse>
+        self.sort_order = None  # <SortOrder>
 
         if not hasattr(self, "factory_types"):
             self.factory_types = {}
@@ -89,6 +90,7 @@ class PathNodeFactory:
         new_node.cli_parse = self.cli_parse
         new_node.recursive = recursive
         new_node.supporting_pool = self.supporting_pool
+        new_node.sort_order = self.sort_order
 
         # start uri allow to specify a more detailed resource to start with,
         # withing a given node, to it overrides 'uri' for the starter election:
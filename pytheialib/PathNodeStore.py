@@ -15,6 +15,7 @@ class PathNodeStore:
 
     def __init__(self):
         self.store = []  # FIXME: it would be better to refactor to make this class inherit 'list' type
+        self.store_indexes = {}  # {id(<PathNode>): Int}, positions in 'store'
         self.current_pathnode_index = 0
         self.cli_parse = None  # <CliParse>
         self.callbacks = None  # <Callbacks>
@@ -43,13 +44,14 @@ class PathNodeStore:
         Returns the index of a node in the store
         """
 
-        return self.store.index(node)
+        return self.store_indexes[id(node)]
 
     def append_node(self, node):
         """
         Append a <PathNode> object to the store
         """
 
+        self.store_indexes[id(node)] = len(self.store)
         self.store.append(node)
 
     def current_pathnode(self):
@@ -76,7 +78,7 @@ class PathNodeStore:
         # Recurse until we find something usable, or quit if ends
         # up on empty:
         store = self.store[self.current_pathnode_index]
-        store.populate()
+        store.ensure_populated()
 
         wdebug(
             """
@@ -102,7 +104,7 @@ class PathNodeStore:
         Seek to last (or only) PathNode in store.
         """
 
-        self.current_pathnode_index = self.store.index(self.store[-1])
+        self.current_pathnode_index = len(self.store) - 1
 
     def set_current_pathnode_by_ref(self, node_ref):
         """
@@ -110,7 +112,7 @@ class PathNodeStore:
         as the current one
         """
 
-        self.current_pathnode_index = self.store.index(node_ref)
+        self.current_pathnode_index = self.node_index(node_ref)
 
     def next_pathnode(self):
         """
@@ -156,7 +158,7 @@ class PathNodeStore:
         # TODO: add code to tell a PathNode is being left (clear cache etc..)
         else:
             self.current_pathnode_index += offset
-            self.store[self.current_pathnode_index].populate()
+            self.store[self.current_pathnode_index].ensure_populated()
 
     def __del__(self):
         wdebug("# %s:%s()" % (self.__class__, callee()))
@@ -13,6 +13,7 @@ from pytheialib.JsonDict import JsonDict
 from pytheialib.Persistence import Persistence
 from pytheialib.Platform import Platform
 from pytheialib.PluginsStore import PluginsStore
+from pytheialib.StageTimings import StageTimings
 from pytheialib.Utils import Utils
 
 
@@ -59,6 +60,15 @@ class Plugins:
         if not self.plugins_search_path:
             raise RuntimeError("plugins_search_path must be set")
 
+    @staticmethod
+    def get_stage_timings():
+        """
+        Returns per-stage image load timings, as a dict:
+        {stage: {"count", "mean", "max", "p50", "p95", "p99"}}, durations being
+        in seconds. See StageTimings.STAGES for the list of stages.
+        """
+        return StageTimings().summary()
+
     def discover_plugins(self):
         """
         Discover plugins files along search paths
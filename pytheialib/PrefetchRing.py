@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+PrefetchRing
+"""
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+import gi  # pylint: disable=import-error
+from gi.repository import GLib  # pylint: disable=import-error
+
+from pytheialib.DecodeWorkerPool import DecodeWorkerPool
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+
+class PrefetchRing:
+    """
+    Bounded ring of decoded pixbufs around the current position of a PathNode.
+
+    The `ahead` following and `behind` preceding entries of the current
+    PathNode are read and decoded by background threads, archive members
+    through archive handles of their own, and kept in a LRU of pixbufs,
+    keyed by path (or by the cache path of archive members), so that a seek
+    landing on one of them doesn't have to read and decode anything.
+
+    Pixbufs are only ever stored from the main thread, using GLib.idle_add(),
+    so that the LRU doesn't need any locking. Each decoding job has an id,
+    and its result is only stored if it is still the one pending for its
+    key: a seek drops the jobs not started yet, but not those in progress,
+    so that no image is decoded twice.
+
+    With `decode_to_fit`, images are decoded at the size they would be
+    displayed at in the current fit mode, and stored along with their full
+    dimensions.
+    """
+
+    def __init__(self, num_worker_threads=1):
+        self.ahead = 2  # Int
+        self.behind = 1  # Int
+        self.capacity = 5  # Int
+        self.pixbufs = OrderedDict()  # {Str: (<GdkPixbuf>, (Int, Int) or None)}
+        self.pending = {}  # {Str: Int}, key -> id of the job decoding it
+        self.last_job = 0  # Int, id of the last job queued
+        self.generation = 0  # Int, outdates preparations not done yet
+        self.decode_to_fit = False  # Bool
+        self.display_state = None  # <DisplayState>
+        self.max_member_bytes = 64 * 1024 * 1024  # Int, archive members larger aren't prefetched
+        self.readahead = 8  # Int, following entries prepared at once (see PathNode.preaccess_entries()), 0 disables
+
+        self.num_worker_threads = num_worker_threads
+        self.queue = queue.Queue()
+
+        self._threads_pool_init()
+
+    def _threads_pool_init(self):
+        """
+        Initialize a pool of 'num_worker_threads' daemon threads to decode
+        images found in the queue.
+        """
+        for _ in range(self.num_worker_threads):
+            _thread = threading.Thread(target=self._decode_worker)
+            _thread.daemon = True
+            _thread.start()
+
+    def set_depth(self, ahead, behind):
+        """
+        Set how many following (`ahead`) and preceding (`behind`) entries are
+        to be prefetched. The LRU capacity follows, leaving room for the
+        current image and one more.
+        """
+        gdebug("# %s:%s(%s, %s)" % (self.__class__, callee(), ahead, behind))
+
+        if ahead < 0 or behind < 0:
+            raise ValueError("prefetch depths cannot be negative")
+
+        self.ahead = ahead
+        self.behind = behind
+        self.capacity = ahead + behind + 2
+
+    @staticmethod
+    def entry_key(entry):
+        """
+        Returns the key used to store the pixbuf of an `all_files` entry: the
+        path itself for directories, the cache path for archive members (which
+        is also what `current_path` returns for these).
+        """
+        return str(getattr(entry, "filepath_norm", entry))
+
+    def lookup(self, key):
+        """
+        Returns the (pixbuf, full sizes) tuple stored for `key`, or None. A hit
+        makes the entry the most recently used one.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), key))
+
+        if key not in self.pixbufs:
+            return None
+
+        self.pixbufs.move_to_end(key)
+        return self.pixbufs[key]
+
+    def store(self, key, pixbuf, full_sizes_t=None):
+        """
+        Store `pixbuf` for `key`, evicting least recently used entries
+        beyond `capacity`. `full_sizes_t` are the dimensions of the source
+        image, when `pixbuf` was decoded smaller.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), key))
+
+        if not self.capacity or not pixbuf:
+            return
+
+        self.pixbufs[key] = (pixbuf, full_sizes_t)
+        self.pixbufs.move_to_end(key)
+
+        while len(self.pixbufs) > self.capacity:
+            _evicted, _ = self.pixbufs.popitem(last=False)
+            bdebug("prefetch ring evicted: %s" % _evicted)
+
+    def clear(self):
+        """
+        Drop all stored pixbufs and forget about queued work, and results
+        still to come.
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        self.generation += 1
+        self._drop_queued()
+        self.pixbufs.clear()
+        self.pending.clear()
+
+    def _drop_queued(self):
+        """
+        Drop the jobs not started yet by workers
+        """
+        while True:
+            try:
+                _job, _key, _source, _fit = self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+            if self.pending.get(_key) == _job:
+                del self.pending[_key]
+            self.queue.task_done()
+
+    def schedule(self, pathnode):
+        """
+        Queue decoding of the entries surrounding the current position of
+        `pathnode`. Work queued by previous calls and not started yet is
+        abandoned, work in progress is kept.
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if not (self.ahead or self.behind) or not pathnode.all_files:
+            return
+
+        self.generation += 1
+        self._drop_queued()
+
+        _fit = None
+        if self.decode_to_fit:
+            _fit = self.display_state.fit_target_method()
+
+        # Have the following entries prepared at once, where the PathNode
+        # needs it (ie: RAR members extracted in batches, in the background),
+        # as they are read one by one below:
+        _readahead = [
+            pathnode.position + i
+            for i in range(1, max(self.ahead, self.readahead) + 1)
+            if self.readahead and pathnode.position + i < len(pathnode.all_files)
+        ]
+        if _readahead:
+            GLib.idle_add(
+                self._preaccess_entries,
+                self.generation,
+                pathnode,
+                _readahead,
+                priority=GLib.PRIORITY_LOW,
+            )
+
+        _offsets = [i for i in range(1, self.ahead + 1)]
+        _offsets.extend([-i for i in range(1, self.behind + 1)])
+
+        for _offset in _offsets:
+            _idx = pathnode.position + _offset
+            if _idx < 0 or _idx >= len(pathnode.all_files):
+                continue
+
+            _entry = pathnode.all_files[_idx]
+            _key = self.entry_key(_entry)
+
+            if _key in self.pixbufs or _key in self.pending:
+                continue
+
+            # Archive members are read in memory as a whole: leave huge ones
+            # to the loader, which streams them. Their size comes from the
+            # archive index, nothing is read to get it:
+            if not isinstance(_entry, str) and len(_entry) > self.max_member_bytes:
+                debug("prefetch: %s skipped, %s bytes" % (_key, len(_entry)))
+                continue
+            self.last_job += 1
+            self.pending[_key] = self.last_job
+
+            self.queue.put((self.last_job, _key, _key if isinstance(_entry, str) else _entry, _fit))
+
+    def _preaccess_entries(self, generation, pathnode, positions):
+        """
+        Idle callback: have 'pathnode' prepare the entries at 'positions'
+        """
+        if generation != self.generation:
+            return False
+
+        try:
+            pathnode.preaccess_entries(positions)
+        except (IOError, OSError) as exc:
+            debug("prefetch: preparation of %s failed: %s" % (positions, exc))
+
+        return False
+
+    def _decode_worker(self):
+        """
+        Read and decode queued images, and hand the resulting pixbufs over to
+        the main loop.
+        """
+        while True:
+            # 'source' is a path, or an archive member *ItemCacheable:
+            job, key, source, fit = self.queue.get()
+
+            # Unless dropped meanwhile (see clear()):
+            if self.pending.get(key) == job:
+                try:
+                    if isinstance(source, str) and not os.path.isfile(source):
+                        _pixbuf, _full_sizes_t = None, None  # gone
+                    elif isinstance(source, str):
+                        _pixbuf, _full_sizes_t = DecodeWorkerPool.decode_path(source, fit)
+                    else:
+                        _pixbuf, _full_sizes_t = DecodeWorkerPool.decode_data(DecodeWorkerPool.read_member(source), fit)
+                except Exception as exc:  # pylint: disable=broad-except
+                    # Archive backends raise their own errors (ie: BadZipFile),
+                    # none of which may stop the worker:
+                    debug("prefetch: reading or decoding of %s failed: %s" % (key, exc))
+                    _pixbuf, _full_sizes_t = None, None
+
+                GLib.idle_add(self._on_decoded, job, key, _pixbuf, _full_sizes_t)
+
+            self.queue.task_done()
+
+    def _on_decoded(self, job, key, pixbuf, full_sizes_t):
+        """
+        Idle callback: store a pixbuf decoded by a worker, unless its 'job'
+        was dropped meanwhile.
+        """
+        if self.pending.get(key) != job:
+            return False
+
+        del self.pending[key]
+        self.store(key, pixbuf, full_sizes_t)
+        return False
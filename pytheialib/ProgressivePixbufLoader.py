@@ -11,10 +11,27 @@ from gi.repository import GdkPixbuf, GLib # pylint: disable=import-error
 
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
 from pytheialib.SampleStats import SampleStats
+from pytheialib.StageTimings import StageTimings
 
 # gi.require_version('Gdk', '3.0')
 
 
+class LoadToken:
+    """
+    Identifies one load started by ProgressivePixbufLoader.pixbuf_loader_start().
+
+    The token is passed along with the PixbufLoader signals, so that callbacks
+    can ignore whatever is still emitted for a load that has been cancelled.
+    """
+
+    def __init__(self):
+        self.cancelled = False  # Bool
+
+    def cancel(self):
+        """Flag the load as cancelled"""
+        self.cancelled = True
+
+
 class ProgressivePixbufLoader:
     """
     Asynchronous image loading
@@ -31,15 +48,27 @@ class ProgressivePixbufLoader:
         self.lock = None  # <threading.Lock>
         self.time_start = None  # <Time.time>
         self.time_stop = None  # <Time.time>
-        self.time_load_average = None  # <Float>
+        self.time_load_average = None  # <SampleStats>
+        self.time_first_paint = None  # <Time.time>
+        self.time_first_paint_average = None  # <SampleStats>
+        self.time_read = 0.0  # Float, seconds spent reading the current image
+        self.time_decode = 0.0  # Float, seconds spent feeding the decoder
 
         self.errors = None  # Exception, or whatever
         self.output_image = None  # GtkImage
         self.pixbuf_loader_source_image_fd = None  # _fd
         self.pixbuf_loader = None  # <GdkPixbufLoader>
-        self.max_render_breakpoints = 5  # int
-        self.breakpoint_pos = 0  # int
-        self.breakpoints_render_tuple = ()  # (ints)
+        self.load_token = None  # <LoadToken>
+        self.repaint_scheduler = None  # <RepaintScheduler>
+        self.feed_chunk_size = 65536  # Int, bytes. 0 feeds the whole file at once
+        self.feed_source_id = None  # Int, GLib source id
+        self.decode_to_fit = False  # Bool, decode at display size
+        self.decode_engine = "progressive"  # Str, "progressive" | "threaded"
+        self.decode_pool = None  # <DecodeWorkerPool>
+        self.decode_pending = False  # Bool, threaded decode in progress
+        self.full_resolution_pending = False  # Bool, see load_full_resolution()
+        self.full_resolution_on_loaded = None  # callable(), see load_full_resolution()
+        self.display_state = None  # <DisplayState>
 
     def pixbuf_loader_free(self):
         """
@@ -47,66 +76,52 @@ class ProgressivePixbufLoader:
         """
         gdebug(f"# {self.__class__}:{callee()}")
 
-        self.pixbuf_loader_source_image_fd.close()
-        # TODO: Add smart exception handling here
+        # Stop feeding a loader that is going away:
+        if self.feed_source_id:
+            GLib.source_remove(self.feed_source_id)
+            self.feed_source_id = None
 
-        self.pixbuf_loader.close()
-        del self.pixbuf_loader
-        return True
+        # And repainting what it decoded:
+        self.repaint_scheduler.cancel()
 
-    def _max_render_breakpoints(self):
-        """Define value of `max_render_breakpoints` depending on `time_load_average.average`"""
-        gdebug(f"# {self.__class__}:{callee()}")
+        # A threaded decode can't be interrupted, but its result gets ignored:
+        self.decode_pending = False
+        self.full_resolution_pending = False
+        self.full_resolution_on_loaded = None
+
+        # Nothing may have been opened when the image came from the PrefetchRing:
+        if self.pixbuf_loader_source_image_fd:
+            self.pixbuf_loader_source_image_fd.close()
+            self.pixbuf_loader_source_image_fd = None
+        # TODO: Add smart exception handling here
 
-        if self.time_load_average.average:
-            if self.time_load_average.average < 0.5:
-                self.max_render_breakpoints = 2
-            elif 0.1 < self.time_load_average.average < 1:
-                self.max_render_breakpoints = 3
-            elif 0.5 < self.time_load_average.average < 2:
-                self.max_render_breakpoints = 4
-            else:
-                self.max_render_breakpoints = 6
+        if self.pixbuf_loader:
+            try:
+                self.pixbuf_loader.close()
+            except GLib.GError as exc:  # pylint: disable=catching-non-exception
+                # Expected when the load was cancelled before its end:
+                debug("PixbufLoader closed early: %s" % str(exc))
+            self.pixbuf_loader = None
+        return True
 
-    def gen_render_breakpoints(self):
+    def cancel_load(self):
         """
-        Determine which received data block should trigger a display update,
-        to avoid taking too much resources updating for each one
+        Abort the load in progress, if any: its token is cancelled so that late
+        signals get ignored, and the loader is freed without being fed the rest
+        of the source image.
         """
         gdebug(f"# {self.__class__}:{callee()}")
 
-        if not self.max_render_breakpoints:
-            raise TypeError("max_render_breakpoints should be defined")
-        elif not self.source_image.orientation:
-            raise TypeError("Use register_image() first")
-
-        self._max_render_breakpoints()
-        bdebug("max_render_breakpoints is now: %s" % self.max_render_breakpoints)
-
-        _bpl = []
-        idx = None
-        chunks_idx = [i for i in range(self.max_render_breakpoints)[1:]]
-        chunks_idx.reverse()
-        bdebug("chunks_idx = %s" % chunks_idx)
-
-        if self.source_image.orientation == "landscape":
-            for idx in chunks_idx:
-                _bpl.append(self.source_image.width / idx)
-
-        elif self.source_image.orientation == "portrait":
-            for idx in chunks_idx:
-                _bpl.append(self.source_image.height / idx)
-
-        else:
-            for idx in chunks_idx:
-                _bpl.append(self.source_image.width / idx)
-
-        self.breakpoints_render_tuple = tuple(_bpl)
-        bdebug("breakpoints_render_tuple = %s" % str(self.breakpoints_render_tuple))
+        if self.load_token:
+            self.load_token.cancel()
+        self.pixbuf_loader_free()
 
-        del idx
-        del _bpl
-        del chunks_idx
+    def is_loading(self):
+        """
+        Returns True while source image data is still being fed to the loader,
+        or decoded by a worker
+        """
+        return bool(self.feed_source_id) or self.decode_pending or self.full_resolution_pending
 
     def set_pixbufloader(self):
         """
@@ -131,8 +146,20 @@ class ProgressivePixbufLoader:
         if not self.time_load_average:
             self.time_load_average = SampleStats()
             self.time_load_average.set_maxvalues(5)
+        if not self.time_first_paint_average:
+            self.time_first_paint_average = SampleStats()
+            self.time_first_paint_average.set_maxvalues(5)
         debug("time_load_average_values =>" + str(self.time_load_average.values))
+        debug("time_first_paint_average_values =>" + str(self.time_first_paint_average.values))
         self.time_start = time.time()  # stop set by DisplayState.state_commit()
+        self.time_first_paint = None  # set by mark_first_paint()
+        self.time_read = 0.0
+        self.time_decode = 0.0
+
+        if self.decode_engine == "threaded" and isinstance(self.source_image.imagefile, str):
+            # Workers read archive members themselves, nothing is extracted:
+            self._threaded_start()
+            return
 
         # SourceImage():
         if str(type(self.source_image.imagefile)).__contains__("pytheialib"):
@@ -141,9 +168,10 @@ class ProgressivePixbufLoader:
             self.pixbuf_loader_source_image_fd = self.source_image.imagefile
 
         else:
-            # Regular file opening:
+            # Regular file opening, or archive member stream, fed as it is
+            # decompressed:
             try:
-                self.pixbuf_loader_source_image_fd = open(self.source_image.imagefile, "rb")
+                self.pixbuf_loader_source_image_fd = self.source_image.open_imagefile()
             except IOError as exc:
                 debug("IOError(%s): %s while opening: %s" % (exc.errno, exc.strerror, self.source_image.imagefile))
                 return
@@ -155,20 +183,203 @@ class ProgressivePixbufLoader:
         # provide hook for plugins
         self.plugins.plugins_hooks_on_event_generic("on_image_load_start")
 
-        # Attach to callbacks:
-        self.pixbuf_loader.connect("area-prepared", self.callbacks.cb_area_prepared)
-        self.pixbuf_loader.connect("area-updated", self.callbacks.cb_area_updated)
-        self.pixbuf_loader.connect("closed", self.callbacks.cb_area_closed)
+        # Attach to callbacks, along with the token identifying this load:
+        self.load_token = LoadToken()
+        self.pixbuf_loader.connect("area-prepared", self.callbacks.cb_area_prepared, self.load_token)
+        self.pixbuf_loader.connect("area-updated", self.callbacks.cb_area_updated, self.load_token)
+        self.pixbuf_loader.connect("closed", self.callbacks.cb_area_closed, self.load_token)
+        if self.decode_to_fit:
+            self.pixbuf_loader.connect("size-prepared", self.callbacks.cb_size_prepared, self.load_token)
+
+        if self.feed_chunk_size:
+            # Streaming mode: feed one chunk per main loop iteration, letting
+            # partial results be painted in between:
+            self.feed_source_id = GLib.idle_add(self._feed_chunk)
+            return
 
         # start chunks feeding:
         try:
-            self.pixbuf_loader.write(self.pixbuf_loader_source_image_fd.read())
+            _start = time.perf_counter()
+            _data = self.pixbuf_loader_source_image_fd.read()
+            _read_done = time.perf_counter()
+            self.time_read = _read_done - _start
+
+            self.pixbuf_loader.write(_data)
+            self.time_decode = time.perf_counter() - _read_done
+            self.errors = None
 
         except GLib.GError as exc:  # pylint: disable=catching-non-exception
             # to be treated by Callbacks.cb_area_closed()
-            bdebug("Loading Error Detected: %s" % str(exc))
-            _error_image = os.path.join(self.platform.pytheia_data_dir_system, "loading_error.svg")
-            self.image_display.active_pixbuf = GdkPixbuf.Pixbuf.new_from_file(_error_image)
-            self.image_display_widget.main_image.set_from_pixbuf(self.image_display.active_pixbuf)
+            self._display_loading_error(exc)
 
+        self._record_stage_timings()
         self.pixbuf_loader.close()
+
+    def _threaded_start(self):
+        """
+        Have the source image read and decoded by the DecodeWorkerPool, the
+        main loop staying free until the result is handed over to
+        _threaded_decoded().
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        # Allow detection of errors, as set_pixbufloader() does:
+        self.errors = True
+
+        # provide hook for plugins
+        self.plugins.plugins_hooks_on_event_generic("on_image_load_start")
+
+        _fit = None
+        if self.decode_to_fit:
+            _fit = self.display_state.fit_target_method()
+
+        self.load_token = LoadToken()
+        self.decode_pending = True
+        self.decode_pool.submit(self._decode_source(), _fit, self._threaded_decoded, self.load_token)
+
+    def _decode_source(self):
+        """
+        Returns what the DecodeWorkerPool is to decode: the archive member
+        *ItemCacheable, or else the path of the source image
+        """
+        if self.source_image.imageitem is not None:
+            return self.source_image.imageitem
+
+        return self.source_image.imagefile
+
+    def _threaded_decoded(self, pixbuf, full_sizes_t, error, load_token):
+        """
+        DecodeWorkerPool callback, run by the main loop
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), pixbuf))
+
+        if load_token.cancelled:
+            return
+
+        self.decode_pending = False
+        self.time_stop = time.time()
+        self.time_load_average.add_value(self.time_stop - self.time_start)
+        ydebug("Current Loading time = %s" % str(self.time_stop - self.time_start))
+
+        if error:
+            self._display_loading_error(error)
+            self.callbacks.render_state = 2
+            return
+
+        self.errors = None
+        self.callbacks.cb_decoded(pixbuf, full_sizes_t)
+        self.mark_first_paint()
+
+    def _feed_chunk(self):
+        """
+        Idle callback: write the next `feed_chunk_size` bytes of the source
+        image to the PixbufLoader, and close it once the end is reached.
+
+        Returns True as long as there is more to feed.
+        """
+        try:
+            _start = time.perf_counter()
+            _chunk = self.pixbuf_loader_source_image_fd.read(self.feed_chunk_size)
+            _read_done = time.perf_counter()
+            self.time_read += _read_done - _start
+
+            if _chunk:
+                self.pixbuf_loader.write(_chunk)
+                self.time_decode += time.perf_counter() - _read_done
+                return True
+
+            self.errors = None
+            self.feed_source_id = None
+            self._record_stage_timings()
+            self.pixbuf_loader.close()
+
+        except GLib.GError as exc:  # pylint: disable=catching-non-exception
+            # to be treated by Callbacks.cb_area_closed()
+            self._display_loading_error(exc)
+            self.feed_source_id = None
+            try:
+                self.pixbuf_loader.close()
+            except GLib.GError:  # pylint: disable=catching-non-exception
+                pass
+
+        return False
+
+    def _record_stage_timings(self):
+        """
+        Add the read and decode durations of the current load to StageTimings
+        """
+        StageTimings().add_value("read", self.time_read)
+        StageTimings().add_value("decode", self.time_decode)
+
+    def load_full_resolution(self, on_loaded=None):
+        """
+        Have the source image decoded at its full resolution by the
+        DecodeWorkerPool, in place of a `raw_pixbuf` decoded to fit the
+        display (see `decode_to_fit`). `on_loaded()` is called from the main
+        loop once `raw_pixbuf` is replaced, for the display to be refreshed.
+
+        While a full resolution decode is in progress, further calls only
+        replace `on_loaded`.
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if self.full_resolution_pending:
+            self.full_resolution_on_loaded = on_loaded
+            return
+
+        if self.is_loading():
+            # The reduced load in progress is superseded by this one:
+            self.cancel_load()
+            self.callbacks.render_state = 2
+
+        self.load_token = LoadToken()
+        self.full_resolution_pending = True
+        self.full_resolution_on_loaded = on_loaded
+        self.decode_pool.submit(self._decode_source(), None, self._full_resolution_decoded, self.load_token)
+
+    def _full_resolution_decoded(self, pixbuf, full_sizes_t, error, load_token):  # pylint: disable=unused-argument
+        """
+        DecodeWorkerPool callback for load_full_resolution(), run by the main
+        loop
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), pixbuf))
+
+        if load_token.cancelled:
+            return
+
+        _on_loaded = self.full_resolution_on_loaded
+        self.full_resolution_pending = False
+        self.full_resolution_on_loaded = None
+
+        if error:
+            self._display_loading_error(error)
+            return
+
+        self.source_image.width, self.source_image.height = pixbuf.get_properties("width", "height")
+        self.image_display.update_raw_pixbuf(pixbuf)
+        self.image_display.raw_pixbuf_reduced = False
+        self.image_display.raw_pixbuf_complete = True
+
+        if _on_loaded:
+            _on_loaded()
+
+    def _display_loading_error(self, exc):
+        """
+        Replace the displayed image by the 'loading error' one
+        """
+        bdebug("Loading Error Detected: %s" % str(exc))
+        _error_image = os.path.join(self.platform.pytheia_data_dir_system, "loading_error.svg")
+        self.image_display.active_pixbuf = GdkPixbuf.Pixbuf.new_from_file(_error_image)
+        self.image_display_widget.main_image.set_from_pixbuf(self.image_display.active_pixbuf)
+
+    def mark_first_paint(self):
+        """
+        Record, once per load, the time elapsed between the start of the load
+        and the first display commit showing (partial) image data.
+        """
+        if self.time_first_paint is not None or self.time_start is None:
+            return
+
+        self.time_first_paint = time.time()
+        self.time_first_paint_average.add_value(self.time_first_paint - self.time_start)
+        ydebug("Current time to first paint = %s" % str(self.time_first_paint - self.time_start))
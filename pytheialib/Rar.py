@@ -21,7 +21,7 @@ class Rar:
         self.rar_file = None  # Str
         self.handle = None  # <CommandHelper7z>
 
-    def register(self, rar_file, out_dir=None):
+    def register(self, rar_file, out_dir=None, use_listing_cache=True):
         """
         Register rar archive for later treatment
 
@@ -29,10 +29,13 @@ class Rar:
         in the current working directory, whith a name based on archive basename,
         without extension.
 
+        Unless 'use_listing_cache' is False, listings are cached on disk
+        (see CommandHelper7z).
+
         """
         self.rar_file = rar_file
         self.out_dir = out_dir
-        self.handle = CommandHelper7z(rar_file)
+        self.handle = CommandHelper7z(rar_file, use_listing_cache=use_listing_cache)
 
     def _all_files_names(self):
         """
@@ -53,9 +56,33 @@ class Rar:
         self.handle.parse_tech_listing()
         return self._all_files_names()
 
+    def get_index(self):
+        """
+        Returns the <ArchiveIndex> of registered archive, built from its
+        listing. Requires list_all_files() to have been called.
+
+        """
+        return self.handle.index
+
     def extract_file_as(self, member, destination_file):
         """
         Extract specified 'member' from registered archive to 'destination_file'
 
         """
         self.handle.extract_file_as(member, destination_file)
+
+    def extract_files_as(self, members_destinations, staging_dir):
+        """
+        Extract specified (member, destination file) tuples from registered
+        archive at once, staging them in 'staging_dir'. Returns the list of
+        members extracted.
+
+        """
+        return self.handle.extract_files_as(members_destinations, staging_dir)
+
+    def close(self):
+        """
+        Release registered archive: nothing is kept open, as 7z is run for
+        each operation
+
+        """
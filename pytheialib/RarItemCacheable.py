@@ -3,7 +3,9 @@
 
 import os
 
+from pytheialib.ArchiveIndex import ArchiveIndex
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.StageTimings import StageTimings
 from pytheialib.Utils import Utils
 
 
@@ -15,6 +17,19 @@ class RarItemCacheable:
     to avoid bottleneck doing it all at once.
     """
 
+    # One instance per archive member accessed, keep them small:
+    __slots__ = (
+        "archive",
+        "rar",
+        "node_temp_dir",
+        "_filepath",
+        "filepath_norm",
+        "_filename",
+        "filename_norm",
+        "_fd",
+        "used",
+    )
+
     def __init__(self, _archive, _rar, _node_temp_dir, _file):
         gdebug("# %s:%s(%s)" % (self.__class__, callee(), _file))
 
@@ -126,12 +141,13 @@ class RarItemCacheable:
         an MD5 sum of the file basename + relative path inside cache, and
         appending again the clean-text extension (to avoid confusing code/tools
         possibly relying on extension rather than 'magic' mime / headers).
+        The file only exists once complete (see Utils.write_atomically()).
         """
         gdebug(f"# {self.__class__}:{callee()}")
 
-        self.rar.extract_file_as(
-            self.filename,  # member
-            self.filepath_norm,  # destination file
+        Utils.write_atomically(
+            self.filepath_norm,
+            lambda _partial: self.rar.extract_file_as(self.filename, _partial),  # member, destination file
         )
 
     def uncompress_file_if_needed(self):
@@ -146,18 +162,46 @@ class RarItemCacheable:
             raise RuntimeError("filepath_norm unset")
 
         if not os.path.isfile(self.filepath_norm):
-            self._uncompress_file()
+            with StageTimings().measure("extract"):
+                self._uncompress_file()
 
         self._fd = open(str(self.filepath_norm), "rb")
 
+    def open_stream(self, own_handle=False):
+        """
+        Returns a binary file-like object reading this member. Members are
+        extracted by an external command: this one is extracted to the cache
+        directory first.
+
+        With 'own_handle', the stream can be read from any thread: the item
+        itself isn't used to read the extracted file, which other threads
+        never see partially written (see _uncompress_file()).
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if not own_handle:
+            self.uncompress_file_if_needed()
+            return open(self.filepath_norm, "rb")
+
+        if not os.path.isfile(self.filepath_norm):
+            with StageTimings().measure("extract"):
+                self._uncompress_file()
+
+        return open(self.filepath_norm, "rb")
+
     def len(self):
         """
-        Returns size in bytes of 'self.filepath_norm'
+        Returns size in bytes of this member, from the archive index, without
+        extracting it unless the index doesn't know about it
         """
         gdebug(f"# {self.__class__}:{callee()}")
 
+        _size = self.rar.get_index().get(self.filename, ArchiveIndex.UNKNOWN).size
+        if _size >= 0:
+            return _size
+
         self.uncompress_file_if_needed()
-        return len(open(self.filepath_norm, "rb").read())
+        return os.path.getsize(self.filepath_norm)
 
     def readable(self):
         """
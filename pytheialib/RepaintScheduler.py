@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+RepaintScheduler
+"""
+
+import time
+
+import gi  # pylint: disable=import-error
+from gi.repository import GLib  # pylint: disable=import-error
+
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+
+class RepaintScheduler:
+    """
+    Throttle display commits while an image is being decoded.
+
+    PixbufLoader emits "area-updated" for every decoded block, far more often
+    than the display can usefully be refreshed. Updated regions are merged
+    into a dirty rectangle, and `commit` is called with it at most once per
+    `interval_ms`: right away if the previous commit is old enough, otherwise
+    from a GLib timeout, so that the main loop never has to be re-entered
+    from a loader signal.
+    """
+
+    def __init__(self):
+        self.interval_ms = 33  # Int, milliseconds
+        self.commit = None  # callable(dirty_t)
+        self.dirty = None  # (x1, y1, x2, y2)
+        self.source_id = None  # Int, GLib source id
+        self.time_last_commit = 0  # Float, time.monotonic()
+        self.commits_issued = 0  # Int
+        self.commits_coalesced = 0  # Int
+
+    def area_updated(self, x_ofst, y_ofst, width, height):
+        """
+        Record an updated region, and commit or schedule a commit for it
+        """
+        _rect = (x_ofst, y_ofst, x_ofst + width, y_ofst + height)
+        if self.dirty:
+            _rect = (
+                min(self.dirty[0], _rect[0]),
+                min(self.dirty[1], _rect[1]),
+                max(self.dirty[2], _rect[2]),
+                max(self.dirty[3], _rect[3]),
+            )
+        self.dirty = _rect
+
+        if self.source_id:
+            # A commit is already due, this region will be part of it:
+            self.commits_coalesced += 1
+            return
+
+        _wait_ms = self.interval_ms - (time.monotonic() - self.time_last_commit) * 1000
+        if _wait_ms <= 0:
+            self._commit()
+        else:
+            self.source_id = GLib.timeout_add(int(_wait_ms) + 1, self._on_timeout)
+
+    def _on_timeout(self):
+        """
+        GLib timeout callback: commit the regions updated since the last commit
+        """
+        self.source_id = None
+        if self.dirty:
+            self._commit()
+        return False
+
+    def _commit(self):
+        """
+        Hand the dirty rectangle over to `commit`
+        """
+        _dirty = self.dirty
+        self.dirty = None
+        self.time_last_commit = time.monotonic()
+        self.commits_issued += 1
+        self.commit(_dirty)
+
+    def cancel(self):
+        """
+        Forget about pending regions, and the commit scheduled for them
+        """
+        if self.source_id:
+            GLib.source_remove(self.source_id)
+            self.source_id = None
+        self.dirty = None
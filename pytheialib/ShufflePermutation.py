@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+ShufflePermutation
+"""
+
+import random
+
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+
+class ShufflePermutation:
+    """
+    Seeded random permutation of range(size), computed one index at a time.
+
+    Indexes go through a balanced Feistel network over the smallest even
+    count of bits holding 'size', which is a bijection over that power of
+    two. Results falling past 'size' are fed through the network again
+    (cycle walking) until they don't, which keeps it a bijection over
+    range(size): the domain being less than 4 times 'size', this takes less
+    than 4 rounds on average.
+
+    Both directions cost O(1), and nothing is materialized, so that
+    shuffling a million files doesn't hold a million entries list. The same
+    'size' and 'seed' always give the same permutation.
+    """
+
+    ROUNDS = 4
+
+    _MASK64 = (1 << 64) - 1
+
+    def __init__(self, size, seed=0):
+        self.size = size  # Int
+        self.seed = seed  # Int
+
+        _bits = max(2, (size - 1).bit_length())
+        _bits += _bits % 2
+        self.half_bits = _bits // 2  # Int
+        self.half_mask = (1 << self.half_bits) - 1  # Int
+
+        # random.Random() gives the same values for the same Int seed,
+        # whatever the Python version:
+        _rng = random.Random(seed)
+        self.round_keys = [_rng.getrandbits(64) for _ in range(self.ROUNDS)]  # [Int]
+
+    def __len__(self):
+        """Handle len() calls"""
+        return self.size
+
+    def __repr__(self):
+        """Text representation of this object"""
+        return "<%s size=%s seed=%s>" % (self.__class__.__name__, self.size, self.seed)
+
+    def _round(self, half, key):
+        """
+        Feistel round function: mixes 'half' with 'key' (splitmix64 finalizer)
+        """
+        _x = (half + key) & self._MASK64
+        _x = ((_x ^ (_x >> 30)) * 0xBF58476D1CE4E5B9) & self._MASK64
+        _x = ((_x ^ (_x >> 27)) * 0x94D049BB133111EB) & self._MASK64
+
+        return (_x ^ (_x >> 31)) & self.half_mask
+
+    def _encrypt(self, value):
+        """One pass of 'value' through the network"""
+        _left, _right = value >> self.half_bits, value & self.half_mask
+        for _key in self.round_keys:
+            _left, _right = _right, _left ^ self._round(_right, _key)
+
+        return (_left << self.half_bits) | _right
+
+    def _decrypt(self, value):
+        """Inverse of _encrypt()"""
+        _left, _right = value >> self.half_bits, value & self.half_mask
+        for _key in reversed(self.round_keys):
+            _left, _right = _right ^ self._round(_left, _key), _left
+
+        return (_left << self.half_bits) | _right
+
+    def _check(self, value):
+        """Raise IndexError if 'value' is out of range(size)"""
+        if not 0 <= value < self.size:
+            raise IndexError("%s out of range(%s)" % (value, self.size))
+
+    def __getitem__(self, index):
+        """
+        Handle permutation[index] calls: the value at 'index' in the shuffled
+        range(size)
+        """
+        self._check(index)
+
+        _value = self._encrypt(index)
+        while _value >= self.size:
+            _value = self._encrypt(_value)
+
+        return _value
+
+    def index(self, value):
+        """
+        Returns the index at which 'value' comes in the shuffled range(size)
+        """
+        self._check(value)
+
+        _index = self._decrypt(value)
+        while _index >= self.size:
+            _index = self._decrypt(_index)
+
+        return _index
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+SortOrder
+"""
+
+import re
+import struct
+import time
+
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+
+class SortOrder:
+    """
+    Order of the files within PathNodes.
+
+    Orders:
+    - name: paths, in str order (the order listings are built in),
+    - natural: paths, with digit runs compared as numbers, so that
+      'page2.jpg' comes before 'page10.jpg',
+    - mtime, size: per entry figures, from members infos along with the
+      listing for archives, stat()'ed when first needed for directories,
+    - exif: EXIF capture date of JPEG files, their mtime otherwise.
+
+    Per entry figures are held as sort keys of the <FileTable> listings, so
+    that sorting again, in another order, doesn't do any I/O. Directories
+    compute them in the background, see PathNodeDirectory._ensure_sort_keys().
+    """
+
+    ORDERS = ("name", "natural", "mtime", "size", "exif")
+
+    # Orders sorting on FileTable sort keys rather than on paths:
+    KEYED_ORDERS = ("mtime", "size", "exif")
+
+    # Bytes read from a file to look for its EXIF capture date:
+    EXIF_READ_SIZE = 131072
+
+    _DIGITS_RE = re.compile(r"([0-9]+)")
+
+    def __init__(self, order="name", reverse=False):
+        self.order = None  # Str, in ORDERS
+        self.reverse = False  # Bool
+
+        self.set_order(order, reverse)
+
+    def __str__(self):
+        """Text representation of this object, ie: 'natural, reversed'"""
+        return self.order + (", reversed" if self.reverse else "")
+
+    def set_order(self, order, reverse=None):
+        """
+        Set the sort 'order', and whether it is reversed unless 'reverse' is
+        None
+        """
+        gdebug("# %s:%s(%s, %s)" % (self.__class__, callee(), order, reverse))
+
+        if order not in self.ORDERS:
+            raise ValueError("Unknown sort order: %s" % str(order))
+
+        self.order = order
+        if reverse is not None:
+            self.reverse = bool(reverse)
+
+    def cycle(self):
+        """
+        Switch to the next order of ORDERS, the first after the last one
+        """
+        self.set_order(self.ORDERS[(self.ORDERS.index(self.order) + 1) % len(self.ORDERS)])
+
+    def toggle_reverse(self):
+        """
+        Reverse the current order
+        """
+        self.reverse = not self.reverse
+
+    @classmethod
+    def natural_key(cls, path):
+        """
+        Returns the natural sort key of 'path': its text parts, case
+        insensitive, alternating with its digit runs as Int
+        """
+        _parts = cls._DIGITS_RE.split(path.lower())
+        # Split on a capturing group, digit runs are at odd indexes:
+        _parts[1::2] = [int(_part) for _part in _parts[1::2]]
+
+        return _parts
+
+    def permutation(self, table):
+        """
+        Returns the list of the <FileTable> 'table' indexes, in this order.
+        Ties are broken by path. Keyed orders fall back to paths when 'table'
+        doesn't hold the needed keys, or some are unknown (see
+        FileTable.missing_sort_keys()).
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), table))
+
+        # pylint: disable=protected-access
+        _values = None
+        if self.order in self.KEYED_ORDERS and self.order not in table.stale_sort_keys:
+            _values = table.sort_keys.get(self.order)
+
+        if _values is not None:
+            _key = lambda _i: (_values[_i], table._get(_i))
+        elif self.order == "natural":
+            _key = lambda _i: (self.natural_key(table._get(_i)), table._get(_i))
+        else:
+            _key = table._get
+
+        return sorted(range(len(table)), key=_key, reverse=self.reverse)
+
+    @classmethod
+    def exif_timestamp(cls, path):
+        """
+        Returns the EXIF capture date (DateTimeOriginal, or DateTime) of the
+        JPEG file 'path', as seconds since the epoch, or None
+        """
+        try:
+            with open(path, "rb") as _fd:
+                _head = _fd.read(cls.EXIF_READ_SIZE)
+        except OSError as exc:
+            debug("can't read %s: %s" % (path, exc))
+            return None
+
+        if _head[:2] != b"\xff\xd8":  # not a JPEG
+            return None
+
+        # Walk segments up to the APP1 one holding EXIF data:
+        _pos = 2
+        while _pos + 4 <= len(_head) and _head[_pos] == 0xFF:
+            _marker = _head[_pos + 1]
+            if _marker in (0xD9, 0xDA):  # end of image, start of scan
+                return None
+
+            _length = struct.unpack(">H", _head[_pos + 2 : _pos + 4])[0]
+            if _marker == 0xE1 and _head[_pos + 4 : _pos + 10] == b"Exif\x00\x00":
+                return cls._tiff_timestamp(_head[_pos + 10 : _pos + 2 + _length])
+
+            _pos += 2 + _length
+
+        return None
+
+    @staticmethod
+    def _tiff_timestamp(tiff):
+        """
+        Returns the capture date held by the EXIF 'tiff' structure, as
+        seconds since the epoch, or None
+        """
+        if tiff[:2] == b"II":
+            _endian = "<"
+        elif tiff[:2] == b"MM":
+            _endian = ">"
+        else:
+            return None
+
+        def ifd_values(offset):
+            """Returns {tag: (type, count, raw value)} of the IFD at 'offset'"""
+            _values = {}
+            _count = struct.unpack(_endian + "H", tiff[offset : offset + 2])[0]
+            for _i in range(_count):
+                _start = offset + 2 + 12 * _i
+                _tag, _type, _n, _raw = struct.unpack(_endian + "HHI4s", tiff[_start : _start + 12])
+                _values[_tag] = (_type, _n, _raw)
+            return _values
+
+        def ascii_value(entry):
+            """Returns the str value of an ASCII 'entry', stored inline or not"""
+            _type, _n, _raw = entry
+            if _type != 2:
+                return None
+            if _n <= 4:
+                return _raw[:_n].rstrip(b"\x00").decode("ascii")
+            _offset = struct.unpack(_endian + "I", _raw)[0]
+            return tiff[_offset : _offset + _n].rstrip(b"\x00").decode("ascii")
+
+        try:
+            _ifd0 = ifd_values(struct.unpack(_endian + "I", tiff[4:8])[0])
+
+            _entries = []
+            if 0x8769 in _ifd0:  # EXIF IFD pointer
+                _exif = ifd_values(struct.unpack(_endian + "I", _ifd0[0x8769][2])[0])
+                # DateTimeOriginal, DateTimeDigitized:
+                _entries.extend(_exif[_tag] for _tag in (0x9003, 0x9004) if _tag in _exif)
+            if 0x0132 in _ifd0:  # DateTime
+                _entries.append(_ifd0[0x0132])
+
+            for _entry in _entries:
+                _value = ascii_value(_entry)
+                if _value and not _value.startswith("0000"):
+                    return time.mktime(time.strptime(_value[:19], "%Y:%m:%d %H:%M:%S"))
+
+        except (struct.error, ValueError, OverflowError, UnicodeDecodeError) as exc:
+            debug("unreadable EXIF data: %s" % exc)
+
+        return None
@@ -13,8 +13,11 @@ class SourceImage:
 
     def __init__(self):
         self.imagefile = None  # Str
+        self.imageitem = None  # <*ItemCacheable>, when the image is an archive member
         self.width = None  # Int
         self.height = None  # Int
+        self.full_width = None  # Int, when decoded smaller than the source
+        self.full_height = None  # Int, when decoded smaller than the source
         self.orientation = None  # Str
         self.prominent_axis = None  # Str
 
@@ -35,9 +38,32 @@ class SourceImage:
         elif self.imagefile:
             raise RuntimeError("Use SourceImage.unregister() first")
 
-        # Path
-        current_pathnode.preaccess_current()
+        # Path. Archive members aren't extracted: 'imagefile' only exists
+        # once ensure_imagefile() is called:
         self.imagefile = current_pathnode.current_path
+        self.imageitem = current_pathnode.current_item()
+
+    def open_imagefile(self):
+        """
+        Returns a binary file-like object reading the source image: the
+        archive member stream, or the file at 'imagefile'
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if self.imageitem is not None:
+            return self.imageitem.open_stream()
+
+        return open(self.imagefile, "rb")
+
+    def ensure_imagefile(self):
+        """
+        Make sure 'imagefile' exists, extracting the archive member to the
+        cache directory if needed, for code pieces requiring a real file
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if self.imageitem is not None:
+            self.imageitem.uncompress_file_if_needed()
 
     def unregister_image(self):
         """
@@ -50,6 +76,9 @@ class SourceImage:
 
         self.width = None
         self.height = None
+        self.full_width = None
+        self.full_height = None
         self.orientation = None
         self.prominent_axis = None
         self.imagefile = None
+        self.imageitem = None
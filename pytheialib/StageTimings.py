@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+StageTimings
+"""
+
+import contextlib
+import json
+import threading
+import time
+
+from pytheialib.Borg import Borg
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+# Stages of an image load, in order:
+STAGES = ("seek", "extract", "read", "decode", "scale", "set_from_pixbuf")
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of durations, in seconds.
+
+    Buckets upper bounds grow in a 1-2-5 sequence from 0.1 ms to 10 s, plus a
+    last unbounded one, so that memory use doesn't depend on the number of
+    samples. Percentiles are given as the upper bound of the bucket they fall
+    in (or the largest sample, when lower).
+    """
+
+    BOUNDS = tuple(
+        _mult * _base for _base in (0.0001, 0.001, 0.01, 0.1, 1) for _mult in (1, 2, 5)
+    ) + (10, float("inf"))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BOUNDS)  # [Int]
+        self.count = 0  # Int
+        self.total = 0.0  # Float, seconds
+        self.max = 0.0  # Float, seconds
+
+    def add_value(self, seconds):
+        """
+        Add a duration to the histogram
+        """
+        for _idx, _bound in enumerate(self.BOUNDS):
+            if seconds <= _bound:
+                self.counts[_idx] += 1
+                break
+
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percent):
+        """
+        Returns the duration `percent` % of the samples are lower than, or
+        None when empty.
+        """
+        if not self.count:
+            return None
+
+        _rank = percent / 100.0 * self.count
+        _cumulated = 0
+        for _idx, _count in enumerate(self.counts):
+            _cumulated += _count
+            if _cumulated >= _rank:
+                return min(self.BOUNDS[_idx], self.max)
+
+        return self.max
+
+    def summary(self):
+        """
+        Returns a dict of count, mean, max, p50, p95 and p99
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class StageTimings(Borg):
+    """
+    Per-stage timings of image loads, see STAGES.
+
+    All instances share their histograms, so that any module can record or
+    query timings without a reference being passed around. Samples may be
+    added from worker threads.
+    """
+
+    def __init__(self):
+        Borg.__init__(self)
+
+        if not hasattr(self, "histograms"):
+            self.histograms = {_stage: Histogram() for _stage in STAGES}  # {Str: <Histogram>}
+            self.lock = threading.Lock()
+
+    def add_value(self, stage, seconds):
+        """
+        Record a duration, in seconds, for `stage`
+        """
+        with self.lock:
+            self.histograms[stage].add_value(seconds)
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        """
+        Context manager recording the duration of its block for `stage`
+        """
+        _start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_value(stage, time.perf_counter() - _start)
+
+    def summary(self):
+        """
+        Returns {stage: Histogram.summary()} for every stage
+        """
+        with self.lock:
+            return {_stage: self.histograms[_stage].summary() for _stage in STAGES}
+
+    def dump(self, path):
+        """
+        Write summary() to `path`, as JSON
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), path))
+
+        with open(path, "w") as _fd:
+            json.dump(self.summary(), _fd, indent=2)
+
+    def clear(self):
+        """
+        Erase all recorded timings
+        """
+        with self.lock:
+            self.histograms = {_stage: Histogram() for _stage in STAGES}
@@ -4,6 +4,7 @@ SupportingPool
 """
 
 import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from . import pathnode_factory_support
 from .Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
@@ -24,6 +25,11 @@ class SupportingPool:
         self.path_nodes_factory = None  # <PathNodesFactory>
         self.path_index = None  # <PathIndex>
 
+        self.walk_workers = 8  # Int, threads scanning directories
+        self.listings = None  # Dict, see _walk_directories()
+        self.registered_directories = None  # Set, directory nodes start_uri
+        self.native_extensions = None  # Set
+
     def initialize(self):
         """
         Loads additional formats supports and make it available
@@ -47,17 +53,77 @@ class SupportingPool:
         del _extra
         self.path_nodes_factory.add_to_supporting_pool(self.supporting_pool_d)
 
-    @staticmethod
-    def _has_only_subdirs(_path):
+    def _has_only_subdirs(self, _path):
         """
         Returns True if 'dir' has only directories as child, and no files
         """
         rdebug("# _has_only_subdirs(%s)" % str(_path))
-        for i in os.listdir(_path):
-            if not os.path.isdir(os.path.join(_path, i)):
+
+        _listing = self.listings.get(os.path.normpath(_path)) if self.listings else None
+        if _listing is None:
+            _listing = self._scan_directory(os.path.normpath(_path))[1]
+
+        for _entry_path, _is_dir, _is_file in _listing:  # pylint: disable=unused-variable
+            if not _is_dir:
                 return False
         return True
 
+    @staticmethod
+    def _scan_directory(directory):
+        """
+        Returns (directory, entries), entries being a list of
+        (path, is_dir, is_file) tuples, in os.scandir() order. Symlinks are
+        followed. Symlinked directories leading to an ancestor are reported
+        as neither directories nor files, to avoid endless recursion.
+        """
+        _entries = []
+
+        try:
+            with os.scandir(directory) as _iterator:
+                for _entry in _iterator:
+                    _is_dir = _entry.is_dir()
+                    if _is_dir and _entry.is_symlink():
+                        _target = os.path.realpath(_entry.path).rstrip(os.path.sep) + os.path.sep
+                        if (os.path.realpath(directory) + os.path.sep).startswith(_target):
+                            debug("symlink loop skipped: %s -> %s" % (_entry.path, _target))
+                            _entries.append((_entry.path, False, False))
+                            continue
+
+                    _entries.append((_entry.path, _is_dir, _entry.is_file()))
+
+        except OSError as exc:
+            debug("can't scan %s: %s" % (directory, exc))
+
+        return directory, _entries
+
+    def _walk_directories(self, top_directories):
+        """
+        Scan 'top_directories' and all their subdirectories, on a pool of
+        threads. Returns a dict: {directory: entries}, see _scan_directory().
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), str(top_directories)))
+
+        _listings = {}
+        _submitted = set(top_directories)
+
+        with ThreadPoolExecutor(max_workers=self.walk_workers, thread_name_prefix="pytheia-walk") as _executor:
+            _pending = {_executor.submit(self._scan_directory, _dir) for _dir in _submitted}
+
+            while _pending:
+                _done, _pending = wait(_pending, return_when=FIRST_COMPLETED)
+
+                for _future in _done:
+                    _directory, _entries = _future.result()
+                    _listings[_directory] = _entries
+
+                    for _entry_path, _is_dir, _is_file in _entries:  # pylint: disable=unused-variable
+                        if _is_dir and _entry_path not in _submitted:
+                            _submitted.add(_entry_path)
+                            _pending.add(_executor.submit(self._scan_directory, _entry_path))
+
+        debug("%s directories walked" % len(_listings))
+        return _listings
+
     @staticmethod
     def lcext(ext_s):
         """
@@ -90,79 +156,109 @@ class SupportingPool:
         it if supported.
 
         It can later be populated and used.
-        Recursivity is enabled depending on <CliParse> values.
+        Recursivity is enabled depending on <CliParse> values: directories
+        trees are then walked in parallel first, and nodes appended in the
+        order a depth-first, os.scandir() ordered, traversal gives.
 
         """
         rdebug("# %s:%s(%s)" % (self.__class__, callee(), str(cli_parse_items)))
 
-        _lc = self.lcext
-        for _requested_path in cli_parse_items:
-            _requested_path = os.path.abspath(_requested_path)
-            debug("<iter> _requested_path = " + _requested_path)
-
-            # noinspection PyUnusedLocal
-            _container_dir = None
+        _requested_paths = [os.path.abspath(_path) for _path in cli_parse_items]
 
+        for _requested_path in _requested_paths:
             if not os.path.isdir(_requested_path) and not os.path.isfile(_requested_path):
                 # FIXME: do not always raise error here, ie: symlink case.
                 # FIXME: shall we follow symlink ? How to manage broken symlinks?
                 # TODO: Remove this error when protocol based res. support added
                 raise ValueError("Type error, should be a file or a dir: %s" % _requested_path)
 
-            # Match first on an additional provider based on filename extension:
-            # FIXME: add some mime handling here.
-            if os.path.isdir(_requested_path):
-                # Directories are not extensions based, so force support here:
-                _ext = "DIRECTORY"
-                _container_dir = _requested_path + os.path.sep
-            else:
-                _ext = os.path.splitext(_requested_path)[1]
-                _container_dir = os.path.dirname(_requested_path) + os.path.sep
-
-            debug("_container_dir ===========> %s" % _container_dir)
-            # Match with proper support provider, if any
-            if (
-                _lc(_ext) in (self.supporting_pool_d)
-                and _container_dir
-                not in ([i.start_uri for i in self.path_index.path_nodes_store.store if i.start_uri.endswith("/")])
-                and not self._has_only_subdirs(_container_dir)
-            ):
-                # create a PathNode of the correct type via Factory and get
-                # it stored in path_index's pathnodes_store:
-                self.path_index.append_node(
+        self.listings = {}
+        if self.cli_parse.args.recursive:
+            self.listings = self._walk_directories([_path for _path in _requested_paths if os.path.isdir(_path)])
+
+        # Directories already having a node, to avoid doubloons:
+        self.registered_directories = {
+            i.start_uri for i in self.path_index.path_nodes_store.store if i.start_uri.endswith("/")
+        }
+        self.native_extensions = set(Mime().get_supported_extensions())
+
+        for _requested_path in _requested_paths:
+            self._evaluate_path(_requested_path, os.path.isdir(_requested_path), os.path.isfile(_requested_path))
+
+        self.listings = None
+
+    def _append_node(self, node_data):
+        """
+        Have path_index append a node, keeping track of directories ones
+        """
+        self.path_index.append_node(node_data)
+
+        _start_uri = self.path_index.path_nodes_store.store[-1].start_uri
+        if _start_uri.endswith("/"):
+            self.registered_directories.add(_start_uri)
+
+    def _evaluate_path(self, _requested_path, is_dir, is_file):
+        """
+        Evaluate one absolute path, and its subdirectories if recursive
+        """
+        debug("<iter> _requested_path = " + _requested_path)
+
+        _lc = self.lcext
+
+        # noinspection PyUnusedLocal
+        _container_dir = None
+
+        # Match first on an additional provider based on filename extension:
+        # FIXME: add some mime handling here.
+        if is_dir:
+            # Directories are not extensions based, so force support here:
+            _ext = "DIRECTORY"
+            _container_dir = _requested_path + os.path.sep
+        else:
+            _ext = os.path.splitext(_requested_path)[1]
+            _container_dir = os.path.dirname(_requested_path) + os.path.sep
+
+        debug("_container_dir ===========> %s" % _container_dir)
+        # Match with proper support provider, if any
+        if (
+            _lc(_ext) in (self.supporting_pool_d)
+            and _container_dir not in self.registered_directories
+            and not self._has_only_subdirs(_container_dir)
+        ):
+            # create a PathNode of the correct type via Factory and get
+            # it stored in path_index's pathnodes_store:
+            self._append_node(
+                {
+                    "current": False,
+                    "node_type": self.supporting_pool_d[_lc(_ext)]["factory"]["name"],
+                    "node_uri": _requested_path,
+                    "recursive": self.supporting_pool_d[_lc(_ext)]["factory"]["recursive"],
+                }  # Dict node_data
+            )
+        # Path is a file, not supported by add. support, but a native one:
+        elif is_file and (_lc(_ext) in self.native_extensions):
+            # Make sure the containing directory for that file isn't
+            # already registered (i.e. avoid doubloons):
+            if os.path.dirname(_requested_path) + os.path.sep not in self.registered_directories:
+                self._append_node(
                     {
                         "current": False,
-                        "node_type": self.supporting_pool_d[_lc(_ext)]["factory"]["name"],
-                        "node_uri": _requested_path,
-                        "recursive": self.supporting_pool_d[_lc(_ext)]["factory"]["recursive"],
+                        "node_type": "location_directory",
+                        "node_uri": Utils.containing_directory(_requested_path),
+                        "start_uri": _requested_path,
+                        "recursive": self.supporting_pool_d["DIRECTORY"][("factory")]["recursive"],
                     }  # Dict node_data
                 )
-            # Path is a file, not supported by add. support, but a native one:
-            elif os.path.isfile(_requested_path) and (_lc(_ext) in Mime().get_supported_extensions()):
-                # Make sure the containing directory for that file isn't
-                # already registered (i.e. avoid doubloons):
-                if os.path.dirname(_requested_path) + os.path.sep not in (
-                    [i.start_uri for i in self.path_index.path_nodes_store.store if i.start_uri.endswith("/")]
-                ):
-                    self.path_index.append_node(
-                        {
-                            "current": False,
-                            "node_type": "location_directory",
-                            "node_uri": Utils.containing_directory(_requested_path),
-                            "start_uri": _requested_path,
-                            "recursive": self.supporting_pool_d["DIRECTORY"][("factory")]["recursive"],
-                        }  # Dict node_data
-                    )
-
-            rdebug("// %s" % _requested_path)
-
-            # Recursivity support
-            if self.cli_parse.args.recursive and (os.path.isdir(_requested_path)):
-                _ls = [os.path.join(_requested_path, i) for i in os.listdir(_requested_path)]
-
-                for _item in _ls:
-                    rdebug("sub eval of: %s" % _item)
-                    if os.path.isdir(_item) or (_lc(_ext) in self.supporting_pool_d):
-                        self.evaluate((_item,))
-                    # files in this directory have already been evaluated, so
-                    # we can skip them here.
+
+        rdebug("// %s" % _requested_path)
+
+        # Recursivity support
+        if self.cli_parse.args.recursive and is_dir:
+            for _item, _item_is_dir, _item_is_file in self.listings.get(_requested_path, ()):
+                if not _item_is_dir and not _item_is_file:
+                    # broken symlink, special file or symlink loop:
+                    rdebug("sub eval skipped for: %s" % _item)
+                    continue
+
+                rdebug("sub eval of: %s" % _item)
+                self._evaluate_path(_item, _item_is_dir, _item_is_file)
@@ -5,8 +5,10 @@ Tar format support
 
 import os
 import tarfile
+import threading
 
 import pytheialib
+from pytheialib.ArchiveIndex import ArchiveIndex
 
 
 class Tar:
@@ -22,6 +24,9 @@ class Tar:
         self.out_dir = None  # Str
         self.handle = None  # <tarfile.TarFile>
         self.all_files_d = None  # Dict
+        self.index = None  # <ArchiveIndex>
+        self.thread_handles = {}  # {Int: <tarfile.TarFile>}, thread ident -> handle
+        self.lock = threading.Lock()  # guards 'thread_handles', used from any thread
 
     def register(self, tar_file, out_dir=None):
         """
@@ -65,6 +70,55 @@ class Tar:
 
         return self._all_files_names()
 
+    def get_index(self):
+        """
+        Returns the <ArchiveIndex> of registered archive, built from its
+        TarInfo on first use. Requires list_all_files() to have been called.
+        Members are compressed as a whole, if at all: compressed sizes and
+        methods are unknown.
+        """
+        if not self.index:
+            self.index = ArchiveIndex()
+
+            for _name, _info in self.all_files_d.items():
+                self.index.add(_name, _info.size, offset=_info.offset_data, mtime=float(_info.mtime))
+
+        return self.index
+
+    def open_member(self, member, own_handle=False):
+        """
+        Returns a binary file-like object, decompressing specified 'member'
+        from registered archive as it is read.
+
+        With 'own_handle', the member is read through a handle of the archive
+        private to the calling thread, so that it can be read from any thread.
+        Requires list_all_files() to have been called.
+        """
+        if not own_handle:
+            return self.handle.extractfile(member)
+
+        _ident = threading.get_ident()
+        with self.lock:
+            if _ident not in self.thread_handles:
+                self.thread_handles[_ident] = tarfile.open(self.tar_file, "r")
+            _handle = self.thread_handles[_ident]
+
+        # The TarInfo locates the member data: the handle doesn't have to
+        # read the whole archive to find it by name:
+        return _handle.extractfile(self.all_files_d[member])
+
+    def close(self):
+        """
+        Close the archive, and the handles private to threads
+        """
+        with self.lock:
+            for _handle in self.thread_handles.values():
+                _handle.close()
+            self.thread_handles = {}
+
+        if self.handle:
+            self.handle.close()
+
     def extract_file_tobuffer(self, member):
         """
         Extract specified 'member' from registered archive to an
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+TiledRenderer
+"""
+
+import math
+from collections import OrderedDict
+
+import gi  # pylint: disable=import-error
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gdk, GdkPixbuf, Gtk  # pylint: disable=import-error
+
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+
+class TiledRenderer:
+    """
+    Zoom and pan very large images with bounded memory and latency.
+
+    Instead of scaling the whole decoded image at every zoom step, a mipmap
+    pyramid is derived from it (each level halving the previous one, built
+    on first use), and only the fixed-size tiles intersecting the visible
+    part of the scrolled viewport are scaled, from the nearest level at least
+    as large as the display. Scaled tiles are kept in a LRU.
+
+    The tiles are painted by a Gtk.DrawingArea that ImageDisplayWidget puts
+    in place of `main_image` while the renderer is in use.
+    """
+
+    def __init__(self):
+        self.tile_size = 256  # Int, pixels
+        self.tiles_capacity = 256  # Int, number of tiles
+        self.threshold_pixels = 40 * 1000 * 1000  # Int, 0 disables
+
+        self.levels = []  # [<GdkPixbuf>], levels[0] being the decoded image
+        self.tiles = OrderedDict()  # {(Int, Float, Int, Int): <GdkPixbuf>}
+        self.zoom = None  # Float, displayed size / decoded size
+        self.drawing_area = None  # <Gtk.DrawingArea>
+
+    def accepts(self, pixbuf):
+        """
+        Returns True if `pixbuf` is large enough to be rendered by tiles
+        """
+        if not self.threshold_pixels or not pixbuf:
+            return False
+
+        _w, _h = pixbuf.get_properties("width", "height")
+        return _w * _h >= self.threshold_pixels
+
+    @property
+    def active(self):
+        """True while an image is rendered by tiles"""
+        return self.zoom is not None
+
+    def get_drawing_area(self):
+        """
+        Returns the widget painting the tiles, creating it on first call
+        """
+        if not self.drawing_area:
+            self.drawing_area = Gtk.DrawingArea()
+            self.drawing_area.connect("draw", self.cb_draw)
+            self.drawing_area.show()
+
+        return self.drawing_area
+
+    def displayed_sizes(self):
+        """
+        Returns the (width, height) of the image, as currently displayed
+        """
+        _w, _h = self.levels[0].get_properties("width", "height")
+        return max(1, int(_w * self.zoom)), max(1, int(_h * self.zoom))
+
+    def render(self, pixbuf, zoom):
+        """
+        Display `pixbuf` scaled by `zoom`. The pyramid and tiles are kept as
+        long as the same pixbuf is rendered.
+        """
+        gdebug("# %s:%s(%s, %s)" % (self.__class__, callee(), pixbuf, zoom))
+
+        if not self.levels or self.levels[0] is not pixbuf:
+            self.clear()
+            self.levels.append(pixbuf)
+
+        self.zoom = zoom
+
+        _drawing_area = self.get_drawing_area()
+        _drawing_area.set_size_request(*self.displayed_sizes())
+        _drawing_area.queue_draw()
+
+    def clear(self):
+        """
+        Drop the pyramid and tiles, and stop rendering
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        self.levels = []
+        self.tiles.clear()
+        self.zoom = None
+
+    def _level(self, index):
+        """
+        Returns the pyramid level for `index`, or the smallest one available,
+        building missing levels from the previous ones.
+        """
+        while len(self.levels) <= index:
+            _w, _h = self.levels[-1].get_properties("width", "height")
+            if _w < 2 * self.tile_size or _h < 2 * self.tile_size:
+                break
+
+            self.levels.append(self.levels[-1].scale_simple(_w // 2, _h // 2, GdkPixbuf.InterpType.BILINEAR))
+            bdebug("pyramid level %s built: %sx%s" % (len(self.levels) - 1, _w // 2, _h // 2))
+
+        return min(index, len(self.levels) - 1)
+
+    def _tile(self, level, scale, col, row, sizes_t):
+        """
+        Returns tile (`col`, `row`) of the display grid, scaled by `scale`
+        from pyramid `level`; `sizes_t` are the displayed image dimensions.
+        """
+        _key = (level, scale, col, row)
+        if _key in self.tiles:
+            self.tiles.move_to_end(_key)
+            return self.tiles[_key]
+
+        _x, _y = col * self.tile_size, row * self.tile_size
+        _w = min(self.tile_size, sizes_t[0] - _x)
+        _h = min(self.tile_size, sizes_t[1] - _y)
+
+        _source = self.levels[level]
+        _tile = GdkPixbuf.Pixbuf.new(GdkPixbuf.Colorspace.RGB, _source.get_has_alpha(), 8, _w, _h)
+        # Only the part of the source mapped to this tile gets scaled:
+        _source.scale(_tile, 0, 0, _w, _h, -_x, -_y, scale, scale, GdkPixbuf.InterpType.BILINEAR)
+
+        self.tiles[_key] = _tile
+        while len(self.tiles) > self.tiles_capacity:
+            self.tiles.popitem(last=False)
+
+        return _tile
+
+    def cb_draw(self, widget, cairo_ctx):
+        """
+        Paint the tiles intersecting the area to be redrawn
+        """
+        if not self.active:
+            return False
+
+        # Pick the smallest level still at least as large as the display:
+        _level = self._level(max(0, int(math.floor(-math.log2(self.zoom)))) if self.zoom < 1 else 0)
+        _level_w = self.levels[_level].get_width()
+        _scale = round(self.zoom * self.levels[0].get_width() / _level_w, 6)
+
+        _sizes_t = self.displayed_sizes()
+        _x1, _y1, _x2, _y2 = cairo_ctx.clip_extents()
+
+        _col_first = max(0, int(_x1) // self.tile_size)
+        _col_last = min((_sizes_t[0] - 1) // self.tile_size, int(_x2) // self.tile_size)
+        _row_first = max(0, int(_y1) // self.tile_size)
+        _row_last = min((_sizes_t[1] - 1) // self.tile_size, int(_y2) // self.tile_size)
+
+        for _row in range(_row_first, _row_last + 1):
+            for _col in range(_col_first, _col_last + 1):
+                _tile = self._tile(_level, _scale, _col, _row, _sizes_t)
+                Gdk.cairo_set_source_pixbuf(cairo_ctx, _tile, _col * self.tile_size, _row * self.tile_size)
+                cairo_ctx.rectangle(
+                    _col * self.tile_size,
+                    _row * self.tile_size,
+                    _tile.get_width(),
+                    _tile.get_height(),
+                )
+                cairo_ctx.fill()
+
+        return True
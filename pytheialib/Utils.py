@@ -5,8 +5,11 @@ General purpose helpers
 
 import hashlib
 import os
+import tempfile
 
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.ExtractedBytes import ExtractedBytes
+from pytheialib.StageTimings import StageTimings
 
 
 class Utils:
@@ -164,7 +167,29 @@ class Utils:
         else:
             raise RuntimeError("Orientation incorrect: %s" % orient)
 
-        return reference_pixbuf.scale_simple(ret_w, ret_h, interp_method)
+        with StageTimings().measure("scale"):
+            return reference_pixbuf.scale_simple(ret_w, ret_h, interp_method)
+
+    @staticmethod
+    def write_atomically(destination, write):
+        """
+        Have 'write', a callable taking a path, write a file under a name
+        private to the call, then rename it to 'destination', so that
+        'destination' only ever exists complete, whichever thread reads it.
+        The bytes written are accounted to its directory (see
+        <ExtractedBytes>).
+        """
+        _fd, _partial = tempfile.mkstemp(prefix=".part_", dir=os.path.dirname(destination))
+        os.close(_fd)
+
+        try:
+            write(_partial)
+            _size = os.path.getsize(_partial)
+            os.replace(_partial, destination)
+            ExtractedBytes.add(destination, _size)
+        finally:
+            if os.path.exists(_partial):
+                os.remove(_partial)
 
     @staticmethod
     def containing_directory(path=None):
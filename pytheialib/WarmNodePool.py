@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+WarmNodePool
+"""
+
+import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import gi  # pylint: disable=import-error
+from gi.repository import GLib  # pylint: disable=import-error
+
+from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+
+
+class WarmNodePool:
+    """
+    Keep the last PathNodes left populated, with their listings and
+    extracted members, so that going back to them doesn't list nor extract
+    anything again.
+
+    Up to `capacity` nodes are kept, as long as their footprints (see
+    PathNode.get_footprint()) fit in `memory_budget` and `disk_budget`.
+    Least recently left nodes are evicted first. They are unpopulated from
+    the main loop, as that releases GLib sources and file monitors, their
+    extraction directories being removed by a worker thread, as that can
+    take a while.
+    """
+
+    def __init__(self):
+        self.capacity = 0  # Int, nodes, 0 disables
+        self.memory_budget = 0  # Int, bytes
+        self.disk_budget = 0  # Int, bytes
+        self.path_nodes_store = None  # <PathNodeStore>
+        self.nodes = OrderedDict()  # {id(<PathNode>): (<PathNode>, memory, disk)}, least recently left first
+        self.memory_used = 0  # Int, bytes, sum of 'nodes' memory footprints
+        self.disk_used = 0  # Int, bytes, sum of 'nodes' disk footprints
+        self.evicting = {}  # {id(<PathNode>): <PathNode>}, to be unpopulated from the main loop
+        self.executor = None  # <ThreadPoolExecutor>, removes extraction directories
+
+    def _get_executor(self):
+        """
+        Returns the thread pool, starting it on first use
+        """
+        if not self.executor:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pytheia-evict")
+        return self.executor
+
+    def add(self, node):
+        """
+        Keep 'node', being left, populated. Returns False if the pool is
+        disabled, the caller having to unpopulate it then.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), node.start_uri))
+
+        if not self.capacity:
+            return False
+
+        self.evicting.pop(id(node), None)
+
+        self._forget(id(node))
+        self.nodes[id(node)] = _entry = (node,) + node.get_footprint()
+        self.memory_used += _entry[1]
+        self.disk_used += _entry[2]
+        self._enforce()
+
+        return True
+
+    def discard(self, node):
+        """
+        Stop keeping 'node', entered again or wanted by the navigation,
+        cancelling its eviction if still possible
+        """
+        self._forget(id(node))
+        self.evicting.pop(id(node), None)
+
+    def _forget(self, node_id):
+        """
+        Remove the node of id 'node_id' from 'nodes', if there, and its
+        footprint from the sums. Returns the node, or None.
+        """
+        _entry = self.nodes.pop(node_id, None)
+        if _entry is None:
+            return None
+
+        self.memory_used -= _entry[1]
+        self.disk_used -= _entry[2]
+        return _entry[0]
+
+    def _enforce(self):
+        """
+        Evict least recently left nodes until within capacity and budgets
+        """
+        while self.nodes and (
+            len(self.nodes) > self.capacity
+            or self.memory_used > self.memory_budget
+            or self.disk_used > self.disk_budget
+        ):
+            _node = self._forget(next(iter(self.nodes)))
+            debug("evicting %s" % _node.start_uri)
+
+            self.evicting[id(_node)] = _node
+            GLib.idle_add(self._unpopulate, _node)
+
+    def _unpopulate(self, node):
+        """
+        Idle callback of _enforce(). The node may have been entered again in
+        the meantime: it's only unpopulated if still to be evicted, and not
+        the current one. Tried again later while being populated.
+        """
+        if id(node) not in self.evicting:
+            return False
+
+        if not node.populate_lock.acquire(blocking=False):
+            GLib.timeout_add(100, self._unpopulate, node)
+            return False
+
+        try:
+            del self.evicting[id(node)]
+            if node.populated and node is not self.path_nodes_store.current_pathnode():
+                _temp_dir = node.detach_temp_dir()
+                node.unpopulate()
+                if _temp_dir:
+                    self._get_executor().submit(shutil.rmtree, _temp_dir, ignore_errors=True)
+        finally:
+            node.populate_lock.release()
+
+        return False
+
+    def shutdown(self):
+        """
+        Stop the worker, once removals already requested are done
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
@@ -3,14 +3,95 @@
 Zip format support
 """
 
+import io
+import mmap
 import os
 import shutil
+import struct
 import sys
+import threading
+import time
 import zipfile
 from io import BytesIO
 
 import pytheialib
 from pytheialib import JsonDict
+from pytheialib.ArchiveIndex import ArchiveIndex
+
+# Local file header: signature, and offset of its name and extra field
+# lengths (see the ZIP APPNOTE, 4.3.7):
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+LOCAL_HEADER_LENGTHS_OFFSET = 26
+LOCAL_HEADER_SIZE = 30
+
+# Compression methods names, as 7z names them:
+COMPRESSION_METHODS = {
+    zipfile.ZIP_STORED: "Copy",
+    zipfile.ZIP_DEFLATED: "Deflate",
+    zipfile.ZIP_BZIP2: "BZip2",
+    zipfile.ZIP_LZMA: "LZMA",
+}
+
+
+class ZipStoredMember(io.BufferedIOBase):
+    """
+    Read-only file-like object over the data of a stored (uncompressed) ZIP
+    member, as a slice of the archive memory map: reading it doesn't involve
+    any decompression nor intermediate buffer. getbuffer() hands the data
+    out without copying it at all.
+    """
+
+    def __init__(self, view):
+        super().__init__()
+        self.view = view  # <memoryview>, member data
+        self.pos = 0  # Int
+
+    def readable(self):
+        """Returns True"""
+        return True
+
+    def seekable(self):
+        """Returns True"""
+        return True
+
+    def getbuffer(self):
+        """Returns the member data, as a <memoryview> of the archive map"""
+        return self.view
+
+    def read(self, size=-1):
+        """Reads at most 'size' bytes, all the remaining ones if negative"""
+        if size is None or size < 0:
+            size = len(self.view) - self.pos
+
+        _data = self.view[self.pos : self.pos + size].tobytes()
+        self.pos += len(_data)
+        return _data
+
+    read1 = read
+
+    def readinto(self, buffer):
+        """Reads bytes into the pre-allocated 'buffer'. Returns their count."""
+        _count = min(len(buffer), len(self.view) - self.pos)
+        buffer[:_count] = self.view[self.pos : self.pos + _count]
+        self.pos += _count
+        return _count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """Move to 'offset', relatively to 'whence'"""
+        _base = {io.SEEK_SET: 0, io.SEEK_CUR: self.pos, io.SEEK_END: len(self.view)}[whence]
+        self.pos = max(0, _base + offset)
+        return self.pos
+
+    def tell(self):
+        """Returns the current position"""
+        return self.pos
+
+    def close(self):
+        """Release the archive map slice"""
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        super().close()
 
 
 class Zip:
@@ -18,6 +99,9 @@ class Zip:
 
     def __init__(self):
         self.registered_zipfiles = {}
+        self.maps = {}  # {Str: <mmap.mmap>}, archives mapped to read stored members
+        self.thread_handles = {}  # {(Int, Str): <zipfile.ZipFile>}, (thread ident, archive) -> handle
+        self.lock = threading.Lock()  # guards 'maps' and 'thread_handles', used from any thread
 
     def register(self, zip_dict):
         """
@@ -112,6 +196,41 @@ class Zip:
 
         return _out_l
 
+    def get_index(self, archive):
+        """
+        Returns the <ArchiveIndex> of registered 'archive', built from its
+        central directory on first use. Members data offsets are read from
+        their local headers.
+
+        """
+        if "index" not in self.registered_zipfiles[archive]:
+            _index = ArchiveIndex()
+
+            for _info in self.registered_zipfiles[archive]["object"].infolist():
+                try:
+                    _mtime = time.mktime(_info.date_time + (0, 0, -1))
+                except (OverflowError, ValueError):
+                    _mtime = 0.0
+
+                try:
+                    _offset = self._data_offset(archive, _info)
+                except (OSError, ValueError):
+                    _offset = -1
+
+                _index.add(
+                    _info.filename,
+                    _info.file_size,
+                    _info.compress_size,
+                    _offset,
+                    _info.CRC,
+                    _mtime,
+                    COMPRESSION_METHODS.get(_info.compress_type, str(_info.compress_type)),
+                )
+
+            self.registered_zipfiles[archive]["index"] = _index
+
+        return self.registered_zipfiles[archive]["index"]
+
     def list_all_files_split(self):
         """
         List all files from registered archives.
@@ -282,10 +401,101 @@ class Zip:
         _src.close()
         _tgt.close()
 
-    def extract_file_tobuffer(self, archive, filepath):
+    def _get_map(self, archive):
         """
-        Extract specified 'filepath' from 'archive' to an in-memory buffer
-        that is returned.
+        Returns a read-only memory map of 'archive', mapping it on first use
+
+        """
+        with self.lock:
+            if archive not in self.maps:
+                with open(archive, "rb") as _fd:
+                    self.maps[archive] = mmap.mmap(_fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+            return self.maps[archive]
+
+    def _get_thread_handle(self, archive):
+        """
+        Returns a ZIP object of 'archive' private to the calling thread,
+        opening it on first use
+
+        """
+        _key = (threading.get_ident(), archive)
+
+        with self.lock:
+            if _key not in self.thread_handles:
+                self.thread_handles[_key] = self._get_handle(archive)
+
+            return self.thread_handles[_key]
+
+    def _data_offset(self, archive, info):
+        """
+        Returns the offset in 'archive' of the data of member 'info', past
+        its local header, or -1 if that header doesn't look right.
+
+        """
+        _map = self._get_map(archive)
+        _header = info.header_offset
+
+        if _header + LOCAL_HEADER_SIZE > len(_map):
+            return -1
+
+        if _map[_header : _header + len(LOCAL_HEADER_SIGNATURE)] != LOCAL_HEADER_SIGNATURE:
+            return -1
+
+        _lengths = _map[_header + LOCAL_HEADER_LENGTHS_OFFSET : _header + LOCAL_HEADER_SIZE]
+        _name_length, _extra_length = struct.unpack("<HH", _lengths)
+
+        return _header + LOCAL_HEADER_SIZE + _name_length + _extra_length
+
+    def _open_stored_member(self, archive, info):
+        """
+        Returns a ZipStoredMember over the data of the stored member 'info'
+        of 'archive', located from its local header, or None if that header
+        doesn't look right.
+
+        """
+        _map = self._get_map(archive)
+        _start = self._data_offset(archive, info)
+        _end = _start + info.file_size
+
+        if _start < 0 or _end > len(_map):
+            return None
+
+        with memoryview(_map) as _view:
+            return ZipStoredMember(_view[_start:_end])
+
+    def close(self):
+        """
+        Close the registered archives, unmap those mapped so far, and close
+        the handles private to threads. Maps still read through open
+        ZipStoredMember objects are unmapped once these are gone.
+
+        """
+        for _registered in self.registered_zipfiles.values():
+            _registered["object"].close()
+
+        with self.lock:
+            for _map in self.maps.values():
+                try:
+                    _map.close()
+                except BufferError:
+                    pass
+
+            for _handle in self.thread_handles.values():
+                _handle.close()
+
+            self.maps = {}
+            self.thread_handles = {}
+
+    def open_member(self, archive, filepath, own_handle=False):
+        """
+        Returns a binary file-like object reading specified 'filepath' from
+        'archive': straight out of the archive memory map for stored
+        (uncompressed) members, decompressing it as it is read otherwise.
+
+        With 'own_handle', compressed members are read through a handle of
+        'archive' private to the calling thread, so that the member can be
+        read from any thread. Memory map slices are safe to share.
 
         """
         # NOTE: highly dependant on zipfile module internal !
@@ -309,7 +519,31 @@ class Zip:
             # Is an internal dir:
             raise ValueError("filepath must be a file, not a directory")
 
-        _src = self.registered_zipfiles[archive]["object"].open(filepath, pwd=None)
+        _zip = self.registered_zipfiles[archive]["object"]
+        _info = _zip.getinfo(filepath)
+
+        if own_handle:
+            _zip = self._get_thread_handle(archive)
+
+        # Encrypted members can't be read as they are stored:
+        if _info.compress_type == zipfile.ZIP_STORED and not _info.flag_bits & 0x1:
+            try:
+                _member = self._open_stored_member(archive, _info)
+            except (OSError, ValueError):
+                _member = None
+
+            if _member is not None:
+                return _member
+
+        return _zip.open(_info, pwd=None)
+
+    def extract_file_tobuffer(self, archive, filepath):
+        """
+        Extract specified 'filepath' from 'archive' to an in-memory buffer
+        that is returned.
+
+        """
+        _src = self.open_member(archive, filepath)
 
         _buffer = BytesIO(_src.read())
 
@@ -4,8 +4,11 @@ ZipItemCacheable
 """
 
 import os
+import shutil
 
+from pytheialib.ArchiveIndex import ArchiveIndex
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.StageTimings import StageTimings
 from pytheialib.Utils import Utils
 
 
@@ -17,6 +20,19 @@ class ZipItemCacheable:
     to avoid bottleneck doing it all at once.
     """
 
+    # One instance per archive member accessed, keep them small:
+    __slots__ = (
+        "archive",
+        "zip",
+        "node_temp_dir",
+        "_filepath",
+        "filepath_norm",
+        "_filename",
+        "filename_norm",
+        "_fd",
+        "used",
+    )
+
     def __init__(self, _archive, _zip, _node_temp_dir, _file):
         gdebug("# %s:%s(%s)" % (self.__class__, callee(), _file))
 
@@ -122,16 +138,17 @@ class ZipItemCacheable:
         MD5 sum of the file basename + relative path inside cache, and
         appending again the clean-text extension (to avoid confusing code/tools
         possibly relying on extension rather than 'magic' mime / headers).
+        The file only exists once complete (see Utils.write_atomically()).
         """
         gdebug(f"# {self.__class__}:{callee()}")
 
-        # Get an in-memory dump of the file:
-        _biobuff = self.zip.extract_file_tobuffer(self.archive, self.filename)
-
-        with open(self.filepath_norm, "wb") as fdesc:
-            fdesc.write(_biobuff.read())
+        def write(path):
+            """Copy the member to 'path'"""
+            with self.zip.open_member(self.archive, self.filename) as _src:
+                with open(path, "wb") as fdesc:
+                    shutil.copyfileobj(_src, fdesc)
 
-        _biobuff.close()
+        Utils.write_atomically(self.filepath_norm, write)
 
     def uncompress_file_if_needed(self):
         """
@@ -146,18 +163,41 @@ class ZipItemCacheable:
             raise RuntimeError("filepath_norm unset")
 
         if not os.path.isfile(self.filepath_norm):
-            self._uncompress_file()
+            with StageTimings().measure("extract"):
+                self._uncompress_file()
 
         self._fd = open(self.filepath_norm, "rb")
 
+    def open_stream(self, own_handle=False):
+        """
+        Returns a binary file-like object reading this member: the cache file
+        if already extracted, or else the member decompression stream, read
+        straight out of the archive without writing anything to the cache
+        directory.
+
+        With 'own_handle', the stream can be read from any thread (see
+        Zip.open_member()).
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if os.path.isfile(self.filepath_norm):
+            return open(self.filepath_norm, "rb")
+
+        return self.zip.open_member(self.archive, self.filename, own_handle)
+
     def len(self):
         """
-        Returns size in bytes of 'self.filepath_norm'
+        Returns size in bytes of this member, from the archive index, without
+        extracting it unless the index doesn't know about it
         """
         gdebug(f"# {self.__class__}:{callee()}")
 
+        _size = self.zip.get_index(self.archive).get(self.filename, ArchiveIndex.UNKNOWN).size
+        if _size >= 0:
+            return _size
+
         self.uncompress_file_if_needed()
-        return len(open(self.filepath_norm, "rb").read())
+        return os.path.getsize(self.filepath_norm)
 
     def readable(self):
         """
@@ -4,12 +4,18 @@
 PathNodeArchiveRar
 """
 
+import os
 import tempfile
+import threading
+
+import gi  # pylint: disable=import-error
+from gi.repository import GLib  # pylint: disable=import-error
 
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
 from pytheialib.pathnode_factory_support.path_node_mixin import PathNodeMixin
 from pytheialib.Rar import Rar as TargerHandler
 from pytheialib.RarItemCacheable import RarItemCacheable
+from pytheialib.StageTimings import StageTimings
 
 
 class PathNodeArchiveRar(PathNodeMixin):
@@ -22,6 +28,7 @@ class PathNodeArchiveRar(PathNodeMixin):
 
         self.format_cc_name = "Rar"
         self.item_cacheable = RarItemCacheable
+        self.preaccess_pending = False  # Bool, a batch is being extracted
 
     def _mk_tempdirname(self):
         """
@@ -33,9 +40,67 @@ class PathNodeArchiveRar(PathNodeMixin):
             suffix=".tmp", prefix="pytheia_PNARar_", dir=self.platform.pytheia_cache_dir
         )
 
+    def preaccess_entries(self, positions):
+        """
+        Have the files at 'positions', ordered by priority, extracted in a
+        single 7z run by a background thread, if the first one isn't
+        extracted yet. Files come in batches this way, each 7z run reading
+        the archive, and decompressing solid blocks, once for all of them.
+        One batch is extracted at a time.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), positions))
+
+        if not positions or not self.populated or self.preaccess_pending:
+            return
+
+        _items = [self.all_files[_position] for _position in positions]
+        if os.path.isfile(_items[0].filepath_norm):
+            return
+
+        self.preaccess_pending = True
+        threading.Thread(
+            target=self._extract_batch,
+            args=(
+                self.handler,
+                [(_item.filename, _item.filepath_norm) for _item in _items if not os.path.isfile(_item.filepath_norm)],
+                self.node_temp_dir,
+            ),
+            name="pytheia-extract",
+            daemon=True,
+        ).start()
+
+    def _extract_batch(self, handler, members_destinations, staging_dir):
+        """
+        Thread side of preaccess_entries(): extract 'members_destinations'
+        through 'handler', and tell the main loop once done
+        """
+        _extracted = []
+        try:
+            with StageTimings().measure("extract"):
+                _extracted = handler.extract_files_as(members_destinations, staging_dir)
+        except (IOError, OSError) as exc:
+            # ie: node unpopulated meanwhile, its directory removed:
+            debug("batch extraction from %s failed: %s" % (self.start_uri, exc))
+
+        GLib.idle_add(self._batch_extracted, len(_extracted), len(members_destinations))
+
+    def _batch_extracted(self, extracted, requested):
+        """
+        Idle callback: a batch extraction is over, 'extracted' of the
+        'requested' members being on disk
+        """
+        debug("%s of %s members extracted at once from %s" % (extracted, requested, self.start_uri))
+        self.preaccess_pending = False
+
+        return False
+
     def _register_archive_to_backend(self):
         """
         Register the archive to the Rar backend
         """
         self.handler = TargerHandler()
-        self.handler.register(self.start_uri, self.node_temp_dir)
+        self.handler.register(
+            self.start_uri,
+            self.node_temp_dir,
+            use_listing_cache=not (self.cli_parse and self.cli_parse.args.no_listing_cache),
+        )
@@ -39,3 +39,12 @@ class PathNodeArchiveTar(PathNodeMixin):
         """
         self.handler = TargerHandler()
         self.handler.register(self.start_uri, self.node_temp_dir)
+
+    def unpopulate(self):
+        """
+        Unpopulate this PathNode, and close the archive
+        """
+        if self.handler:
+            self.handler.close()
+
+        PathNodeMixin.unpopulate(self)
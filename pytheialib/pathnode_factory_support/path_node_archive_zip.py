@@ -40,3 +40,18 @@ class PathNodeArchiveZip(PathNodeMixin):
         _zip_dict = {self.start_uri: self.node_temp_dir}
         self.handler = TargerHandler()
         self.handler.register(_zip_dict)
+
+    def unpopulate(self):
+        """
+        Unpopulate this PathNode, and unmap the archive
+        """
+        if self.handler:
+            self.handler.close()
+
+        PathNodeMixin.unpopulate(self)
+
+    def _get_archive_index(self):
+        """
+        Returns the <ArchiveIndex> of the archive, from the Zip backend
+        """
+        return self.handler.get_index(self.start_uri)
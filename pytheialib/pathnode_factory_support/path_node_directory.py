@@ -4,13 +4,23 @@
 PathNodeDirectory
 """
 
-import mimetypes
+import bisect
 import os
+import stat
+import threading
+import time
+
+import gi  # pylint: disable=import-error
+from gi.repository import GLib  # pylint: disable=import-error
 
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.DirectoryWatcher import DirectoryWatcher
+from pytheialib.DiskCache import DiskCache
+from pytheialib.FileTable import FileTable
 from pytheialib.Mime import Mime
 from pytheialib.path_node_exceptions import PathNodeEOListError, PathNodeSOListError
 from pytheialib.pathnode_factory_support.path_node_mixin import PathNodeMixin
+from pytheialib.SortOrder import SortOrder
 from pytheialib.Utils import Utils
 
 
@@ -19,17 +29,42 @@ class PathNodeDirectory(PathNodeMixin):
     Support of local filesystem directories and files as PathNode
     """
 
+    # Streaming scan: count of files scanned before the listing is first
+    # handed over to the main loop, doubled for each following one up to the
+    # maximum:
+    SCAN_BATCH_SIZE_FIRST = 256
+    SCAN_BATCH_SIZE_MAX = 65536
+
+    # Filtered and sorted listings, kept across nodes and runs:
+    listing_cache = DiskCache("directory_listings")
+
+    # Directories modified more recently than this, in seconds, aren't
+    # cached, as a change within the same mtime tick wouldn't be noticed:
+    LISTING_CACHE_MIN_AGE = 2
+
+    # Bumped when what cached listings hold changes:
+    LISTING_FORMAT = 3
+
     def __init__(self):
         PathNodeMixin.__init__(self)
 
         self.populated = None  # Bool
         self.is_empty = None  # Int
+        self.scanning = False  # Bool, a streaming scan is in progress
+        self.scan_generation = 0  # Int, outdates streaming scans in progress
+        self.scan_validator = None  # Tuple, listing cache validator of 'all_files'
+        self.deferred_seek = None  # (Int, Int), (offset, whence) beyond the files scanned so far
+        self.watcher = None  # <DirectoryWatcher>
+        self.watch_pending = None  # (set, set), changes received while scanning
+        self.watch_store_source_id = None  # Int, GLib source id
+        self.sort_keys_pending = None  # Str, sort order whose keys are being computed
 
         # dynamically set from factory:
         self.platform = None  # <Platform>
         self.recursive = None  # Bool
         self.cli_parse = None  # <CliParse>
         self.supporting_pool = None  # <SupportingPool>
+        self.sort_order = None  # <SortOrder>
 
         self.format_cc_name = "Dir"
 
@@ -46,7 +81,6 @@ class PathNodeDirectory(PathNodeMixin):
 
         self.all_files = []
         _requested_path_isfile = None
-        types = Mime().get_supported_mimetypes()
         # Support starting from a filename instead of a directory.
         # the containing directory will be scanned anyway:
         if os.path.isfile(self.start_uri):  # FILE
@@ -61,13 +95,26 @@ class PathNodeDirectory(PathNodeMixin):
         if not os.path.isdir(self.start_uri):  # not FILE nor DIR
             raise TypeError("%s cannot be identified correctly" % self.start_uri)
 
-        self.all_files = [os.path.join(self.start_uri, x) for x in os.listdir(self.start_uri)]
+        # Watch before listing, for no change to be missed in between:
+        if self.cli_parse and self.cli_parse.args.watch:
+            self._start_watching()
 
-        # Remove unsupported files
-        self.all_files = [_f for _f in (self.all_files) if mimetypes.guess_type(_f)[0] in types]
+        _validator = self._listing_validator(self.start_uri)
+        _listing = self._cached_listing(self.start_uri, _validator)
 
-        self.all_files.sort()
+        if _listing is None and _requested_path_isfile and self.cli_parse and self.cli_parse.args.streaming_scan:
+            self._populate_streaming(_requested_path_isfile, _validator)
+            return
+
+        if _listing is None:
+            _listing = self._scan_supported_files(self.start_uri)
+            self._store_listing(self.start_uri, _validator, _listing)
+
+        self.scan_validator = _validator
+        self.all_files = _listing
+        self.entries_count = len(self.all_files)
         self.populated = True
+        self._apply_sort_order()
 
         debug("type of self.all_files: %s" % str(self.all_files))
 
@@ -83,21 +130,502 @@ class PathNodeDirectory(PathNodeMixin):
             self.position = 0
             self.current_path = self.all_files[self.position]
 
+    @staticmethod
+    def _scan_supported_files(directory):
+        """
+        Returns the sorted list of supported files paths in 'directory'.
+        Files aren't stat()'ed: sort keys are computed when first needed,
+        see _ensure_sort_keys().
+        """
+        _mime = Mime()
+
+        with os.scandir(directory) as _entries:
+            return FileTable(sorted(_entry.path for _entry in _entries if _mime.is_supported_filename(_entry.name)))
+
+    def _listing_validator(self, directory):
+        """
+        Returns what a cached listing of 'directory' must have been stored
+        with to be used: its stat() figures, and the supported extensions.
+        None if the listing cache must not be used.
+        """
+        if self.cli_parse and self.cli_parse.args.no_listing_cache:
+            return None
+
+        try:
+            _stat = os.stat(directory)
+        except OSError:
+            return None
+
+        if time.time() - _stat.st_mtime < self.LISTING_CACHE_MIN_AGE:
+            return None
+
+        return (
+            _stat.st_mtime_ns,
+            _stat.st_ino,
+            _stat.st_dev,
+            tuple(sorted(Mime().get_supported_extensions_set())),
+            self.LISTING_FORMAT,
+        )
+
+    def _cached_listing(self, directory, validator):
+        """
+        Returns the cached listing of 'directory' if still valid, else None
+        """
+        if validator is None:
+            return None
+
+        _listing = self.listing_cache.get(directory, validator)
+        if _listing is not None:
+            if not isinstance(_listing, FileTable):
+                _listing = FileTable(_listing)
+            debug("cached listing used for %s (%s files)" % (directory, len(_listing)))
+
+        return _listing
+
+    def _store_listing(self, directory, validator, listing):
+        """
+        Cache the listing of 'directory', unless 'validator' is None
+        """
+        if validator is not None:
+            self.listing_cache.set(directory, validator, listing)
+
+    def _store_all_files(self):
+        """
+        Cache 'all_files', less the requested file of a streaming scan when
+        it isn't supported
+        """
+        _mime = Mime()
+
+        self._store_listing(
+            self.start_uri,
+            self.scan_validator,
+            self.all_files.take([_i for _i, _file in enumerate(self.all_files) if _mime.is_supported_filename(_file)]),
+        )
+
+    def _list_supported_files(self, directory):
+        """
+        Returns the sorted list of supported files paths in 'directory',
+        from the listing cache if possible.
+        """
+        _validator = self._listing_validator(directory)
+        _listing = self._cached_listing(directory, _validator)
+
+        if _listing is None:
+            _listing = self._scan_supported_files(directory)
+            self._store_listing(directory, _validator, _listing)
+
+        return _listing
+
+    def _populate_streaming(self, requested_path, validator=None):
+        """
+        Populate with 'requested_path' alone, so that it can be displayed
+        right away, and have the rest of the directory merged in as it gets
+        scanned by a background thread. Files are in name order up to the end
+        of the scan, when 'sort_order' gets applied.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), requested_path))
+
+        self.scan_generation += 1
+        self.scanning = True
+        self.scan_validator = validator
+        self.deferred_seek = None
+        self.all_files = FileTable([requested_path])
+        self.entries_count = None  # Unknown up to the end of the scan
+        self.populated = True
+        self.position = 0
+        self.current_path = requested_path
+
+        # Computed here, as it requires GdkPixbuf, for the thread to only
+        # do set lookups:
+        Mime().get_supported_extensions_set()
+
+        threading.Thread(
+            target=self._scan_worker,
+            args=(self.start_uri, requested_path, self.scan_generation),
+            name="pytheia-scan",
+            daemon=True,
+        ).start()
+
+    def _scan_worker(self, directory, requested_path, generation):
+        """
+        Thread side of _populate_streaming(): scan 'directory', handing the
+        sorted <FileTable> of the files scanned so far over to the main loop,
+        each time their count doubles. 'requested_path' is always part of
+        them.
+
+        Tables are built here, the main loop only has to take them over:
+        sorting and building a listing of a few hundred thousand files
+        would stall it.
+        """
+        _mime = Mime()
+        _scanned = [requested_path]
+        _batch_size = self.SCAN_BATCH_SIZE_FIRST
+        _next_handover = len(_scanned) + _batch_size
+
+        try:
+            with os.scandir(directory) as _entries:
+                for _entry in _entries:
+                    if generation != self.scan_generation:
+                        return  # unpopulated, or populated again
+
+                    if _entry.path != requested_path and _mime.is_supported_filename(_entry.name):
+                        _scanned.append(_entry.path)
+
+                    if len(_scanned) >= _next_handover:
+                        # Sorted run and appended batch: sort() merges them:
+                        _scanned.sort()
+                        GLib.idle_add(self._merge_scanned, FileTable(_scanned), generation, False)
+                        _batch_size = min(_batch_size * 2, self.SCAN_BATCH_SIZE_MAX)
+                        _next_handover = len(_scanned) + _batch_size
+
+        except OSError as exc:
+            debug("scan of %s interrupted: %s" % (directory, exc))
+
+        _scanned.sort()
+        GLib.idle_add(self._merge_scanned, FileTable(_scanned), generation, True)
+
+    def _merge_scanned(self, table, generation, done):
+        """
+        Idle callback: take over 'table', the sorted files scanned so far, as
+        'all_files', keeping the position on the current file. A seek deferred
+        until the files it lands on are scanned is resolved.
+        """
+        if generation != self.scan_generation or self.all_files is None:
+            return False
+
+        _current = self.all_files[self.position]
+        self.all_files = table
+        self.position = min(bisect.bisect_left(table, _current), len(table) - 1)
+
+        if done:
+            debug("streaming scan done: %s files" % len(self.all_files))
+            self.scanning = False
+            self._store_all_files()
+            self.resort()
+
+            if self.watch_pending:
+                self._apply_file_changes(*self.watch_pending)
+                self.watch_pending = None
+
+        self.entries_count = len(self.all_files) if done else None
+
+        _current_changed = False
+        if self.deferred_seek and (done or self._seek_within_scanned(*self.deferred_seek)):
+            _current_changed = self._resolve_deferred_seek()
+
+        # Counted by the GlobalIndex, and prefetched around:
+        if self.files_changed_callback:
+            self.files_changed_callback(self, _current_changed)
+
+        return False
+
+    def _seek_within_scanned(self, offset, whence):
+        """
+        Returns True if seeking by 'offset' from 'whence' lands on a file
+        scanned already
+        """
+        if whence == os.SEEK_SET:
+            return 0 <= offset < len(self.all_files)
+
+        if whence == os.SEEK_CUR:
+            return 0 <= self.position + offset < len(self.all_files)
+
+        # The end is only known once the scan is over:
+        return False
+
+    def _defer_seek(self, offset, whence):
+        """
+        Record a seek beyond the files scanned so far, to be resolved by
+        _merge_scanned(). Relative seeks add up to a deferred one.
+        """
+        debug("seek(%s, %s) deferred until scanned" % (offset, whence))
+
+        if whence == os.SEEK_CUR and self.deferred_seek:
+            self.deferred_seek = (self.deferred_seek[0] + offset, self.deferred_seek[1])
+        else:
+            self.deferred_seek = (offset, whence)
+
+    def _resolve_deferred_seek(self):
+        """
+        Move to the position 'deferred_seek' lands on, kept within the files.
+        Returns True if the current file changed.
+        """
+        _offset, _whence = self.deferred_seek
+        self.deferred_seek = None
+
+        if not self.all_files:
+            return False
+
+        _start = {os.SEEK_SET: 0, os.SEEK_CUR: self.position, os.SEEK_END: len(self.all_files)}[_whence]
+        _position = max(0, min(_start + _offset, len(self.all_files) - 1))
+        if _position == self.position:
+            return False
+
+        self.position = _position
+        self.current_path = self.all_files[self.position]
+        return True
+
+    def _start_watching(self):
+        """
+        Follow changes of the directory, see _apply_file_changes()
+        """
+        if self.watcher:
+            return
+
+        self.watcher = DirectoryWatcher(self.start_uri, self._apply_file_changes)
+        if not self.watcher.start():
+            self.watcher = None
+
+    def _stop_watching(self):
+        """
+        Stop following changes of the directory. A listing waiting to be
+        cached is stored right away, if still valid.
+        """
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+        self.watch_pending = None
+
+        if self.watch_store_source_id:
+            GLib.source_remove(self.watch_store_source_id)
+            self._store_watched_listing()
+
+    def _apply_file_changes(self, added, removed):
+        """
+        DirectoryWatcher callback: apply the files 'added' and 'removed' (sets
+        of paths) to 'all_files', in the current sort order, staying on the
+        current file. Added files are stat()'ed anyway, which gives their
+        mtime and size sort keys; EXIF ones are left to _ensure_sort_keys().
+        """
+        gdebug("# %s:%s(%s, %s)" % (self.__class__, callee(), len(added), len(removed)))
+
+        if self.all_files is None:
+            return
+
+        if self.scanning:
+            # Applied once the scan is over, as it merges runs by name:
+            _added, _removed = self.watch_pending or (set(), set())
+            self.watch_pending = ((_added - removed) | added, (_removed - added) | removed)
+            return
+
+        _mime = Mime()
+        _scanned = []
+        for _path in added:
+            if not _mime.is_supported_filename(os.path.basename(_path)):
+                continue
+            try:
+                _stat = os.stat(_path)
+            except OSError:
+                continue  # already gone
+            if stat.S_ISREG(_stat.st_mode):
+                _scanned.append((_path, _stat.st_mtime, _stat.st_size))
+        _scanned.sort()
+
+        # Modified files are replaced, for their sort keys to be refreshed:
+        _dropped = removed | {_scanned[0] for _scanned in _scanned}
+        _kept = [_i for _i, _path in enumerate(self.all_files) if _path not in _dropped]
+        if len(_kept) == len(self.all_files) and not _scanned:
+            return
+
+        _current = self.all_files[self.position] if len(self.all_files) else None
+
+        # Keys not held by the table are ignored:
+        _sort_keys = {
+            "mtime": [_scanned[1] for _scanned in _scanned],
+            "size": [_scanned[2] for _scanned in _scanned],
+        }
+
+        self.all_files = self.all_files.take(_kept)
+        self.all_files.extend([_scanned[0] for _scanned in _scanned], _sort_keys)
+        if self._apply_sort_order() is None:
+            self.all_files.sort()
+
+        self.entries_count = len(self.all_files)
+        self.is_empty = 2 if not self.entries_count else None
+
+        _current_removed = _current in removed
+        if _current is not None and not _current_removed:
+            self.position = self.all_files.index(_current)
+        else:
+            self.position = max(0, min(self.position or 0, self.entries_count - 1))
+
+        if self.entries_count:
+            self.current_path = self.all_files[self.position]
+
+        # Cached once the directory is quiet, see LISTING_CACHE_MIN_AGE:
+        if self.watch_store_source_id:
+            GLib.source_remove(self.watch_store_source_id)
+        self.watch_store_source_id = GLib.timeout_add_seconds(
+            self.LISTING_CACHE_MIN_AGE + 1, self._store_watched_listing
+        )
+
+        if self.files_changed_callback:
+            self.files_changed_callback(self, _current_removed)
+
+    def _store_watched_listing(self):
+        """
+        Store 'all_files', as updated by the watcher, to the listing cache,
+        so that entering the node again doesn't scan the directory
+        """
+        self.watch_store_source_id = None
+
+        self.scan_validator = self._listing_validator(self.start_uri)
+        if self.all_files is not None:
+            self._store_all_files()
+
+        return False
+
+    def get_footprint(self):
+        """
+        Returns (memory, disk): the approximate bytes held in memory by the
+        listing. Nothing is held on disk.
+        """
+        return (self.all_files.nbytes() if self.all_files is not None else 0), 0
+
+    def _names_table(self):
+        """
+        Returns the <FileTable> of paths 'all_files' is
+        """
+        return self.all_files
+
+    def _ensure_sort_keys(self, names):
+        """
+        Have the sort keys of 'names' the sort order needs computed by a
+        background thread, for the entries missing them (ie: all of them
+        until first needed, files added without them). Entries are in path
+        order meanwhile, and reordered once the keys are in, see
+        _sort_keys_computed().
+        """
+        _key = self.sort_order.order
+        if _key not in SortOrder.KEYED_ORDERS or self.sort_keys_pending == _key:
+            return
+
+        _indexes = names.missing_sort_keys(_key)
+        if not _indexes:
+            return
+
+        self.sort_keys_pending = _key
+        threading.Thread(
+            target=self._sort_keys_worker,
+            args=([names[_i] for _i in _indexes], _key),
+            name="pytheia-sortkeys",
+            daemon=True,
+        ).start()
+
+    def _sort_keys_worker(self, paths, key):
+        """
+        Thread side of _ensure_sort_keys(): compute the 'key' sort keys of
+        'paths', handed over to the main loop as {key name: {path: value}}.
+        Files stat()'ed get both their mtime and size keys. Stops early if
+        the sort order changes, or the node gets unpopulated.
+        """
+        _values = {_key: {} for _key in ("mtime", "size", key)}
+
+        for _path in paths:
+            if self.sort_order.order != key or self.all_files is None:
+                break
+
+            _value = SortOrder.exif_timestamp(_path) if key == "exif" else None
+            if _value is None:
+                try:
+                    _stat = os.stat(_path)
+                    _values["mtime"][_path] = _stat.st_mtime
+                    _values["size"][_path] = _stat.st_size
+                    _value = _stat.st_size if key == "size" else _stat.st_mtime
+                except OSError:
+                    _value = 0.0
+            _values[key][_path] = _value
+
+        GLib.idle_add(self._sort_keys_computed, key, _values)
+
+    def _sort_keys_computed(self, key, values):
+        """
+        Idle callback: fill the sort keys computed for the 'key' order in,
+        for the files still listed, and reorder them if it is still the
+        current one. As this read the files, the listing is stored again to
+        the listing cache along with them.
+        """
+        gdebug("# %s:%s(%s)" % (self.__class__, callee(), key))
+
+        if self.sort_keys_pending == key:
+            self.sort_keys_pending = None
+
+        _names = self._names_table()
+        if _names is None:
+            return False
+
+        for _key, _values in values.items():
+            _indexes = [_i for _i in _names.missing_sort_keys(_key) if _names[_i] in _values]
+            if _indexes:
+                _names.fill_sort_keys(_key, _indexes, [_values[_names[_i]] for _i in _indexes])
+        self._store_all_files()
+
+        if self.sort_order.order == key and self.resort() and self.files_changed_callback:
+            # Prefetched around again:
+            self.files_changed_callback(self, False)
+
+        return False
+
+    def resort(self):
+        """
+        Apply the current sort order, staying on the current file. Deferred
+        to the end of a streaming scan in progress.
+        """
+        if self.scanning:
+            return False
+
+        return PathNodeMixin.resort(self)
+
+    def count_entries(self):
+        """
+        Returns the count of supported files in this PathNode, listing its
+        directory unless populated. The result is cached in 'entries_count'.
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        with self.populate_lock:
+            if self.all_files is not None:
+                self.entries_count = len(self.all_files)
+
+            elif self.entries_count is None:
+                _directory = self.start_uri
+                if os.path.isfile(_directory):
+                    _directory = Utils.containing_directory(_directory)
+                self.entries_count = len(self._list_supported_files(_directory))
+
+        return self.entries_count
+
     def unpopulate(self):
         """
         Unpopulate thos PathNode from his populated files references
         """
         gdebug(f"# {self.__class__}:{callee()}")
 
+        self._stop_watching()
+
+        # Outdate a streaming scan in progress:
+        self.scan_generation += 1
+        self.scanning = False
+        self.deferred_seek = None
+
         self.supported_types = None  # List
         self.all_files = None  # List
         self.position = None  # Int
         self.populated = None  # Bool
         self.is_empty = None  # Int
 
+    def current_item(self):
+        """
+        Returns None: files are read from their path, 'current_path'
+        """
+        return None
+
     def preaccess_current(self):
         pass
 
+    def preaccess_entries(self, positions):
+        pass
+
     def seek(self, offset, whence):
         """
         Seek in the PathNode, given an 'offset' and 'whence' value.
@@ -108,6 +636,11 @@ class PathNodeDirectory(PathNodeMixin):
         if not self.all_files:
             self.populate()
 
+        if self.scanning and not self._seek_within_scanned(offset, whence):
+            # Not scanned yet: resolved when it is, see _merge_scanned():
+            self._defer_seek(offset, whence)
+            return
+
         if len(self.all_files) <= 1:
             # Don't waste time if only one file is indexed:
             return
@@ -4,12 +4,18 @@
 PathNodeMixin
 """
 
+import functools
 import mimetypes
 import os
 import shutil
+import sys
 import tempfile
+import threading
 
+from pytheialib.ArchiveIndex import ArchiveIndex
 from pytheialib.Debug import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from pytheialib.ExtractedBytes import ExtractedBytes
+from pytheialib.FileTable import FileTable, LazyItemTable
 from pytheialib.Mime import Mime
 from pytheialib.path_node_exceptions import PathNodeEOListError, PathNodeSOListError
 from pytheialib.PathNodeAbstract import PathNodeAbstract
@@ -30,20 +36,27 @@ class PathNodeMixin(PathNodeAbstract):
 
         self.start_uri = None  # Str, a file or a dir
         self.supported_types = None  # List
-        self._all_files = None  # List
+        self._all_files = None  # <FileTable>, members names
+        self.archive_index = None  # <ArchiveIndex>, members metadata
         self.all_files = None  # List
         self.position = None  # Int
+        self.entries_count = None  # Int, cached by count_entries()
 
         self._current_path = None  # Str / property: current_path
 
         self.populated = False
         self.is_empty = None  # Bool
+        self.populate_lock = threading.Lock()  # held while populating, see ensure_populated()
 
         # Dynamically set from factory:
         self.platform = None  # <Platform>
         self.recursive = None  # Bool
         self.cli_parse = None  # <CliParse>
         self.supporting_pool = None  # <SupportingPool>
+        self.sort_order = None  # <SortOrder>
+
+        # Dynamically set from PathIndex:
+        self.files_changed_callback = None  # callable(<PathNode>, Bool), see PathIndex.node_files_changed()
 
         # to be overloaded by implementations:
         self.format_cc_name = None  # Str
@@ -118,7 +131,6 @@ class PathNodeMixin(PathNodeAbstract):
         debug("start_uri = %s" % self.start_uri)
 
         self.all_files = []
-        types = Mime().get_supported_mimetypes()
 
         # Obtain a temp dir up to unpopulate() call:
         self._mk_tempdirname()
@@ -126,29 +138,34 @@ class PathNodeMixin(PathNodeAbstract):
         # Register the archive to the backend:
         self._register_archive_to_backend()
 
-        # discover files within the archive:
-        self.all_files = self.handler.list_all_files()  # should be filtered !!!
-
-        # Remove unsupported files
-        self._all_files = []
-
-        for _file in self.all_files:
-            if mimetypes.guess_type(_file)[0] in types:
-                self._all_files.append(_file)
-
-        self._all_files.sort()
+        # discover files within the archive, removing unsupported ones:
+        _names = self._supported_files(self.handler.list_all_files())
+        self.archive_index = self._get_archive_index()
+        _members = [self.archive_index.get(_name, ArchiveIndex.UNKNOWN) for _name in _names]
+
+        # Capture dates would require extracting members, mtimes stand for
+        # them:
+        self._all_files = FileTable(
+            _names,
+            {
+                "mtime": [_member.mtime for _member in _members],
+                "size": [_member.size for _member in _members],
+                "exif": [_member.mtime for _member in _members],
+            },
+        )
 
-        self.all_files = []
-        for _file in self._all_files:
-            self.all_files.append(
-                self.item_cacheable(  # pylint: disable=E1102
-                    self.start_uri, self.handler, self.node_temp_dir, _file
-                )
-            )
+        # Items are only created when accessed:
+        self.all_files = LazyItemTable(
+            self._all_files,
+            functools.partial(self.item_cacheable, self.start_uri, self.handler, self.node_temp_dir),
+        )
 
+        self.entries_count = len(self.all_files)
         if len(self.all_files) == 0:
             raise ValueError("No supported files found under: %s" % self.start_uri)
 
+        self._apply_sort_order()
+
         # Point to first file of list by default:
         self.position = 0
         self.current_path = self.all_files[self.position]
@@ -156,6 +173,124 @@ class PathNodeMixin(PathNodeAbstract):
         wdebug("Initial file set to: %s (at position: %s)" % (Utils.str_reduced(80, self.current_path), self.position))
         self.populated = True
 
+    def ensure_populated(self):
+        """
+        Populate, unless already done. Safe to call from several threads: a
+        population in progress is waited for, rather than done twice (see
+        <NodePrepopulator>).
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        with self.populate_lock:
+            if not self.populated:
+                self.populate()
+
+    @staticmethod
+    def _supported_files(filenames):
+        """
+        Returns the sorted list of supported files among 'filenames'
+        """
+        types = Mime().get_supported_mimetypes()
+
+        return sorted(_file for _file in filenames if mimetypes.guess_type(_file)[0] in types)
+
+    def get_footprint(self):
+        """
+        Returns (memory, disk): the approximate bytes held in memory by the
+        listing and the items created so far, and on disk by the members
+        extracted so far, as accounted by <ExtractedBytes>
+        """
+        _memory = 0
+        if self._all_files is not None:
+            _memory += self._all_files.nbytes()
+        if self.archive_index is not None:
+            _memory += self.archive_index.nbytes()
+        if self.all_files:
+            _memory += sum(sys.getsizeof(_item) for _item in self.all_files.created_items())
+
+        _disk = ExtractedBytes.get(self.node_temp_dir) if self.node_temp_dir else 0
+
+        return _memory, _disk
+
+    def _get_archive_index(self):
+        """
+        Returns the <ArchiveIndex> of the archive, from the backend. Requires
+        the archive to have been listed.
+        """
+        return self.handler.get_index()
+
+    def _names_table(self):
+        """
+        Returns the <FileTable> of member names 'all_files' is built upon
+        """
+        return self._all_files
+
+    def _ensure_sort_keys(self, names):
+        """
+        Compute the sort keys of 'names' the sort order needs, if missing.
+        Archives get all of them from their listing.
+        """
+
+    def _apply_sort_order(self):
+        """
+        Reorder 'all_files' according to 'sort_order'. Returns the list of
+        previous positions of the entries, or None if nothing was done.
+        """
+        if not self.sort_order or not self.all_files:
+            return None
+
+        _names = self._names_table()
+        self._ensure_sort_keys(_names)
+
+        _indexes = self.sort_order.permutation(_names)
+        self.all_files.permute(_indexes)
+
+        return _indexes
+
+    def resort(self):
+        """
+        Apply the current sort order, staying on the current file. Returns
+        True if the node was reordered.
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        if not self.populated:
+            return False
+
+        _indexes = self._apply_sort_order()
+        if _indexes is None:
+            return False
+
+        self.position = _indexes.index(self.position)
+        self.current_path = self.all_files[self.position]
+
+        return True
+
+    def count_entries(self):
+        """
+        Returns the count of supported files in this PathNode.
+
+        Unless populated, the archive listing is obtained without extracting
+        anything nor creating the node temporary directory. The result is
+        cached in 'entries_count'.
+        """
+        gdebug(f"# {self.__class__}:{callee()}")
+
+        with self.populate_lock:
+            if self.all_files is not None:
+                self.entries_count = len(self.all_files)
+
+            elif self.entries_count is None:
+                # The extraction directory isn't used for listing:
+                self._register_archive_to_backend()
+                try:
+                    self.entries_count = len(self._supported_files(self.handler.list_all_files()))
+                finally:
+                    self.handler.close()
+                    self.handler = None
+
+        return self.entries_count
+
     @property
     def current_path(self):
         """
@@ -197,12 +332,13 @@ class PathNodeMixin(PathNodeAbstract):
 
     def unpopulate(self):
         """
-        Unpopulate this PathNode from his populated files references
+        Unpopulate this PathNode from his populated files references, and
+        release its listings
         """
 
         gdebug("# %s:%s()(start_uri=%s)" % (self.__class__, callee(), self.start_uri))
         if self.all_files:
-            for _item in self.all_files:
+            for _item in self.all_files.created_items():
                 if _item.used:
                     _item.close()
 
@@ -211,17 +347,50 @@ class PathNodeMixin(PathNodeAbstract):
                 "Would need to delete %s, having %s entries" % (self.node_temp_dir, len(os.listdir(self.node_temp_dir)))
             )
             shutil.rmtree(self.node_temp_dir, ignore_errors=False)
+            ExtractedBytes.forget(self.node_temp_dir)
+        self.node_temp_dir = None
+
+        self.all_files = None
+        self._all_files = None
+        self.archive_index = None
+        self.populated = False
+
+    def detach_temp_dir(self):
+        """
+        Returns the directory members are extracted to, or None, for the
+        caller to remove it: unpopulate() won't then (see <WarmNodePool>)
+        """
+        _temp_dir = self.node_temp_dir
         self.node_temp_dir = None
+        if _temp_dir:
+            ExtractedBytes.forget(_temp_dir)
+
+        return _temp_dir
+
+    def current_item(self):
+        """
+        Returns the *ItemCacheable of the current file, to be read through its
+        open_stream(), rather than from 'current_path' which only exists
+        once extracted (see preaccess_current()).
+        """
+        return self.all_files[self.position]
 
     def preaccess_current(self):
         """Make sure the cached file is available for rest of the world now.
 
         Intended to be called by code pieces that need early access to the
-        current file in 'all_files'.
+        current file in 'all_files', as a real file.
         """
         gdebug(f"# {self.__class__}:{callee()}")
         self.all_files[self.position].uncompress_file_if_needed()
 
+    def preaccess_entries(self, positions):
+        """
+        Prepare the files at 'positions' to be read soon, ordered by
+        priority. Nothing to do for archives whose members are streamed
+        (see *ItemCacheable.open_stream()).
+        """
+
     def seek(self, offset, whence):
         """
         Seek in the PathNode, given an 'offset' and 'whence' value.
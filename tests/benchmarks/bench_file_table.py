@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File tables memory benchmark.
+
+Compares, for a given number of entries (1M by default), the memory held by
+the PathNodes 'all_files' layouts, as measured by tracemalloc:
+
+- directories: a list of full path str, against a <FileTable>,
+- archives: one *ItemCacheable object per member, holding its attributes
+  in a __dict__ as they used to, against a <LazyItemTable> of which a few
+  items were accessed.
+
+Build time and the time of random accesses are reported as well, as JSON.
+
+Usage:
+    python3 tests/benchmarks/bench_file_table.py [--entries N] [--output FILE]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.dirname(os.path.dirname(BENCH_DIR))
+
+# Entries per directory, and per archive:
+FILES_PER_DIRECTORY = 100
+
+# Random accesses timed per layout:
+ACCESSES = 10000
+
+
+def synthetic_paths(entries):
+    """
+    Returns a sorted list of 'entries' paths, as a recursive scan of a
+    comics library would give
+    """
+    return [
+        "/home/user/Comics/series-%04d/volume-%02d/page-%04d.jpg"
+        % (_i // (FILES_PER_DIRECTORY * 20), (_i // FILES_PER_DIRECTORY) % 20, _i % FILES_PER_DIRECTORY)
+        for _i in range(entries)
+    ]
+
+
+def synthetic_members(entries):
+    """
+    Returns a sorted list of 'entries' archive member names
+    """
+    return [
+        "chapter-%04d/page-%04d.jpg" % (_i // FILES_PER_DIRECTORY, _i % FILES_PER_DIRECTORY) for _i in range(entries)
+    ]
+
+
+def measure(build):
+    """
+    Returns (object built by 'build', bytes allocated, seconds)
+    """
+    gc.collect()
+    tracemalloc.start()
+    _t0 = time.perf_counter()
+    _obj = build()
+    _elapsed = time.perf_counter() - _t0
+    _size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return _obj, _size, _elapsed
+
+
+def time_accesses(table, attribute=None):
+    """
+    Returns the mean time, in seconds, of a random access to 'table'
+    """
+    _indexes = [random.randrange(len(table)) for _ in range(ACCESSES)]
+
+    _t0 = time.perf_counter()
+    for _i in _indexes:
+        _entry = table[_i]
+        if attribute:
+            getattr(_entry, attribute)
+    return (time.perf_counter() - _t0) / ACCESSES
+
+
+def report(name, size, elapsed, entries, access):
+    """Returns a result dict for one layout"""
+    return {
+        "layout": name,
+        "bytes": size,
+        "bytes_per_entry": size / entries,
+        "build_seconds": elapsed,
+        "access_seconds": access,
+    }
+
+
+def bench_directories(entries):
+    """Full path str list, against FileTable"""
+    # pylint: disable=import-outside-toplevel
+    from pytheialib.FileTable import FileTable
+
+    _paths = synthetic_paths(entries)
+    _results = []
+
+    # Copies, so that the strings themselves are accounted for:
+    _list, _size, _elapsed = measure(lambda: [_p.encode().decode() for _p in _paths])
+    _results.append(report("list of str", _size, _elapsed, entries, time_accesses(_list)))
+    del _list
+
+    _table, _size, _elapsed = measure(lambda: FileTable(_paths))
+    _results.append(report("FileTable", _size, _elapsed, entries, time_accesses(_table)))
+
+    return _results
+
+
+def bench_archives(entries, node_temp_dir):
+    """One item per member, against LazyItemTable"""
+    # pylint: disable=import-outside-toplevel
+    import functools
+
+    from pytheialib.FileTable import LazyItemTable
+    from pytheialib.ZipItemCacheable import ZipItemCacheable
+
+    class DictItem:  # pylint: disable=too-few-public-methods
+        """Item holding its attributes in a __dict__, as before __slots__"""
+
+    def dict_item(member):
+        _item = ZipItemCacheable("/home/user/Comics/big.cbz", None, node_temp_dir, member)
+        _legacy = DictItem()
+        for _attr in ZipItemCacheable.__slots__:
+            setattr(_legacy, _attr, getattr(_item, _attr))
+        return _legacy
+
+    _members = synthetic_members(entries)
+    _results = []
+
+    _list, _size, _elapsed = measure(lambda: [dict_item(_m) for _m in _members])
+    _results.append(report("list of items", _size, _elapsed, entries, time_accesses(_list, "filepath_norm")))
+    del _list
+
+    def lazy_table():
+        _table = LazyItemTable(
+            _members,
+            functools.partial(ZipItemCacheable, "/home/user/Comics/big.cbz", None, node_temp_dir),
+        )
+        # A reading session accesses a few hundred pages:
+        for _i in range(min(entries, 500)):
+            _table[_i]  # pylint: disable=pointless-statement
+        return _table
+
+    _table, _size, _elapsed = measure(lazy_table)
+    _results.append(report("LazyItemTable", _size, _elapsed, entries, time_accesses(_table, "filepath_norm")))
+
+    return _results
+
+
+def main():
+    """Command line entry point"""
+    _parser = argparse.ArgumentParser(description="Pytheia file tables memory benchmark")
+    _parser.add_argument("--entries", type=int, default=1000000, help="Entries per table (default: 1M)")
+    _parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    _args = _parser.parse_args()
+
+    sys.path.insert(0, SRC_DIR)
+    random.seed(0)
+
+    _report = {
+        "python": sys.version.split()[0],
+        "entries": _args.entries,
+        "directories": bench_directories(_args.entries),
+        "archives": bench_archives(_args.entries, "/home/user/.cache/pytheia/pytheia_PNAZip_bench.tmp"),
+    }
+
+    _json = json.dumps(_report, indent=2, sort_keys=True)
+    if _args.output:
+        with open(_args.output, "w") as _fd:
+            _fd.write(_json + "\n")
+    else:
+        print(_json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load-and-display benchmark.
+
+Drives the real PathIndex / ProgressivePixbufLoader / DisplayState stack
+through a scripted navigation over a synthetic corpus (see corpus.py), and
+reports, per scenario, as JSON:
+
+- time to first paint: from the seek to the first display commit,
+- time to complete: from the seek to `on_image_load_complete`,
+- rescale time: fit width / height / best and zoom-in commits on the
+  completely loaded image,
+- peak RSS of the process running the scenario,
+- the per-stage timings recorded by StageTimings.
+
+Each scenario runs in its own subprocess, so that peak RSS figures don't
+leak between scenarios. A display is required: when $DISPLAY is unset,
+scenarios are run under `xvfb-run` if available.
+
+Usage:
+    python3 tests/benchmarks/bench_load_display.py [--corpus DIR] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.dirname(os.path.dirname(BENCH_DIR))
+
+# name: (corpus set, extra pytheia command line options)
+SCENARIOS = {
+    "jpeg-small": ("jpeg-small", []),
+    "jpeg-large": ("jpeg-large", []),
+    "jpeg-large-threaded": ("jpeg-large", ["--decode-engine", "threaded"]),
+    "jpeg-large-decode-to-fit": ("jpeg-large", ["--decode-to-fit"]),
+    "jpeg-large-no-prefetch": ("jpeg-large", ["--prefetch-ahead", "0", "--prefetch-behind", "0"]),
+    "png-medium": ("png-medium", []),
+    "webp-medium": ("webp-medium", []),
+    "cbz-medium": ("cbz-medium", []),
+    "cbt-medium": ("cbt-medium", []),
+}
+
+# Seek offsets played, once the first image is displayed:
+NAVIGATION = (1, 1, 1, 1, -1, -1, 1, 1)
+
+
+def percentiles(values):
+    """Returns a dict of summary statistics for a list of seconds"""
+    if not values:
+        return None
+
+    _sorted = sorted(values)
+    return {
+        "count": len(_sorted),
+        "min": _sorted[0],
+        "p50": _sorted[len(_sorted) // 2],
+        "max": _sorted[-1],
+        "mean": sum(_sorted) / len(_sorted),
+    }
+
+
+def run_scenario(start_path, options, result_path):
+    """
+    Subprocess side: start Pytheia on `start_path`, play NAVIGATION, and
+    write the measures to `result_path`.
+    """
+    # pylint: disable=import-outside-toplevel
+    import resource
+
+    sys.path.insert(0, SRC_DIR)
+    import gi  # pylint: disable=import-error
+
+    gi.require_version("Gtk", "3.0")
+    from gi.repository import GLib, Gtk  # pylint: disable=import-error
+
+    from pytheialib.PytheiaGui import PytheiaGui
+    from pytheialib.StageTimings import StageTimings
+
+    PytheiaGui.pytheia_plugins = type("PytheiaPlugins", (object,), {})
+    gui = PytheiaGui()
+    gui.set_pytheia_exec_dir(os.path.join(SRC_DIR, "pytheialib"))
+    gui.set_pytheia_install_context("sources_dir")
+    gui.command_line = options + [start_path]
+    gui.creator.setup_objects()
+
+    gui.plugins.initialize()
+    gui.plugins.discover_plugins()
+    gui.plugins.register_plugins()
+    gui.plugins.disable_undefined_plugins()
+
+    measures = {"ttfp": [], "complete": [], "rescale": [], "errors": 0}
+    current = {"t0": None, "first_paint": None, "done": False}
+
+    # Instrument the display commit and the load completion hook:
+    _state_commit = gui.display_state.state_commit
+    _hooks = gui.plugins.plugins_hooks_on_event_generic
+
+    def state_commit():
+        _state_commit()
+        if current["t0"] is not None and current["first_paint"] is None:
+            current["first_paint"] = time.perf_counter()
+
+    def hooks(eventname_s):
+        _hooks(eventname_s)
+        if eventname_s == "on_image_load_complete" and current["t0"] is not None and not current["done"]:
+            current["done"] = True
+            measures["complete"].append(time.perf_counter() - current["t0"])
+            if current["first_paint"] is not None:
+                measures["ttfp"].append(current["first_paint"] - current["t0"])
+
+    gui.display_state.state_commit = state_commit
+    gui.plugins.plugins_hooks_on_event_generic = hooks
+
+    def measure_rescale():
+        for _request in (
+            gui.display_state.do_fit_width,
+            gui.display_state.do_fit_height,
+            gui.display_state.do_fit_best,
+            gui.display_state.request_zoom_in,
+            gui.display_state.do_fit_best,
+        ):
+            _t0 = time.perf_counter()
+            _request()
+            measures["rescale"].append(time.perf_counter() - _t0)
+
+    def seek(offset):
+        current["t0"] = time.perf_counter()
+        current["first_paint"] = None
+        current["done"] = False
+        gui.callbacks.cb_path_seek_generic(offset, os.SEEK_CUR)
+
+    steps = list(NAVIGATION)
+    deadline = {"t": time.perf_counter() + 60}
+
+    def drive():
+        if not current["done"]:
+            if time.perf_counter() > deadline["t"]:
+                measures["errors"] += 1
+                current["done"] = True
+            return True
+
+        measure_rescale()
+        if not steps:
+            Gtk.main_quit()
+            return False
+
+        # Let prefetching work a little, as a user reading the page would:
+        time.sleep(0.05)
+        deadline["t"] = time.perf_counter() + 60
+        seek(steps.pop(0))
+        return True
+
+    gui.image_display_widget.main_window.show_all()
+    current["t0"] = time.perf_counter()
+    gui.pbl.pixbuf_loader_start()
+    GLib.timeout_add(5, drive)
+    Gtk.main()
+
+    _result = {
+        "ttfp": percentiles(measures["ttfp"]),
+        "complete": percentiles(measures["complete"]),
+        "rescale": percentiles(measures["rescale"]),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "timeouts": measures["errors"],
+        "stages": StageTimings().summary(),
+    }
+    with open(result_path, "w") as _fd:
+        json.dump(_result, _fd)
+
+    gui.pbl.decode_pool.shutdown()
+    os._exit(0)  # pylint: disable=protected-access
+
+
+def run_all(corpus_dir, selected, output):
+    """
+    Parent side: generate the corpus, run scenarios in subprocesses and
+    collect their results.
+    """
+    # pylint: disable=import-outside-toplevel
+    sys.path.insert(0, BENCH_DIR)
+    import corpus
+
+    _sets = corpus.generate(corpus_dir)
+
+    _command_prefix = []
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        if not shutil.which("xvfb-run"):
+            sys.exit("No display available, and xvfb-run not found")
+        _command_prefix = ["xvfb-run", "-a", "-s", "-screen 0 1920x1080x24"]
+
+    _report = {"python": sys.version.split()[0], "corpus": corpus_dir, "scenarios": {}}
+
+    for _name, (_set, _options) in SCENARIOS.items():
+        if selected and _name not in selected:
+            continue
+        if _set not in _sets:
+            _report["scenarios"][_name] = {"skipped": "%s not available in this environment" % _set}
+            continue
+
+        _start_path = _sets[_set]
+        if os.path.isdir(_start_path):
+            _start_path = os.path.join(_start_path, sorted(os.listdir(_start_path))[0])
+
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as _tmp:
+            _result_path = _tmp.name
+
+        _cmd = _command_prefix + [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--run-scenario",
+            _result_path,
+            _start_path,
+        ] + ["--option=%s" % _opt for _opt in _options]
+
+        _started = time.perf_counter()
+        _proc = subprocess.run(_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+        try:
+            with open(_result_path) as _fd:
+                _report["scenarios"][_name] = json.load(_fd)
+        except (IOError, ValueError):
+            _report["scenarios"][_name] = {
+                "failed": _proc.returncode,
+                "stderr": _proc.stderr.decode(errors="replace")[-2000:],
+            }
+        finally:
+            os.remove(_result_path)
+
+        _report["scenarios"][_name]["wall_time"] = time.perf_counter() - _started
+        print("%-28s done in %.1fs" % (_name, _report["scenarios"][_name]["wall_time"]), file=sys.stderr)
+
+    _json = json.dumps(_report, indent=2, sort_keys=True)
+    if output:
+        with open(output, "w") as _fd:
+            _fd.write(_json + "\n")
+    else:
+        print(_json)
+
+
+def main():
+    """Command line entry point"""
+    _parser = argparse.ArgumentParser(description="Pytheia load-and-display benchmark")
+    _parser.add_argument(
+        "--corpus",
+        default=os.path.join(tempfile.gettempdir(), "pytheia-bench-corpus"),
+        help="Where the synthetic corpus is generated (reused if present)",
+    )
+    _parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    _parser.add_argument("--scenario", action="append", help="Only run this scenario (repeatable)")
+    # Internal, used by the parent process:
+    _parser.add_argument("--run-scenario", nargs=2, metavar=("RESULT", "START_PATH"), help=argparse.SUPPRESS)
+    _parser.add_argument("--option", action="append", default=[], help=argparse.SUPPRESS)
+    _args = _parser.parse_args()
+
+    if _args.run_scenario:
+        run_scenario(_args.run_scenario[1], _args.option, _args.run_scenario[0])
+    else:
+        run_all(_args.corpus, _args.scenario, _args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic image corpus for the benchmarks.
+
+Images are generated locally with GdkPixbuf (a gradient overlaid with noise,
+so that encoders don't get an unrealistically easy job), in each writable
+format among JPEG, PNG and WebP, and at several sizes. CBZ and CBT archives
+are then built from the JPEG images.
+"""
+
+import os
+import tarfile
+import zipfile
+
+import gi  # pylint: disable=import-error
+
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf, GLib  # pylint: disable=import-error
+
+# name: (width, height)
+SIZES = {
+    "small": (1280, 960),
+    "medium": (3000, 2000),
+    "large": (6000, 4000),
+}
+
+# format: (GdkPixbuf type, extension, save options)
+FORMATS = {
+    "jpeg": ("jpeg", "jpg", {"quality": "90"}),
+    "png": ("png", "png", {"compression": "6"}),
+    "webp": ("webp", "webp", {"quality": "90"}),
+}
+
+
+def writable_formats():
+    """Returns the FORMATS keys the local GdkPixbuf is able to save"""
+    _writable = {_fmt.get_name() for _fmt in GdkPixbuf.Pixbuf.get_formats() if _fmt.is_writable()}
+    return [_name for _name, _spec in FORMATS.items() if _spec[0] in _writable]
+
+
+def synthetic_pixbuf(width, height, seed=0):
+    """
+    Returns a RGB pixbuf of the given dimensions: horizontal gradient, with
+    a band of random noise every 8 rows.
+    """
+    _row = bytes((x * 255 // max(1, width * 3 - 1) + seed) % 256 for x in range(width * 3))
+    _noise = os.urandom(width * 3)
+
+    _rows = [_noise if y % 8 == 0 else _row for y in range(height)]
+    return GdkPixbuf.Pixbuf.new_from_bytes(
+        GLib.Bytes.new(b"".join(_rows)),
+        GdkPixbuf.Colorspace.RGB,
+        False,  # has_alpha
+        8,  # bits per sample
+        width,
+        height,
+        width * 3,  # rowstride
+    )
+
+
+def generate(dest_dir, count=6, sizes=None):
+    """
+    Generate the corpus in `dest_dir`, unless already there: one directory
+    per format and size holding `count` images, plus one CBZ and one CBT
+    archive per size. Returns a dict: {set name: path}.
+    """
+    sizes = sizes or SIZES
+    _sets = {}
+
+    for _size_name, (_width, _height) in sizes.items():
+        for _fmt in writable_formats():
+            _pb_type, _ext, _options = FORMATS[_fmt]
+            _set_dir = os.path.join(dest_dir, "%s-%s" % (_fmt, _size_name))
+            _sets["%s-%s" % (_fmt, _size_name)] = _set_dir
+
+            if os.path.isdir(_set_dir) and len(os.listdir(_set_dir)) == count:
+                continue
+            os.makedirs(_set_dir, exist_ok=True)
+
+            for _idx in range(count):
+                _pixbuf = synthetic_pixbuf(_width, _height, seed=_idx * 37)
+                _pixbuf.savev(
+                    os.path.join(_set_dir, "%03d.%s" % (_idx, _ext)),
+                    _pb_type,
+                    list(_options.keys()),
+                    list(_options.values()),
+                )
+
+        _jpeg_dir = _sets.get("jpeg-%s" % _size_name)
+        if not _jpeg_dir:
+            continue
+
+        _members = sorted(os.listdir(_jpeg_dir))
+
+        _cbz = os.path.join(dest_dir, "jpeg-%s.cbz" % _size_name)
+        if not os.path.isfile(_cbz):
+            with zipfile.ZipFile(_cbz, "w", zipfile.ZIP_STORED) as _zip:
+                for _member in _members:
+                    _zip.write(os.path.join(_jpeg_dir, _member), _member)
+        _sets["cbz-%s" % _size_name] = _cbz
+
+        _cbt = os.path.join(dest_dir, "jpeg-%s.cbt" % _size_name)
+        if not os.path.isfile(_cbt):
+            with tarfile.open(_cbt, "w") as _tar:
+                for _member in _members:
+                    _tar.add(os.path.join(_jpeg_dir, _member), _member)
+        _sets["cbt-%s" % _size_name] = _cbt
+
+    return _sets
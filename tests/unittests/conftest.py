@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+Make pytheialib importable from the source tree
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+ArchiveIndex tests, and the indexes archive backends build
+"""
+
+import io
+import tarfile
+import zipfile
+
+from pytheialib.ArchiveIndex import ArchiveIndex, ArchiveMember
+from pytheialib.Tar import Tar
+from pytheialib.Zip import Zip
+
+DATA = {"a.jpg": b"A" * 100, "dir/bb.png": b"B" * 1000}
+
+
+def test_add_get_replace():
+    _index = ArchiveIndex()
+    _index.add("a.jpg", 10, 5, 100, 0x1234, 1.5, "Deflate")
+    _index.add("b.jpg", 20)
+
+    assert len(_index) == 2
+    assert "a.jpg" in _index
+    assert _index["a.jpg"] == ArchiveMember(10, 5, 100, 0x1234, 1.5, "Deflate")
+    assert _index["b.jpg"] == ArchiveMember(20, -1, -1, -1, 0.0, None)
+    assert _index.get("c.jpg", ArchiveIndex.UNKNOWN) is ArchiveIndex.UNKNOWN
+
+    _index.add("a.jpg", 11)
+    assert len(_index) == 2
+    assert _index["a.jpg"].size == 11
+
+    assert _index.nbytes() > 0
+
+
+def test_zip_offsets_point_at_data(tmp_path):
+    _archive = str(tmp_path / "a.zip")
+    with zipfile.ZipFile(_archive, "w") as _zip:
+        for _name, _data in DATA.items():
+            _zip.writestr(_name, _data, compress_type=zipfile.ZIP_STORED)
+
+    _handler = Zip()
+    _handler.register({_archive: str(tmp_path)})
+    try:
+        _index = _handler.get_index(_archive)
+        with open(_archive, "rb") as _fd:
+            _raw = _fd.read()
+
+        for _name, _data in DATA.items():
+            _member = _index[_name]
+            assert _member.size == len(_data)
+            assert _member.method == "Copy"
+            assert _raw[_member.offset : _member.offset + _member.size] == _data
+    finally:
+        _handler.close()
+
+
+def test_tar_offsets_point_at_data(tmp_path):
+    _archive = str(tmp_path / "a.tar")
+    with tarfile.open(_archive, "w") as _tar:
+        for _name, _data in DATA.items():
+            _info = tarfile.TarInfo(_name)
+            _info.size = len(_data)
+            _tar.addfile(_info, io.BytesIO(_data))
+
+    _handler = Tar()
+    _handler.register(_archive)
+    try:
+        _handler.list_all_files()
+        _index = _handler.get_index()
+        with open(_archive, "rb") as _fd:
+            _raw = _fd.read()
+
+        for _name, _data in DATA.items():
+            _member = _index[_name]
+            assert _raw[_member.offset : _member.offset + _member.size] == _data
+    finally:
+        _handler.close()
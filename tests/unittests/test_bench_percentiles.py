@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark summary statistics tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from bench_load_display import percentiles  # pylint: disable=wrong-import-position
+
+
+def test_no_values():
+    assert percentiles([]) is None
+
+
+def test_summary():
+    _summary = percentiles([0.3, 0.1, 0.2, 0.4])
+
+    assert _summary["count"] == 4
+    assert _summary["min"] == 0.1
+    assert _summary["p50"] == 0.3
+    assert _summary["max"] == 0.4
+    assert abs(_summary["mean"] - 0.25) < 1e-9
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+DiskCache tests
+"""
+
+import os
+
+from pytheialib.DiskCache import DiskCache
+
+
+def test_hit_only_for_same_validator(tmp_path):
+    _cache = DiskCache("test", cache_dir=str(tmp_path))
+
+    assert _cache.get("key", (1, 2)) is None
+    assert _cache.set("key", (1, 2), ["value"])
+
+    assert _cache.get("key", (1, 2)) == ["value"]
+    assert _cache.get("key", (1, 3)) is None
+    assert _cache.get("other", (1, 2)) is None
+    assert (_cache.hits, _cache.misses) == (1, 3)
+
+
+def test_shared_across_instances(tmp_path):
+    DiskCache("test", cache_dir=str(tmp_path)).set("key", 1, "value")
+
+    assert DiskCache("test", cache_dir=str(tmp_path)).get("key", 1) == "value"
+    assert DiskCache("other", cache_dir=str(tmp_path)).get("key", 1) is None
+
+
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path):
+    _cache = DiskCache("test", cache_dir=str(tmp_path))
+    _cache.set("key", 1, "value")
+    _path = _cache._get_path("key")  # pylint: disable=protected-access
+
+    # Truncated, and referencing a class that doesn't exist anymore:
+    for _content in (b"\x80\x05\x95", b"\x80\x04cnowhere\nGone\n)\x81."):
+        with open(_path, "wb") as _fd:
+            _fd.write(_content)
+
+        assert _cache.get("key", 1) is None
+        assert not os.path.exists(_path)
+        _cache.set("key", 1, "value")
+
+
+def test_remove(tmp_path):
+    _cache = DiskCache("test", cache_dir=str(tmp_path))
+    _cache.set("key", 1, "value")
+    _cache.remove("key")
+    _cache.remove("key")
+
+    assert _cache.get("key", 1) is None
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+ExtractedBytes and Utils.write_atomically tests
+"""
+
+import os
+
+import pytest
+
+from pytheialib.ExtractedBytes import ExtractedBytes
+from pytheialib.Utils import Utils
+
+
+def test_write_atomically_accounts_bytes(tmp_path):
+    _directory = str(tmp_path)
+    _destination = os.path.join(_directory, "member.jpg")
+
+    def write(path):
+        assert os.path.basename(path).startswith(".part_")
+        with open(path, "wb") as _fd:
+            _fd.write(b"x" * 100)
+
+    Utils.write_atomically(_destination, write)
+    Utils.write_atomically(os.path.join(_directory, "other.jpg"), write)
+
+    assert sorted(os.listdir(_directory)) == ["member.jpg", "other.jpg"]
+    assert ExtractedBytes.get(_directory) == 200
+
+    ExtractedBytes.forget(_directory)
+    assert ExtractedBytes.get(_directory) == 0
+
+
+def test_write_atomically_failure_leaves_nothing(tmp_path):
+    _directory = str(tmp_path)
+
+    def write(path):
+        with open(path, "wb") as _fd:
+            _fd.write(b"partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        Utils.write_atomically(os.path.join(_directory, "member.jpg"), write)
+
+    assert os.listdir(_directory) == []
+    assert ExtractedBytes.get(_directory) == 0
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+FileTable and LazyItemTable tests
+"""
+
+import math
+import pickle
+
+import pytest
+
+from pytheialib.FileTable import FileTable, LazyItemTable
+
+PATHS = ["/a/x.jpg", "/a/b/y.png", "/c/z.gif", "/a/w.jpg"]
+
+
+def test_round_trip():
+    _table = FileTable(PATHS)
+
+    assert len(_table) == len(PATHS)
+    assert list(_table) == PATHS
+    assert _table[1] == PATHS[1]
+    assert _table[-1] == PATHS[-1]
+    assert _table[1:3] == PATHS[1:3]
+    assert "/c/z.gif" in _table
+    assert "/c/nope.gif" not in _table
+
+
+def test_non_utf8_names():
+    _path = "/a/caf\udce9.jpg"  # as os.listdir() gives undecodable bytes
+    _table = FileTable([_path])
+
+    assert _table[0] == _path
+    assert _table.index(_path) == 0
+
+
+def test_index_sorted_and_unsorted():
+    _table = FileTable(sorted(PATHS))
+    assert _table.is_sorted
+    assert _table.index("/a/w.jpg") == sorted(PATHS).index("/a/w.jpg")
+
+    _table = FileTable(PATHS)
+    assert not _table.is_sorted
+    assert _table.index("/a/w.jpg") == 3
+
+    with pytest.raises(ValueError):
+        _table.index("/missing.jpg")
+
+
+def test_sort_carries_sort_keys():
+    _table = FileTable(PATHS, {"size": [1, 2, 3, 4]})
+    _table.sort()
+
+    assert list(_table) == sorted(PATHS)
+    assert [_table.sort_keys["size"][_table.index(_path)] for _path in PATHS] == [1, 2, 3, 4]
+
+
+def test_extend_without_keys_makes_them_stale():
+    _table = FileTable(PATHS[:2], {"mtime": [10, 20], "size": [1, 2]})
+    _table.extend(PATHS[2:], {"size": [3, 4]})
+
+    assert _table.stale_sort_keys == {"mtime"}
+    assert list(_table.sort_keys["size"]) == [1, 2, 3, 4]
+    assert _table.missing_sort_keys("mtime") == [2, 3]
+    assert _table.missing_sort_keys("size") == []
+
+    _table.fill_sort_keys("mtime", [2, 3], [30, 40])
+    assert not _table.stale_sort_keys
+    assert list(_table.sort_keys["mtime"]) == [10, 20, 30, 40]
+
+
+def test_append_keeps_given_keys():
+    _table = FileTable(PATHS[:1], {"mtime": [10]})
+    _table.append(PATHS[1], {"mtime": 20})
+    _table.append(PATHS[2])
+
+    assert list(_table.sort_keys["mtime"])[:2] == [10, 20]
+    assert math.isnan(_table.sort_keys["mtime"][2])
+    assert _table.stale_sort_keys == {"mtime"}
+
+
+def test_missing_key_means_all_missing():
+    _table = FileTable(PATHS)
+
+    assert _table.missing_sort_keys("exif") == [0, 1, 2, 3]
+
+    _table.fill_sort_keys("exif", [0, 1], [5, 6])
+    assert _table.stale_sort_keys == {"exif"}
+    assert _table.missing_sort_keys("exif") == [2, 3]
+
+
+def test_take_recomputes_stale_keys():
+    _table = FileTable(PATHS[:2], {"mtime": [10, 20]})
+    _table.extend(PATHS[2:])
+
+    _kept = _table.take([0, 1])
+    assert list(_kept) == PATHS[:2]
+    assert not _kept.stale_sort_keys
+    assert _table.stale_sort_keys == {"mtime"}
+
+
+def test_permute():
+    _table = FileTable(PATHS, {"size": [1, 2, 3, 4]})
+    _table.permute([3, 2, 1, 0])
+
+    assert list(_table) == PATHS[::-1]
+    assert list(_table.sort_keys["size"]) == [4, 3, 2, 1]
+
+
+def test_pickle_and_equality():
+    _table = FileTable(PATHS, {"size": [1, 2, 3, 4]})
+    _copy = pickle.loads(pickle.dumps(_table, pickle.HIGHEST_PROTOCOL))
+
+    assert _copy == _table
+    assert list(_copy.sort_keys["size"]) == [1, 2, 3, 4]
+
+
+def test_nbytes_counts_prefix_index():
+    _table = FileTable(["/d%s/f.jpg" % _i for _i in range(100)])
+    _few_prefixes = FileTable(["/d/f%s.jpg" % _i for _i in range(100)])
+
+    assert _table.nbytes() > _few_prefixes.nbytes()
+
+
+class Item:
+    """Minimal *ItemCacheable stand-in"""
+
+    def __init__(self, filename):
+        self.filename = filename
+
+
+def test_lazy_item_table():
+    _created = []
+
+    def make_item(name):
+        _created.append(name)
+        return Item(name)
+
+    _table = LazyItemTable(PATHS, make_item)
+    assert not _created
+
+    _item = _table[2]
+    assert _table[2] is _item
+    assert _created == [PATHS[2]]
+    assert _table.index(_item) == 2
+
+    _table.permute([2, 0, 1, 3])
+    assert _table[0] is _item
+    assert _table.created_items() == [_item]
+    assert len(_created) == 1
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+GlobalIndex tests
+"""
+
+import pytest
+
+from pytheialib.GlobalIndex import GlobalIndex
+
+
+class Node:
+    """PathNode stand-in, counting how often it is counted"""
+
+    def __init__(self, count):
+        self.count = count
+        self.counted = 0
+
+    def count_entries(self):
+        self.counted += 1
+        return self.count
+
+
+class Store:
+    """PathNodeStore stand-in"""
+
+    def __init__(self, counts):
+        self.store = [Node(_count) for _count in counts]
+
+
+def make_index(counts):
+    _index = GlobalIndex()
+    _index.path_nodes_store = Store(counts)
+    return _index
+
+
+def test_locate_skips_empty_nodes():
+    _index = make_index([3, 0, 2, 4])
+
+    assert _index.locate(0) == (0, 0)
+    assert _index.locate(2) == (0, 2)
+    assert _index.locate(3) == (2, 0)
+    assert _index.locate(5) == (3, 0)
+    assert _index.locate(8) == (3, 3)
+    assert _index.locate(9) is None
+    assert _index.locate(-1) is None
+
+
+def test_locate_counts_only_as_far_as_needed():
+    _index = make_index([3, 2, 4])
+
+    _index.locate(1)
+    assert [_node.counted for _node in _index.path_nodes_store.store] == [1, 0, 0]
+    assert _index.known_len() is None
+
+    assert len(_index) == 9
+    assert _index.known_len() == 9
+
+
+def test_position_of_is_locate_inverse():
+    _index = make_index([3, 0, 2, 4])
+
+    for _position in range(len(_index)):
+        assert _index.position_of(*_index.locate(_position)) == _position
+
+    with pytest.raises(IndexError):
+        make_index([1]).position_of(3, 0)
+
+
+def test_update_node():
+    _index = make_index([3, 2, 4])
+    assert len(_index) == 9
+
+    _index.path_nodes_store.store[1].count = 5
+    _index.update_node(1)
+
+    assert _index.known_len() is None
+    assert _index.locate(6) == (1, 3)
+    assert len(_index) == 12
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+ShufflePermutation tests
+"""
+
+import pytest
+
+from pytheialib.ShufflePermutation import ShufflePermutation
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 4, 5, 17, 255, 256, 257, 1000, 4097])
+def test_bijection_and_inverse(size):
+    _permutation = ShufflePermutation(size, seed=42)
+    _values = [_permutation[_i] for _i in range(size)]
+
+    assert sorted(_values) == list(range(size))
+    assert all(_permutation.index(_value) == _i for _i, _value in enumerate(_values))
+
+
+def test_reproducible_from_seed():
+    assert [ShufflePermutation(100, 7)[_i] for _i in range(100)] == [ShufflePermutation(100, 7)[_i] for _i in range(100)]
+    assert [ShufflePermutation(100, 7)[_i] for _i in range(100)] != [ShufflePermutation(100, 8)[_i] for _i in range(100)]
+
+
+def test_out_of_range():
+    _permutation = ShufflePermutation(10)
+
+    assert len(_permutation) == 10
+    with pytest.raises(IndexError):
+        _permutation[10]  # pylint: disable=pointless-statement
+    with pytest.raises(IndexError):
+        _permutation.index(-1)
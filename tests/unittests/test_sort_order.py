@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+SortOrder tests
+"""
+
+import struct
+import time
+
+import pytest
+
+from pytheialib.FileTable import FileTable
+from pytheialib.SortOrder import SortOrder
+
+
+def test_natural_order():
+    _table = FileTable(["page10.jpg", "Page2.jpg", "page1.jpg", "page2b.jpg"])
+    _order = SortOrder("natural")
+
+    assert [_table[_i] for _i in _order.permutation(_table)] == ["page1.jpg", "Page2.jpg", "page2b.jpg", "page10.jpg"]
+
+
+def test_keyed_order_ties_broken_by_path():
+    _table = FileTable(["c", "a", "b"], {"size": [2, 2, 1]})
+
+    assert [_table[_i] for _i in SortOrder("size").permutation(_table)] == ["b", "a", "c"]
+    assert [_table[_i] for _i in SortOrder("size", reverse=True).permutation(_table)] == ["c", "a", "b"]
+
+
+def test_keyed_order_falls_back_to_paths():
+    _table = FileTable(["c", "a"], {"size": [1, 2]})
+    _table.append("b")
+
+    assert [_table[_i] for _i in SortOrder("size").permutation(_table)] == ["a", "b", "c"]
+    assert [_table[_i] for _i in SortOrder("mtime").permutation(_table)] == ["a", "b", "c"]
+
+
+def test_cycle_and_unknown_order():
+    _order = SortOrder()
+    for _expected in SortOrder.ORDERS[1:] + SortOrder.ORDERS[:1]:
+        _order.cycle()
+        assert _order.order == _expected
+
+    with pytest.raises(ValueError):
+        SortOrder("random")
+
+
+def jpeg_with_exif(date, endian="<"):
+    """
+    Returns a minimal JPEG whose EXIF IFD holds DateTimeOriginal 'date'
+    """
+    _mark = b"II" if endian == "<" else b"MM"
+    _date = date.encode("ascii") + b"\x00"
+    # IFD0 at 8: one entry, pointer to the EXIF IFD at 26:
+    _ifd0 = struct.pack(endian + "H", 1) + struct.pack(endian + "HHII", 0x8769, 4, 1, 26) + struct.pack(endian + "I", 0)
+    # EXIF IFD at 26: one entry, DateTimeOriginal stored at 44:
+    _exif = struct.pack(endian + "H", 1) + struct.pack(endian + "HHII", 0x9003, 2, len(_date), 44)
+    _exif += struct.pack(endian + "I", 0)
+    _tiff = _mark + struct.pack(endian + "HI", 42, 8) + _ifd0 + _exif + _date
+    _app1 = b"Exif\x00\x00" + _tiff
+
+    return b"\xff\xd8" + b"\xff\xe1" + struct.pack(">H", len(_app1) + 2) + _app1 + b"\xff\xd9"
+
+
+@pytest.mark.parametrize("endian", ["<", ">"])
+def test_exif_timestamp(tmp_path, endian):
+    _path = tmp_path / "a.jpg"
+    _path.write_bytes(jpeg_with_exif("2020:05:17 10:20:30", endian))
+
+    assert SortOrder.exif_timestamp(str(_path)) == time.mktime((2020, 5, 17, 10, 20, 30, 0, 0, -1))
+
+
+def test_exif_timestamp_missing(tmp_path):
+    _not_jpeg = tmp_path / "a.png"
+    _not_jpeg.write_bytes(b"\x89PNG\r\n\x1a\n")
+    _no_exif = tmp_path / "b.jpg"
+    _no_exif.write_bytes(b"\xff\xd8\xff\xd9")
+    _zero_date = tmp_path / "c.jpg"
+    _zero_date.write_bytes(jpeg_with_exif("0000:00:00 00:00:00"))
+    _truncated = tmp_path / "d.jpg"
+    _truncated.write_bytes(jpeg_with_exif("2020:05:17 10:20:30")[:30])
+
+    for _path in (_not_jpeg, _no_exif, _zero_date, _truncated, tmp_path / "missing.jpg"):
+        assert SortOrder.exif_timestamp(str(_path)) is None
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+StageTimings tests
+"""
+
+import json
+
+from pytheialib.StageTimings import STAGES, Histogram, StageTimings
+
+
+def test_empty_histogram():
+    _summary = Histogram().summary()
+
+    assert _summary["count"] == 0
+    assert _summary["mean"] is None
+    assert _summary["p50"] is None
+
+
+def test_percentiles_are_bucket_bounds():
+    _histogram = Histogram()
+    for _seconds in [0.0015] * 90 + [0.3] * 9 + [20]:
+        _histogram.add_value(_seconds)
+
+    assert _histogram.count == 100
+    assert _histogram.percentile(50) == 0.002
+    assert _histogram.percentile(95) == 0.5
+    assert _histogram.percentile(100) == 20
+    assert _histogram.summary()["max"] == 20
+
+
+def test_percentile_not_above_max():
+    _histogram = Histogram()
+    _histogram.add_value(0.003)
+
+    assert _histogram.percentile(99) == 0.003
+
+
+def test_shared_timings(tmp_path):
+    StageTimings().clear()
+    StageTimings().add_value("decode", 0.01)
+    with StageTimings().measure("read"):
+        pass
+
+    _summary = StageTimings().summary()
+    assert set(_summary) == set(STAGES)
+    assert _summary["decode"]["count"] == 1
+    assert _summary["read"]["count"] == 1
+
+    _path = tmp_path / "timings.json"
+    StageTimings().dump(str(_path))
+    assert json.loads(_path.read_text())["decode"]["count"] == 1
+
+    StageTimings().clear()
+    assert StageTimings().summary()["decode"]["count"] == 0